@@ -2,15 +2,18 @@
 Pytest configuration for integration tests.
 This sets up a test database using SQLite and provides fixtures.
 """
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from src.api.deps import auth_cache, rate_limiter, token_revocations
 from src.db.database import get_db
 from src.db.models import Base
-from src.db.session import clear_live_players
+from src.db.session import clear_live_players, leaderboard_cache, rank_index
 from src.main import app
 
 
@@ -67,15 +70,27 @@ def client(test_db):
 
     app.dependency_overrides[get_db] = override_get_db
 
-    # Clear live players cache before each test
+    # Clear live players, cached tokens, revocations, rate limits and leaderboard caches before each test
     clear_live_players()
+    auth_cache.clear()
+    token_revocations.clear()
+    rate_limiter.clear()
+    leaderboard_cache.clear()
+    rank_index.clear()
 
-    with TestClient(app) as test_client:
-        yield test_client
+    # Startup creates tables and warms the caches; point it at the test database
+    with patch("src.main.init_db"), patch("src.main.SessionLocal", test_db):
+        with TestClient(app) as test_client:
+            yield test_client
 
     # Clear overrides after test
     app.dependency_overrides.clear()
     clear_live_players()
+    auth_cache.clear()
+    token_revocations.clear()
+    rate_limiter.clear()
+    leaderboard_cache.clear()
+    rank_index.clear()
 
 
 @pytest.fixture(scope="function")
@@ -180,3 +180,101 @@ class TestAuthIntegration:
         # 4. Logout
         response = client.post(f"{settings.API_V1_STR}/auth/logout", headers=headers)
         assert response.status_code == 204
+
+    def test_deleted_user_token_is_rejected(self, client, db_session):
+        """Test that deleting a user through the admin API revokes their cached token."""
+        from src.db.models import User as UserModel
+
+        tokens = {}
+        for email in ("admin@example.com", "victim@example.com"):
+            response = client.post(
+                f"{settings.API_V1_STR}/auth/signup",
+                json={"email": email, "password": "password123"}
+            )
+            tokens[email] = response.json()["token"]
+        victim_headers = {"Authorization": f"Bearer {tokens['victim@example.com']}"}
+
+        # Authenticate once so the token is cached
+        victim = client.get(f"{settings.API_V1_STR}/auth/me", headers=victim_headers).json()
+
+        db_session.query(UserModel).filter(UserModel.email == "admin@example.com").update({"is_superuser": True})
+        db_session.commit()
+        response = client.delete(
+            f"{settings.API_V1_STR}/admin/users/{victim['id']}",
+            headers={"Authorization": f"Bearer {tokens['admin@example.com']}"}
+        )
+        assert response.status_code == 200
+
+        response = client.get(f"{settings.API_V1_STR}/auth/me", headers=victim_headers)
+        assert response.status_code == 401
+
+    def test_login_reads_the_user_once(self, client, test_db):
+        """Test that login fetches the user and password hash in a single query."""
+        from sqlalchemy import event
+
+        client.post(
+            f"{settings.API_V1_STR}/auth/signup",
+            json={"email": "single@example.com", "password": "password123"}
+        )
+
+        statements = []
+        engine = test_db.kw["bind"]
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.post(
+                f"{settings.API_V1_STR}/auth/login",
+                json={"email": "single@example.com", "password": "password123"}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        assert len([statement for statement in statements if "FROM users" in statement]) == 1
+
+    def test_login_unknown_email_still_checks_a_password(self, client):
+        """Test that unknown emails pay for a bcrypt check like wrong passwords do."""
+        from unittest.mock import patch
+
+        from src.core import security
+
+        with patch.object(security, "verify_dummy_password", wraps=security.verify_dummy_password) as dummy:
+            response = client.post(
+                f"{settings.API_V1_STR}/auth/login",
+                json={"email": "nobody@example.com", "password": "password123"}
+            )
+        assert response.status_code == 401
+        dummy.assert_called_once_with("password123")
+
+    def test_logout_revokes_only_that_token(self, client):
+        """Test that a logged-out token is rejected while the user's other sessions keep working."""
+        credentials = {"email": "revoked@example.com", "password": "password123"}
+        first = client.post(f"{settings.API_V1_STR}/auth/signup", json=credentials).json()["token"]
+        second = client.post(f"{settings.API_V1_STR}/auth/login", json=credentials).json()["token"]
+        assert first != second
+
+        first_headers = {"Authorization": f"Bearer {first}"}
+        # Cached by a successful request before logging out
+        assert client.get(f"{settings.API_V1_STR}/auth/me", headers=first_headers).status_code == 200
+        assert client.post(f"{settings.API_V1_STR}/auth/logout", headers=first_headers).status_code == 204
+
+        assert client.get(f"{settings.API_V1_STR}/auth/me", headers=first_headers).status_code == 401
+        response = client.get(f"{settings.API_V1_STR}/auth/me", headers={"Authorization": f"Bearer {second}"})
+        assert response.status_code == 200
+
+    def test_login_is_rate_limited_per_ip(self, client):
+        """Test that a client hammering login is refused with 429 and told when to retry."""
+        from src.core.rate_limit import parse_rate_limit
+
+        limit = parse_rate_limit(settings.RATE_LIMIT_LOGIN)
+        credentials = {"email": "nobody@example.com", "password": "password123"}
+        for _ in range(limit.capacity):
+            response = client.post(f"{settings.API_V1_STR}/auth/login", json=credentials)
+            assert response.status_code == 401
+
+        response = client.post(f"{settings.API_V1_STR}/auth/login", json=credentials)
+        assert response.status_code == 429
+        assert 1 <= int(response.headers["Retry-After"]) <= limit.period
@@ -285,3 +285,210 @@ class TestLeaderboardIntegration:
         # Verify ordering
         actual_scores = [entry["score"] for entry in data]
         assert actual_scores == expected_scores
+
+    def test_submit_score_is_rate_limited_per_user(self, client, auth_headers):
+        """Test that one user flooding score submissions is refused without affecting others."""
+        from src.core.rate_limit import parse_rate_limit
+
+        limit = parse_rate_limit(settings.RATE_LIMIT_SCORE)
+        for _ in range(limit.capacity):
+            response = client.post(
+                f"{settings.API_V1_STR}/leaderboard",
+                json={"score": 10, "mode": "walls"},
+                headers=auth_headers
+            )
+            assert response.status_code == 201
+
+        response = client.post(
+            f"{settings.API_V1_STR}/leaderboard",
+            json={"score": 10, "mode": "walls"},
+            headers=auth_headers
+        )
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+        token = client.post(
+            f"{settings.API_V1_STR}/auth/signup",
+            json={"email": "other@example.com", "password": "password", "username": "other"}
+        ).json()["token"]
+        response = client.post(
+            f"{settings.API_V1_STR}/leaderboard",
+            json={"score": 10, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 201
+
+    def test_leaderboard_pages_follow_the_cursor(self, client, db_session):
+        """Test that paging with the cursor visits every entry once, in order, ties included."""
+        from src.db import session as db_session_module
+
+        user = db_session_module.create_user(db_session, "pager", "pager@example.com", "x")
+        for score in [50, 30, 30, 30, 20, 30, 10]:
+            db_session_module.add_score(db_session, user.id, user.username, score, "walls")
+
+        pages = []
+        url = f"{settings.API_V1_STR}/leaderboard?mode=walls&limit=2"
+        response = client.get(url)
+        while True:
+            assert response.status_code == 200
+            pages.append(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"{url}&cursor={cursor}")
+
+        assert [len(page) for page in pages] == [2, 2, 2, 1]
+        seen = [entry["id"] for page in pages for entry in page]
+        assert seen == [entry.id for entry in db_session_module.get_leaderboard(db_session, "walls")]
+        assert len(set(seen)) == 7
+        assert [entry["score"] for page in pages for entry in page] == [50, 30, 30, 30, 30, 20, 10]
+
+    def test_leaderboard_default_limit_and_bad_cursor(self, client):
+        """Test that the page size is capped and malformed cursors are rejected."""
+        response = client.get(f"{settings.API_V1_STR}/leaderboard?limit={settings.LEADERBOARD_MAX_PAGE_SIZE + 1}")
+        assert response.status_code == 422
+
+        response = client.get(f"{settings.API_V1_STR}/leaderboard?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    def test_leaderboard_cursor_with_utc_offset(self, client, db_session):
+        """Test that a cursor time with a UTC offset pages like its UTC equivalent, and an unusable one is rejected."""
+        from datetime import UTC, datetime, timedelta, timezone
+
+        from src.core.cursor import decode_cursor, encode_cursor
+        from src.db import session as db_session_module
+
+        user = db_session_module.create_user(db_session, "offset", "offset@example.com", "x")
+        for score in [40, 30, 20]:
+            db_session_module.add_score(db_session, user.id, user.username, score, "walls")
+
+        url = f"{settings.API_V1_STR}/leaderboard?mode=walls&limit=1"
+        response = client.get(url)
+        score, created_at, entry_id = decode_cursor(response.headers["X-Next-Cursor"])
+        expected = client.get(f"{url}&cursor={response.headers['X-Next-Cursor']}").json()
+
+        shifted = datetime.fromisoformat(created_at).replace(tzinfo=UTC).astimezone(timezone(timedelta(hours=2)))
+        cursor = encode_cursor([score, shifted.isoformat(), entry_id])
+        response = client.get(f"{url}&cursor={cursor}")
+        assert response.status_code == 200
+        assert response.json() == expected
+
+        cursor = encode_cursor([score, "0001-01-01T00:00:00+01:00", entry_id])
+        assert client.get(f"{url}&cursor={cursor}").status_code == 400
+
+    def test_top_of_leaderboard_is_served_from_memory(self, client, auth_headers, test_db):
+        """Test that once warm, reading the top scores doesn't query the database and sees new scores."""
+        from sqlalchemy import event
+
+        url = f"{settings.API_V1_STR}/leaderboard?mode=walls"
+        client.post(f"{settings.API_V1_STR}/leaderboard", json={"score": 100, "mode": "walls"}, headers=auth_headers)
+        assert [entry["score"] for entry in client.get(url).json()] == [100]
+
+        client.post(f"{settings.API_V1_STR}/leaderboard", json={"score": 300, "mode": "walls"}, headers=auth_headers)
+
+        statements = []
+        engine = test_db.kw["bind"]
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert [entry["score"] for entry in response.json()] == [300, 100]
+        assert not [statement for statement in statements if "leaderboard_entries" in statement]
+
+    def test_personal_bests_show_one_entry_per_player(self, client, db_session):
+        """Test that the personal best board keeps only each player's best game per mode."""
+        from src.db import session as db_session_module
+
+        grinder = db_session_module.create_user(db_session, "grinder", "grinder@example.com", "x")
+        casual = db_session_module.create_user(db_session, "casual", "casual@example.com", "x")
+        for score in [40, 90, 60, 95, 10]:
+            db_session_module.add_score(db_session, grinder.id, grinder.username, score, "walls")
+        db_session_module.add_score(db_session, grinder.id, grinder.username, 5, "pass-through")
+        best = db_session_module.add_score(db_session, casual.id, casual.username, 70, "walls")
+
+        response = client.get(f"{settings.API_V1_STR}/leaderboard/best?mode=walls")
+        assert response.status_code == 200
+        data = response.json()
+        assert [(entry["username"], entry["score"]) for entry in data] == [("grinder", 95), ("casual", 70)]
+        assert data[1]["id"] == best.id
+
+        response = client.get(f"{settings.API_V1_STR}/leaderboard/best?limit=2")
+        assert [entry["score"] for entry in response.json()] == [95, 70]
+        next_page = client.get(
+            f"{settings.API_V1_STR}/leaderboard/best?limit=2&cursor={response.headers['X-Next-Cursor']}"
+        ).json()
+        assert [(entry["score"], entry["mode"]) for entry in next_page] == [(5, "pass-through")]
+
+        assert db_session_module.get_user_high_score(db_session, grinder.id, "walls") == 95
+        assert db_session_module.get_user_high_score(db_session, grinder.id) == 95
+        assert db_session_module.get_user_high_score(db_session, casual.id, "pass-through") == 0
+
+    def test_personal_bests_backfill_from_history(self, db_session):
+        """Test that scores recorded before the personal best table existed are backfilled."""
+        from src.db import session as db_session_module
+        from src.db.models import PersonalBest
+
+        user = db_session_module.create_user(db_session, "veteran", "veteran@example.com", "x")
+        for score in [30, 80, 80, 20]:
+            db_session_module.add_score(db_session, user.id, user.username, score, "walls")
+        first_80 = db_session_module.get_leaderboard(db_session, "walls")[0]
+        db_session.query(PersonalBest).delete()
+        db_session.commit()
+
+        assert db_session_module.backfill_personal_bests(db_session) == 1
+        assert db_session_module.backfill_personal_bests(db_session) == 0
+        [best] = db_session_module.get_personal_bests(db_session, "walls")
+        assert (best.score, best.id) == (80, first_80.id)
+
+    def test_rank_among_personal_bests(self, client, db_session):
+        """Test that a player's rank counts each other player's best once, with ties sharing a rank."""
+        from src.db import session as db_session_module
+
+        users = [
+            db_session_module.create_user(db_session, f"ranked{i}", f"ranked{i}@example.com", "x") for i in range(4)
+        ]
+        for user, scores in zip(users, [[100, 500], [300], [300, 50], [10]], strict=True):
+            for score in scores:
+                db_session_module.add_score(db_session, user.id, user.username, score, "walls")
+
+        def rank(user, mode="walls"):
+            return client.get(f"{settings.API_V1_STR}/leaderboard/rank?userId={user.id}&mode={mode}")
+
+        assert rank(users[0]).json() == {"userId": users[0].id, "mode": "walls", "score": 500, "rank": 1, "total": 4}
+        assert [rank(user).json()["rank"] for user in users] == [1, 2, 2, 4]
+        assert rank(users[0], "pass-through").status_code == 404
+
+        db_session_module.add_score(db_session, users[3].id, users[3].username, 1000, "walls")
+        assert [rank(user).json()["rank"] for user in users] == [2, 3, 3, 1]
+
+    def test_around_me_window(self, client, db_session):
+        """Test that the window holds the player's best with its neighbours on either side, clipped at the ends."""
+        from src.db import session as db_session_module
+
+        users = []
+        for i, score in enumerate([70, 10, 50, 90, 30, 50]):
+            user = db_session_module.create_user(db_session, f"near{i}", f"near{i}@example.com", "x")
+            db_session_module.add_score(db_session, user.id, user.username, score, "walls")
+            users.append(user)
+
+        def around(user, radius):
+            response = client.get(
+                f"{settings.API_V1_STR}/leaderboard/around?userId={user.id}&mode=walls&radius={radius}"
+            )
+            assert response.status_code == 200
+            return [entry["username"] for entry in response.json()]
+
+        # Board order: near3 90, near0 70, near2 50, near5 50, near4 30, near1 10
+        assert around(users[2], 1) == ["near0", "near2", "near5"]
+        assert around(users[5], 2) == ["near0", "near2", "near5", "near4", "near1"]
+        assert around(users[3], 2) == ["near3", "near0", "near2"]
+        assert around(users[1], 0) == ["near1"]
+
+        response = client.get(f"{settings.API_V1_STR}/leaderboard/around?userId={users[0].id}&mode=pass-through")
+        assert response.status_code == 404
@@ -2,10 +2,19 @@
 Integration tests for live player endpoints.
 Tests retrieving live players and individual player data during active games.
 """
+import asyncio
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from src.core import live_codec
 from src.core.config import settings
+from src.core.rate_limit import parse_rate_limit
 from src.db import session as db_session
+from src.db.live_store import SharedMemoryLivePlayerStore
 from src.schemas.enums import Direction, GameMode
-from src.schemas.game import LivePlayer, Position
+from src.schemas.game import LivePlayer, LivePlayerDelta, LivePlayerUpdate, Position
 
 
 class TestLivePlayersIntegration:
@@ -316,6 +325,29 @@ class TestLivePlayersIntegration:
         assert len(player["snake"]) == 2
         assert player["isPlaying"] is True
 
+    def test_ping_returns_heartbeat_interval(self, client, auth_headers, monkeypatch):
+        """Test that players nobody is watching are asked to report less often than watched ones."""
+        monkeypatch.setattr(db_session.heartbeat_pacer, "load", lambda: 1.0)
+        update_data = {
+            "score": 10,
+            "mode": "walls",
+            "snake": [{"x": 10, "y": 10}],
+            "food": {"x": 15, "y": 15},
+            "direction": "RIGHT",
+            "isPlaying": True
+        }
+        url = f"{settings.API_V1_STR}/live-players/ping"
+
+        response = client.post(url, json=update_data, headers=auth_headers)
+        assert response.status_code == 204
+        assert int(response.headers["X-Heartbeat-Interval"]) == settings.LIVE_HEARTBEAT_UNWATCHED_INTERVAL_MS
+
+        user_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=auth_headers).json()["id"]
+        with client.websocket_connect(f"{settings.API_V1_STR}/live-players/{user_id}/ws") as spectator:
+            spectator.receive_json()
+            response = client.post(url, json=update_data, headers=auth_headers)
+            assert int(response.headers["X-Heartbeat-Interval"]) == settings.LIVE_HEARTBEAT_INTERVAL_MS
+
     def test_ping_endpoint_requires_authentication(self, client):
         """Test that ping endpoint requires authentication."""
         update_data = {
@@ -334,3 +366,742 @@ class TestLivePlayersIntegration:
         )
 
         assert response.status_code == 401
+
+    def test_websocket_streams_live_status(self, client, auth_headers):
+        """Test that frames sent over the live socket update the player's status."""
+        token = auth_headers["Authorization"].removeprefix("Bearer ")
+        update_data = {
+            "score": 40,
+            "mode": "pass-through",
+            "snake": [{"x": 3, "y": 4}, {"x": 2, "y": 4}],
+            "food": {"x": 9, "y": 9},
+            "direction": "RIGHT",
+            "isPlaying": True
+        }
+
+        with client.websocket_connect(f"{settings.API_V1_STR}/live-players/ws?token={token}") as ws:
+            ws.send_json(update_data)
+            ws.send_json({**update_data, "score": 50})
+
+            # An invalid frame is rejected without closing the socket
+            ws.send_text('{"score": "lots"}')
+            assert ws.receive_json()["error"] == "Invalid frame"
+
+            response = client.get(f"{settings.API_V1_STR}/live-players")
+            data = response.json()
+            assert len(data) == 1
+            assert data[0]["username"] == "testuser"
+            assert data[0]["score"] == 50
+            assert data[0]["mode"] == "pass-through"
+
+        # Closing the socket takes the player out of the live list
+        response = client.get(f"{settings.API_V1_STR}/live-players")
+        assert response.json() == []
+
+    def test_websocket_closes_after_logout(self, client, auth_headers):
+        """Test that a live socket stops accepting frames once its token is revoked."""
+        token = auth_headers["Authorization"].removeprefix("Bearer ")
+        update_data = {
+            "score": 40,
+            "mode": "walls",
+            "snake": [{"x": 3, "y": 4}],
+            "food": {"x": 9, "y": 9},
+            "direction": "RIGHT",
+            "isPlaying": True
+        }
+
+        with client.websocket_connect(f"{settings.API_V1_STR}/live-players/ws?token={token}") as ws:
+            ws.send_json(update_data)
+            ws.send_text('{"score": "lots"}')
+            assert ws.receive_json()["error"] == "Invalid frame"
+            assert len(client.get(f"{settings.API_V1_STR}/live-players").json()) == 1
+
+            response = client.post(f"{settings.API_V1_STR}/auth/logout", headers=auth_headers)
+            assert response.status_code == 204
+
+            ws.send_json({**update_data, "score": 50})
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+            assert exc_info.value.code == 1008
+
+        assert client.get(f"{settings.API_V1_STR}/live-players").json() == []
+
+    def test_websocket_frames_are_rate_limited(self, client, auth_headers):
+        """Test that live socket frames spend from the same bucket as POST /ping."""
+        token = auth_headers["Authorization"].removeprefix("Bearer ")
+        limit = parse_rate_limit(settings.RATE_LIMIT_PING)
+        update_data = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 3, "y": 4}],
+            "food": {"x": 9, "y": 9},
+            "direction": "RIGHT",
+            "isPlaying": True
+        }
+
+        with client.websocket_connect(f"{settings.API_V1_STR}/live-players/ws?token={token}") as ws:
+            for score in range(limit.capacity):
+                ws.send_json({**update_data, "score": score})
+            ws.send_json({**update_data, "score": 1000})
+            error = ws.receive_json()
+            assert error["error"] == "Too many requests"
+            assert error["retryAfter"] >= 1
+
+            # The dropped frame wasn't applied, and the bucket is shared with POST /ping
+            assert client.get(f"{settings.API_V1_STR}/live-players").json()[0]["score"] == limit.capacity - 1
+            response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=update_data, headers=auth_headers)
+            assert response.status_code == 429
+
+    def test_websocket_rejects_invalid_token(self, client):
+        """Test that the live socket refuses connections with a bad token."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(f"{settings.API_V1_STR}/live-players/ws?token=bogus") as ws:
+                ws.receive_text()
+
+        assert exc_info.value.code == 1008
+
+    def test_spectator_socket_receives_pushed_frames(self, client):
+        """Test that spectators get the current state and then every update pushed to them."""
+        player = LivePlayer(
+            id="streamer",
+            username="streamer",
+            score=10,
+            mode=GameMode.walls,
+            snake=[Position(x=1, y=1)],
+            food=Position(x=5, y=5),
+            direction=Direction.RIGHT,
+            isPlaying=True
+        )
+        db_session.update_live_player(player)
+
+        url = f"{settings.API_V1_STR}/live-players/streamer/ws"
+        with client.websocket_connect(url) as first, client.websocket_connect(url) as second:
+            assert first.receive_json()["score"] == 10
+            assert second.receive_json()["score"] == 10
+
+            db_session.update_live_player(player.model_copy(update={"score": 20}))
+            assert first.receive_json()["score"] == 20
+            assert second.receive_json()["score"] == 20
+
+            # The stream ends when the player leaves
+            db_session.remove_live_player("streamer")
+            with pytest.raises(WebSocketDisconnect):
+                first.receive_json()
+
+    def test_spectator_socket_unknown_player(self, client):
+        """Test that spectating a player who isn't live is refused."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(f"{settings.API_V1_STR}/live-players/nobody/ws") as ws:
+                ws.receive_text()
+
+        assert exc_info.value.code == 4404
+
+    def test_delta_ping_applies_to_keyframe(self, client, auth_headers):
+        """Test that delta frames move the stored snake without resending it."""
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 3, "y": 5}, {"x": 2, "y": 5}, {"x": 1, "y": 5}],
+            "food": {"x": 8, "y": 5},
+            "direction": "RIGHT",
+            "isPlaying": True,
+            "seq": 1
+        }
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=keyframe, headers=auth_headers)
+        assert response.status_code == 204
+
+        # Move two cells right
+        delta = {
+            "seq": 2,
+            "score": 0,
+            "direction": "RIGHT",
+            "isPlaying": True,
+            "heads": [{"x": 5, "y": 5}, {"x": 4, "y": 5}],
+            "tailDrop": 2
+        }
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+        assert response.status_code == 204
+
+        # Eat the food: grow by one and move the food
+        delta = {
+            "seq": 3,
+            "score": 10,
+            "direction": "RIGHT",
+            "isPlaying": True,
+            "heads": [{"x": 6, "y": 5}],
+            "food": {"x": 0, "y": 0}
+        }
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+        assert response.status_code == 204
+
+        player = client.get(f"{settings.API_V1_STR}/live-players").json()[0]
+        assert player["seq"] == 3
+        assert player["score"] == 10
+        assert player["snake"] == [{"x": 6, "y": 5}, {"x": 5, "y": 5}, {"x": 4, "y": 5}, {"x": 3, "y": 5}]
+        assert player["food"] == {"x": 0, "y": 0}
+
+    def test_delta_ping_out_of_sequence(self, client, auth_headers):
+        """Test that a gap in sequence numbers asks the client for a keyframe."""
+        delta = {"seq": 1, "score": 0, "direction": "UP", "isPlaying": True, "heads": [{"x": 1, "y": 1}]}
+
+        # No keyframe yet
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+        assert response.status_code == 409
+
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 1, "y": 2}],
+            "food": {"x": 8, "y": 5},
+            "direction": "UP",
+            "isPlaying": True,
+            "seq": 1
+        }
+        client.post(f"{settings.API_V1_STR}/live-players/ping", json=keyframe, headers=auth_headers)
+
+        # Frame 2 was lost
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping/delta",
+            json={**delta, "seq": 3},
+            headers=auth_headers
+        )
+        assert response.status_code == 409
+
+    def test_delta_ping_rejects_snake_past_segment_limit(self, client, auth_headers):
+        """Test that a delta growing the snake past the frame's segment count is a client error."""
+        update = LivePlayerUpdate.model_construct(
+            score=0,
+            mode=GameMode.walls,
+            snake=[Position(x=1, y=1)] * live_codec.MAX_SEGMENTS,
+            food=Position(x=2, y=2),
+            direction=Direction.UP,
+            isPlaying=True,
+            seq=1
+        )
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping",
+            content=live_codec.encode_update(update),
+            headers={**auth_headers, "Content-Type": live_codec.MEDIA_TYPE}
+        )
+        assert response.status_code == 204
+
+        delta = {"seq": 2, "score": 0, "direction": "UP", "isPlaying": True, "heads": [{"x": 1, "y": 0}]}
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+        assert response.status_code == 422
+        assert client.get(f"{settings.API_V1_STR}/live-players/summary").json()["total"] == 1
+        [player] = live_codec.decode_players(client.get(
+            f"{settings.API_V1_STR}/live-players",
+            headers={"Accept": live_codec.MEDIA_TYPE}
+        ).content)
+        assert player.seq == 1
+
+    def test_websocket_accepts_delta_frames(self, client, auth_headers):
+        """Test that the live socket takes keyframes and deltas interchangeably."""
+        token = auth_headers["Authorization"].removeprefix("Bearer ")
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 1, "y": 1}],
+            "food": {"x": 8, "y": 5},
+            "direction": "DOWN",
+            "isPlaying": True,
+            "seq": 7
+        }
+        delta = {"seq": 8, "score": 0, "direction": "DOWN", "isPlaying": True, "heads": [{"x": 1, "y": 2}], "tailDrop": 1}
+
+        with client.websocket_connect(f"{settings.API_V1_STR}/live-players/ws?token={token}") as ws:
+            ws.send_json(keyframe)
+            ws.send_json(delta)
+            ws.send_json(delta)
+            assert "keyframe" in ws.receive_json()["error"]
+
+            player = client.get(f"{settings.API_V1_STR}/live-players").json()[0]
+            assert player["seq"] == 8
+            assert player["snake"] == [{"x": 1, "y": 2}]
+
+    def test_binary_ping_and_binary_reads(self, client, auth_headers):
+        """Test that live frames can be sent and fetched in the binary encoding."""
+        update = LivePlayerUpdate(
+            score=90,
+            mode=GameMode.walls,
+            snake=[Position(x=7, y=3), Position(x=7, y=4)],
+            food=Position(x=1, y=1),
+            direction=Direction.UP,
+            isPlaying=True,
+            seq=5
+        )
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping",
+            content=live_codec.encode_update(update),
+            headers={**auth_headers, "Content-Type": live_codec.MEDIA_TYPE}
+        )
+        assert response.status_code == 204
+
+        # JSON readers see the same state
+        player = client.get(f"{settings.API_V1_STR}/live-players").json()[0]
+        assert player["snake"] == [{"x": 7, "y": 3}, {"x": 7, "y": 4}]
+        assert player["seq"] == 5
+
+        response = client.get(
+            f"{settings.API_V1_STR}/live-players",
+            headers={"Accept": live_codec.MEDIA_TYPE}
+        )
+        assert response.headers["content-type"] == live_codec.MEDIA_TYPE
+        [decoded] = live_codec.decode_players(response.content)
+        assert decoded.id == player["id"]
+        assert decoded.snake == update.snake
+
+        response = client.get(
+            f"{settings.API_V1_STR}/live-players/{player['id']}",
+            headers={"Accept": live_codec.MEDIA_TYPE}
+        )
+        assert live_codec.decode_player(response.content).score == 90
+        assert response.content == live_codec.encode_record(db_session.live_store.get_record(player["id"]))
+
+        response = client.get(
+            f"{settings.API_V1_STR}/live-players/missing",
+            headers={"Accept": live_codec.MEDIA_TYPE}
+        )
+        assert response.status_code == 404
+
+    def test_binary_ping_rejects_malformed_frame(self, client, auth_headers):
+        """Test that a truncated binary frame is a client error."""
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping",
+            content=b"\x01\x00",
+            headers={**auth_headers, "Content-Type": live_codec.MEDIA_TYPE}
+        )
+        assert response.status_code == 400
+
+    def test_ping_rejects_out_of_range_score_and_seq(self, client, auth_headers):
+        """Test that scores and seqs beyond the 32-bit frame fields are refused before storing."""
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 1, "y": 1}],
+            "food": {"x": 8, "y": 5},
+            "direction": "UP",
+            "isPlaying": True,
+        }
+        for field in ("score", "seq"):
+            response = client.post(
+                f"{settings.API_V1_STR}/live-players/ping",
+                json={**keyframe, field: 2**32},
+                headers=auth_headers
+            )
+            assert response.status_code == 422
+
+        delta = {"seq": 2**32, "score": 0, "direction": "UP", "isPlaying": True}
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+        assert response.status_code == 422
+        assert client.get(f"{settings.API_V1_STR}/live-players").json() == []
+
+    def test_shared_store_is_used_off_the_event_loop(self, client, auth_headers, monkeypatch, tmp_path):
+        """Test that heartbeats and reads touch a blocking store from worker threads only."""
+        on_loop = []
+
+        class RecordingStore(SharedMemoryLivePlayerStore):
+            def _locked(self, exclusive):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(True)
+                except RuntimeError:
+                    on_loop.append(False)
+                return super()._locked(exclusive)
+
+        store = RecordingStore(str(tmp_path / "live"), ttl=10, slots=8, slot_size=256)
+        monkeypatch.setattr(db_session, "live_store", store)
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 1, "y": 1}],
+            "food": {"x": 8, "y": 5},
+            "direction": "UP",
+            "isPlaying": True,
+            "seq": 1,
+        }
+        try:
+            response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=keyframe, headers=auth_headers)
+            assert response.status_code == 204
+            delta = {"seq": 2, "score": 5, "direction": "UP", "isPlaying": True, "heads": [{"x": 1, "y": 0}], "tailDrop": 1}
+            response = client.post(f"{settings.API_V1_STR}/live-players/ping/delta", json=delta, headers=auth_headers)
+            assert response.status_code == 204
+            [player] = client.get(f"{settings.API_V1_STR}/live-players").json()
+            assert client.get(f"{settings.API_V1_STR}/live-players/{player['id']}").json()["score"] == 5
+            assert client.get(f"{settings.API_V1_STR}/live-players/summary").json()["total"] == 1
+
+            assert on_loop and not any(on_loop)
+        finally:
+            store.close()
+
+    def test_ping_reports_full_shared_store(self, client, auth_headers, monkeypatch, tmp_path):
+        """Test that a full shared-memory table answers 503 instead of failing the request."""
+        store = SharedMemoryLivePlayerStore(str(tmp_path / "live"), ttl=10, slots=1, slot_size=256)
+        monkeypatch.setattr(db_session, "live_store", store)
+        db_session.update_live_player(LivePlayer(
+            id="other",
+            username="other",
+            score=0,
+            mode=GameMode.walls,
+            snake=[Position(x=1, y=1)],
+            food=Position(x=2, y=2),
+            direction=Direction.UP,
+            isPlaying=True
+        ))
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 1, "y": 1}],
+            "food": {"x": 8, "y": 5},
+            "direction": "UP",
+            "isPlaying": True,
+        }
+        try:
+            response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=keyframe, headers=auth_headers)
+            assert response.status_code == 503
+        finally:
+            store.close()
+
+    def test_ping_rejects_record_too_large_for_shared_store(self, client, auth_headers, monkeypatch, tmp_path):
+        """Test that a snake too long for a shared-memory slot answers 413."""
+        store = SharedMemoryLivePlayerStore(str(tmp_path / "live"), ttl=10, slots=4, slot_size=128)
+        monkeypatch.setattr(db_session, "live_store", store)
+        keyframe = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": x, "y": 1} for x in range(100)],
+            "food": {"x": 8, "y": 5},
+            "direction": "UP",
+            "isPlaying": True,
+        }
+        try:
+            response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=keyframe, headers=auth_headers)
+            assert response.status_code == 413
+            assert store.records() == []
+        finally:
+            store.close()
+
+    def test_silent_players_expire(self, client):
+        """Test that players who stop sending heartbeats are dropped after the TTL."""
+        def heartbeat(player_id):
+            db_session.update_live_player(LivePlayer(
+                id=player_id,
+                username=player_id,
+                score=0,
+                mode=GameMode.walls,
+                snake=[Position(x=1, y=1)],
+                food=Position(x=2, y=2),
+                direction=Direction.UP,
+                isPlaying=True
+            ))
+
+        ttl = settings.LIVE_PLAYER_TTL_SECONDS
+        heartbeat("quiet")
+        heartbeat("active")
+
+        # Nothing is due yet
+        assert db_session.expire_live_players(now=time.monotonic() + ttl / 2) == 0
+
+        # "active" keeps sending heartbeats, so only "quiet" is past its deadline
+        time.sleep(0.05)
+        cutoff = time.monotonic()
+        heartbeat("active")
+        assert db_session.expire_live_players(now=cutoff + ttl - 0.01) == 1
+
+        response = client.get(f"{settings.API_V1_STR}/live-players")
+        assert [p["id"] for p in response.json()] == ["active"]
+
+    def test_live_summary_tracks_updates(self, client):
+        """Test that the summary follows joins, in-place updates and departures."""
+        def summary():
+            response = client.get(f"{settings.API_V1_STR}/live-players/summary")
+            assert response.status_code == 200
+            return response.json()
+
+        assert summary() == {
+            "total": 0,
+            "playing": 0,
+            "byMode": {"walls": 0, "pass-through": 0},
+            "topScore": None
+        }
+
+        for i, (mode, score) in enumerate([(GameMode.walls, 300), (GameMode.walls, 120), (GameMode.pass_through, 80)]):
+            db_session.update_live_player(LivePlayer(
+                id=f"s{i}",
+                username=f"s{i}",
+                score=score,
+                mode=mode,
+                snake=[Position(x=1, y=1)],
+                food=Position(x=2, y=2),
+                direction=Direction.UP,
+                isPlaying=True,
+                seq=1
+            ))
+
+        assert summary() == {
+            "total": 3,
+            "playing": 3,
+            "byMode": {"walls": 2, "pass-through": 1},
+            "topScore": 300
+        }
+
+        # The leader's game ends and a delta raises someone else's score in place
+        db_session.remove_live_player("s0")
+        db_session.apply_live_player_delta("s2", LivePlayerDelta(
+            seq=2, score=150, direction=Direction.UP, isPlaying=False
+        ))
+
+        assert summary() == {
+            "total": 2,
+            "playing": 1,
+            "byMode": {"walls": 1, "pass-through": 1},
+            "topScore": 150
+        }
+
+    def test_live_players_etag(self, client):
+        """Test that unchanged live lists are answered with 304 and changes move the ETag."""
+        url = f"{settings.API_V1_STR}/live-players"
+        player = LivePlayer(
+            id="etag-player",
+            username="etagPlayer",
+            score=1,
+            mode=GameMode.walls,
+            snake=[Position(x=1, y=1)],
+            food=Position(x=2, y=2),
+            direction=Direction.UP,
+            isPlaying=True
+        )
+        db_session.update_live_player(player)
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        assert first.json()[0]["id"] == "etag-player"
+        assert client.get(url).content == first.content
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        # The binary representation has its own tag
+        response = client.get(url, headers={"If-None-Match": etag, "Accept": live_codec.MEDIA_TYPE})
+        assert response.status_code == 200
+
+        db_session.update_live_player(player.model_copy(update={"score": 2}))
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["score"] == 2
+
+    def test_live_players_filters_and_pages(self, client):
+        """Test filtering by mode and playing state and paging through players by score."""
+        url = f"{settings.API_V1_STR}/live-players"
+        for player_id, score, mode, playing in [
+            ("f1", 40, GameMode.walls, True),
+            ("f2", 90, GameMode.walls, True),
+            ("f3", 70, GameMode.pass_through, True),
+            ("f4", 60, GameMode.walls, False),
+            ("f5", 20, GameMode.walls, True),
+        ]:
+            db_session.update_live_player(LivePlayer(
+                id=player_id,
+                username=player_id,
+                score=score,
+                mode=mode,
+                snake=[Position(x=1, y=1)],
+                food=Position(x=2, y=2),
+                direction=Direction.UP,
+                isPlaying=playing
+            ))
+
+        response = client.get(url, params={"mode": "walls", "playing": True, "sort": "score"})
+        assert [player["id"] for player in response.json()] == ["f2", "f1", "f5"]
+        assert "x-next-cursor" not in response.headers
+
+        pages = []
+        params = {"sort": "score", "limit": 2}
+        while True:
+            response = client.get(url, params=params)
+            assert response.status_code == 200
+            pages.append([player["id"] for player in response.json()])
+            if "x-next-cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["x-next-cursor"]
+        assert pages == [["f2", "f3"], ["f4", "f1"], ["f5"]]
+
+        # Without sort=score a page is ordered by ID
+        response = client.get(url, params={"limit": 2, "playing": False})
+        assert [player["id"] for player in response.json()] == ["f4"]
+
+        response = client.get(url, params={"sort": "score", "cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        response = client.get(url, params={"limit": 0})
+        assert response.status_code == 422
+
+    def test_live_top_scores(self, client):
+        """Test the live leaderboard lists only players in a game, best first, per mode."""
+        url = f"{settings.API_V1_STR}/live-players/top"
+        for player_id, score, mode, playing in [
+            ("t1", 40, GameMode.walls, True),
+            ("t2", 90, GameMode.walls, True),
+            ("t3", 70, GameMode.pass_through, True),
+            ("t4", 95, GameMode.walls, False),
+            ("t5", 60, GameMode.walls, True),
+        ]:
+            db_session.update_live_player(LivePlayer(
+                id=player_id,
+                username=f"user-{player_id}",
+                score=score,
+                mode=mode,
+                snake=[Position(x=1, y=1)],
+                food=Position(x=2, y=2),
+                direction=Direction.UP,
+                isPlaying=playing
+            ))
+
+        response = client.get(url, params={"limit": 2})
+        assert response.status_code == 200
+        assert response.json() == {
+            "walls": [
+                {"id": "t2", "username": "user-t2", "score": 90},
+                {"id": "t5", "username": "user-t5", "score": 60},
+            ],
+            "pass-through": [{"id": "t3", "username": "user-t3", "score": 70}],
+        }
+
+        # Score changes reorder the board on the next read
+        db_session.apply_live_player_delta("t1", LivePlayerDelta(
+            seq=1, score=120, direction=Direction.UP, isPlaying=True
+        ))
+        walls = client.get(url, params={"limit": 2}).json()["walls"]
+        assert [entry["id"] for entry in walls] == ["t1", "t2"]
+
+    def test_live_player_frame_replay(self, client, auth_headers):
+        """Test fetching the frames a spectator missed, as JSON and binary."""
+        user_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=auth_headers).json()["id"]
+        url = f"{settings.API_V1_STR}/live-players/{user_id}/frames"
+
+        status_update = {
+            "score": 0,
+            "mode": "walls",
+            "snake": [{"x": 5, "y": 5}],
+            "food": {"x": 9, "y": 9},
+            "direction": "RIGHT",
+            "isPlaying": True,
+            "seq": 0
+        }
+        client.post(f"{settings.API_V1_STR}/live-players/ping", json=status_update, headers=auth_headers)
+        for seq in range(1, 4):
+            response = client.post(
+                f"{settings.API_V1_STR}/live-players/ping/delta",
+                json={"seq": seq, "score": seq * 10, "direction": "RIGHT", "isPlaying": True,
+                      "heads": [{"x": 5 + seq, "y": 5}], "tailDrop": 1},
+                headers=auth_headers
+            )
+            assert response.status_code == 204
+
+        frames = client.get(url).json()
+        assert [frame["seq"] for frame in frames] == [0, 1, 2, 3]
+        assert frames[2]["snake"] == [{"x": 7, "y": 5}]
+
+        response = client.get(url, params={"since": 1}, headers={"Accept": live_codec.MEDIA_TYPE})
+        assert response.headers["content-type"] == live_codec.MEDIA_TYPE
+        assert [frame.score for frame in live_codec.decode_players(response.content)] == [20, 30]
+
+        # Leaving the game drops the history with the player
+        db_session.remove_live_player(user_id)
+        assert client.get(url).status_code == 404
+
+    def test_frame_replay_without_seq(self, client, auth_headers):
+        """Test that heartbeats sent without a seq, as older clients do, all go to the replay history."""
+        user_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=auth_headers).json()["id"]
+        for score in (0, 10, 20):
+            response = client.post(
+                f"{settings.API_V1_STR}/live-players/ping",
+                json={
+                    "score": score,
+                    "mode": "walls",
+                    "snake": [{"x": 5, "y": 5}],
+                    "food": {"x": 9, "y": 9},
+                    "direction": "RIGHT",
+                    "isPlaying": True,
+                },
+                headers=auth_headers
+            )
+            assert response.status_code == 204
+
+        frames = client.get(f"{settings.API_V1_STR}/live-players/{user_id}/frames").json()
+        assert [frame["score"] for frame in frames] == [0, 10, 20]
+
+    def test_batch_of_unnumbered_frames(self, client, auth_headers):
+        """Test that a batch sent without seqs keeps every frame for replay and stores the last."""
+        user_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=auth_headers).json()["id"]
+        batch = [
+            {
+                "score": score,
+                "mode": "walls",
+                "snake": [{"x": 5, "y": 5}],
+                "food": {"x": 9, "y": 9},
+                "direction": "RIGHT",
+                "isPlaying": True,
+            }
+            for score in (10, 20, 30)
+        ]
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=batch, headers=auth_headers)
+        assert response.status_code == 204
+
+        assert client.get(f"{settings.API_V1_STR}/live-players/{user_id}").json()["score"] == 30
+        frames = client.get(f"{settings.API_V1_STR}/live-players/{user_id}/frames").json()
+        assert [frame["score"] for frame in frames] == [10, 20, 30]
+
+    def test_batched_ping(self, client, auth_headers):
+        """Test that a batch of buffered frames applies the newest and keeps the rest for replay."""
+        user_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=auth_headers).json()["id"]
+
+        def frame(seq: int) -> dict:
+            return {
+                "score": seq * 10,
+                "mode": "pass-through",
+                "snake": [{"x": seq, "y": 3}],
+                "food": {"x": 9, "y": 9},
+                "direction": "RIGHT",
+                "isPlaying": True,
+                "seq": seq
+            }
+
+        # Frames can arrive out of order; the highest seq wins
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping",
+            json=[frame(1), frame(3), frame(2)],
+            headers=auth_headers
+        )
+        assert response.status_code == 204
+
+        player = client.get(f"{settings.API_V1_STR}/live-players/{user_id}").json()
+        assert (player["seq"], player["score"]) == (3, 30)
+        frames = client.get(f"{settings.API_V1_STR}/live-players/{user_id}/frames").json()
+        assert [frame["seq"] for frame in frames] == [1, 2, 3]
+
+        # A late or retried batch neither rewinds the live state nor restarts the replay
+        for seq in range(4, 11):
+            client.post(f"{settings.API_V1_STR}/live-players/ping", json=frame(seq), headers=auth_headers)
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=[frame(8), frame(9)], headers=auth_headers)
+        assert response.status_code == 204
+        assert client.get(f"{settings.API_V1_STR}/live-players/{user_id}").json()["seq"] == 10
+        frames = client.get(f"{settings.API_V1_STR}/live-players/{user_id}/frames").json()
+        assert [frame["seq"] for frame in frames] == list(range(1, 11))
+
+        # Once the game is over, a new one may number its frames from 1 again
+        client.post(f"{settings.API_V1_STR}/live-players/ping", json={**frame(11), "isPlaying": False}, headers=auth_headers)
+        client.post(f"{settings.API_V1_STR}/live-players/ping", json=frame(1), headers=auth_headers)
+        assert client.get(f"{settings.API_V1_STR}/live-players/{user_id}").json()["seq"] == 1
+        frames = client.get(f"{settings.API_V1_STR}/live-players/{user_id}/frames").json()
+        assert [frame["seq"] for frame in frames] == [1]
+
+        response = client.post(f"{settings.API_V1_STR}/live-players/ping", json=[], headers=auth_headers)
+        assert response.status_code == 422
+        response = client.post(
+            f"{settings.API_V1_STR}/live-players/ping",
+            json=[frame(4)] * (settings.LIVE_PING_MAX_FRAMES + 1),
+            headers=auth_headers
+        )
+        assert response.status_code == 422
@@ -1,31 +1,157 @@
-from typing import Annotated
+import math
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Literal
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from anyio import to_thread
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from src.core.config import settings
+from src.core.rate_limit import RateLimit, create_rate_limiter, parse_rate_limit
+from src.core.revocation import create_revocation_list
 from src.core.security import oauth2_scheme
+from src.core.token_cache import TokenCache
 from src.db import session as db_session
+from src.db.async_session import run_db
 from src.db.database import get_db
 from src.schemas.user import User
 
+# Verified tokens, so heartbeats don't hit the database to authenticate
+auth_cache = TokenCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+# Token IDs revoked by logout, kept until the token would have expired anyway
+token_revocations = create_revocation_list()
+
+# Token buckets for the routes a single client could use to exhaust capacity
+rate_limiter = create_rate_limiter()
+
+
+def get_cached_user(token: str) -> User | None:
+    """
+    Resolve a bearer token from the cache alone.
+    Returns None on a cache miss or if the token has been revoked.
+    """
+    cached = auth_cache.get(token)
+    if cached is None or token_revocations.is_revoked(cached.token_id):
+        return None
+    return cached.user
+
+
+def get_user_from_token(token: str, db: Session) -> User | None:
+    """
+    Resolve a bearer token to its user.
+    Returns None if the token is invalid or revoked, or the user no longer exists.
+    """
+    user = get_cached_user(token)
+    if user is not None:
+        return user
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except jwt.PyJWTError as e:
-        raise credentials_exception from e
+    except jwt.PyJWTError:
+        return None
 
+    email: str | None = payload.get("sub")
+    token_id: str | None = payload.get("jti")
+    if email is None or token_revocations.is_revoked(token_id):
+        return None
     user = db_session.get_user_by_email(db, email)
+    if user is not None:
+        auth_cache.put(token, user, payload.get("exp"), token_id)
+    return user
+
+
+def revoke_token(token: str) -> None:
+    """
+    Revoke a token until its exp and drop it from the cache.
+    Tokens issued without a jti can't be revoked and stay valid until they expire.
+    """
+    auth_cache.invalidate_token(token)
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return
+    token_id = payload.get("jti")
+    if token_id is not None and "exp" in payload:
+        token_revocations.revoke(token_id, payload["exp"])
+
+
+async def is_token_current(token: str) -> bool:
+    """
+    Whether a token accepted earlier is still good: unexpired and not
+    revoked since. For connections that authenticate once and stay open.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    if token_revocations.blocking:
+        revoked = await to_thread.run_sync(token_revocations.is_revoked, payload.get("jti"))
+    else:
+        revoked = token_revocations.is_revoked(payload.get("jti"))
+    return not revoked
+
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_db)]) -> User:
+    # Cache hits are answered on the event loop, unless checking for revocation
+    # is a network round trip; only misses need a DB thread
+    if token_revocations.blocking:
+        user = await to_thread.run_sync(get_cached_user, token)
+    else:
+        user = get_cached_user(token)
     if user is None:
-        raise credentials_exception
+        user = await run_db(get_user_from_token, token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
+
+
+def user_rate_limit_key(scope: str, user_id: str) -> str:
+    return f"{scope}:user:{user_id}"
+
+
+async def acquire_rate_limit(key: str, limit: RateLimit) -> float:
+    """
+    Spend one token from the bucket for `key`.
+    Returns 0 if the request may proceed, otherwise the seconds until it could.
+    """
+    if rate_limiter.blocking:
+        return await to_thread.run_sync(rate_limiter.acquire, key, limit)
+    return rate_limiter.acquire(key, limit)
+
+
+async def _enforce_rate_limit(key: str, limit: RateLimit) -> None:
+    retry_after = await acquire_rate_limit(key, limit)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def rate_limit(scope: str, limit: str, per: Literal["ip", "user"]) -> Callable[..., Awaitable[None]]:
+    """
+    Build a dependency that spends one token of `limit` ("<requests>/<seconds>")
+    from the caller's bucket for `scope`, answering 429 with Retry-After when
+    it is empty. Buckets are per client IP, or per user for routes that
+    require a login.
+    """
+    parsed = parse_rate_limit(limit)
+
+    if per == "user":
+        async def limit_user(current_user: Annotated[User, Depends(get_current_user)]) -> None:
+            if parsed is not None:
+                await _enforce_rate_limit(user_rate_limit_key(scope, current_user.id), parsed)
+        return limit_user
+
+    async def limit_ip(request: Request) -> None:
+        if parsed is not None:
+            host = request.client.host if request.client else "unknown"
+            await _enforce_rate_limit(f"{scope}:ip:{host}", parsed)
+    return limit_ip
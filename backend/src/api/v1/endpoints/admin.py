@@ -3,9 +3,11 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from src.api.deps import auth_cache
 from src.api.v1.endpoints.auth import get_current_user
 from src.db.database import get_db
 from src.db.models import LeaderboardEntry, User
+from src.db.session import leaderboard_cache, rank_index
 from src.schemas import user as user_schema
 
 router = APIRouter()
@@ -87,4 +89,8 @@ def delete_user(
         )
     db.delete(user)
     db.commit()
+    auth_cache.invalidate_user(user_id)
+    # Their scores were deleted with them
+    leaderboard_cache.invalidate()
+    rank_index.discard(user_id)
     return {"status": "success", "message": "User deleted"}
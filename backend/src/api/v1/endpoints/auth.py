@@ -1,29 +1,36 @@
 from datetime import timedelta
 from typing import Annotated
 
+from anyio import to_thread
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from src.core.config import settings
-from src.core.security import create_access_token, get_password_hash, verify_password
-from src.db import session as db_session
+from src.core.security import create_access_token, oauth2_scheme, password_pool
+from src.db import async_session as db_async
 from src.db.database import get_db
 from src.schemas.auth import AuthCredentials, AuthResponse
 from src.schemas.user import User
 
 router = APIRouter()
 
-from src.api.deps import get_current_user
+from src.api.deps import get_current_user, rate_limit, revoke_token, token_revocations
 
 
-@router.post("/login", response_model=AuthResponse)
+@router.post(
+    "/login",
+    response_model=AuthResponse,
+    dependencies=[Depends(rate_limit("login", settings.RATE_LIMIT_LOGIN, per="ip"))],
+)
 async def login(credentials: AuthCredentials, db: Annotated[Session, Depends(get_db)]):
-    user = db_session.get_user_by_email(db, credentials.email)
-    if not user:
+    found = await db_async.get_user_credentials(db, credentials.email)
+    if not found:
+        # Unknown emails cost the same bcrypt time as a wrong password
+        await password_pool.verify_dummy(credentials.password)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    hashed_password = db_session.get_password_hash(db, user.id)
-    if not verify_password(credentials.password, hashed_password):
+    user, hashed_password = found
+    if not await password_pool.verify(credentials.password, hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -33,15 +40,20 @@ async def login(credentials: AuthCredentials, db: Annotated[Session, Depends(get
 
     return AuthResponse(user=user, token=access_token)
 
-@router.post("/signup", response_model=AuthResponse, status_code=201)
+@router.post(
+    "/signup",
+    response_model=AuthResponse,
+    status_code=201,
+    dependencies=[Depends(rate_limit("signup", settings.RATE_LIMIT_SIGNUP, per="ip"))],
+)
 async def signup(credentials: AuthCredentials, db: Annotated[Session, Depends(get_db)]):
-    if db_session.get_user_by_email(db, credentials.email):
+    if await db_async.get_user_by_email(db, credentials.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(credentials.password)
+    hashed_password = await password_pool.hash(credentials.password)
     username = credentials.username or credentials.email.split("@")[0]
 
-    user = db_session.create_user(db, username, credentials.email, hashed_password)
+    user = await db_async.create_user(db, username, credentials.email, hashed_password)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         subject=user.email, expires_delta=access_token_expires
@@ -50,8 +62,15 @@ async def signup(credentials: AuthCredentials, db: Annotated[Session, Depends(ge
     return AuthResponse(user=user, token=access_token)
 
 @router.post("/logout", status_code=204)
-async def logout(current_user: Annotated[User, Depends(get_current_user)]):
-    pass
+async def logout(
+    current_user: Annotated[User, Depends(get_current_user)],
+    token: Annotated[str, Depends(oauth2_scheme)]
+):
+    """Revoke the token used for this request. Other sessions of the user stay signed in."""
+    if token_revocations.blocking:
+        await to_thread.run_sync(revoke_token, token)
+    else:
+        revoke_token(token)
 
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]):
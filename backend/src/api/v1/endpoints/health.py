@@ -5,6 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from src.core.security import password_pool
+from src.db import async_session as db_async
+from src.db import session as db_session
 from src.db.database import SessionLocal
 
 router = APIRouter()
@@ -44,7 +47,7 @@ async def readiness_check(db: Session = Depends(get_db)):
     """
     try:
         # Check database connection
-        db.execute(text("SELECT 1"))
+        await db_async.run_db(db.execute, text("SELECT 1"))
 
         return {
             "status": "ready",
@@ -56,3 +59,21 @@ async def readiness_check(db: Session = Depends(get_db)):
             status_code=503,
             detail=f"Service not ready: Database connection failed - {str(e)}"
         ) from e
+
+
+@router.get("/health/metrics")
+async def metrics():
+    """
+    Load metrics for dashboards and autoscaling.
+
+    password_pool: bcrypt calls running and queued, completed so far and
+    shed with 503 because the pool was saturated.
+    database: DB calls running on worker threads and waiting for one.
+    heartbeat: smoothed event-loop lag, live players and the resulting
+    load factor applied to heartbeat intervals.
+    """
+    return {
+        "password_pool": password_pool.metrics(),
+        "database": db_async.metrics(),
+        "heartbeat": db_session.heartbeat_pacer.metrics()
+    }
@@ -1,31 +1,118 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from src.api.deps import rate_limit
+from src.core.config import settings
+from src.core.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from src.db import async_session as db_async
 from src.db import session as db_session
 from src.db.database import get_db
-from src.schemas.game import GameMode, LeaderboardEntry, ScoreSubmission
+from src.schemas.game import GameMode, LeaderboardEntry, LeaderboardRank, ScoreSubmission
 from src.schemas.user import User
 
 from .auth import get_current_user
 
 router = APIRouter()
 
+def _parse_cursor(cursor: str | None) -> db_session.LeaderboardPosition | None:
+    try:
+        return db_session.parse_leaderboard_key(decode_cursor(cursor)) if cursor else None
+    except (InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+def _page(entries: list[LeaderboardEntry], limit: int, response: Response) -> list[LeaderboardEntry]:
+    """Trim the extra row fetched past `limit`; if there was one, set X-Next-Cursor."""
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(db_session.leaderboard_sort_key(entries[-1]))
+    return entries
+
 @router.get("", response_model=list[LeaderboardEntry])
 async def get_leaderboard(
+    response: Response,
     db: Annotated[Session, Depends(get_db)],
-    mode: GameMode | None = None
+    mode: GameMode | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE)] = settings.LEADERBOARD_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """
+    Best scores first, `limit` entries per page. The X-Next-Cursor header
+    holds the cursor for the next page and is absent on the last one.
+    The top LEADERBOARD_CACHE_SIZE entries of each mode are served from memory.
+    """
+    after = _parse_cursor(cursor)
+    # One extra row tells whether there is a next page. The cache is read on
+    # the event loop unless it first checks a shared server for changes
+    if db_session.leaderboard_cache.blocking:
+        entries = await to_thread.run_sync(db_session.get_cached_leaderboard, mode, limit + 1, after)
+    else:
+        entries = db_session.get_cached_leaderboard(mode, limit + 1, after)
+    if entries is None:
+        entries = await db_async.get_leaderboard_page(db, mode, limit + 1, after)
+    return _page(entries, limit, response)
+
+@router.get("/best", response_model=list[LeaderboardEntry])
+async def get_personal_bests(
+    response: Response,
+    db: Annotated[Session, Depends(get_db)],
+    mode: GameMode | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE)] = settings.LEADERBOARD_PAGE_SIZE,
+    cursor: str | None = None,
 ):
-    return db_session.get_leaderboard(db, mode)
+    """
+    Leaderboard of personal bests: each player's best game per mode, so one
+    player can hold at most one place per mode. Paged like GET /leaderboard.
+    """
+    after = _parse_cursor(cursor)
+    entries = await db_async.get_personal_bests(db, mode, limit + 1, after)
+    return _page(entries, limit, response)
 
-@router.post("", response_model=LeaderboardEntry, status_code=201)
+@router.post(
+    "",
+    response_model=LeaderboardEntry,
+    status_code=201,
+    dependencies=[Depends(rate_limit("score", settings.RATE_LIMIT_SCORE, per="user"))],
+)
 async def submit_score(
     submission: ScoreSubmission,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[Session, Depends(get_db)]
 ):
-    return db_session.add_score(db, current_user.id, current_user.username, submission.score, submission.mode)
+    return await db_async.add_score(db, current_user.id, current_user.username, submission.score, submission.mode)
+
+@router.get("/around", response_model=list[LeaderboardEntry])
+async def get_around(
+    userId: str,
+    mode: GameMode,
+    db: Annotated[Session, Depends(get_db)],
+    radius: Annotated[int, Query(ge=0, le=settings.LEADERBOARD_AROUND_MAX_RADIUS)] = 5,
+):
+    """
+    The player's personal best in a mode with up to `radius` players ranked
+    just above and just below, best first, from the personal bests board.
+    """
+    entries = await db_async.get_personal_bests_around(db, userId, mode, radius)
+    if entries is None:
+        raise HTTPException(status_code=404, detail="No score in this mode")
+    return entries
+
+@router.get("/rank", response_model=LeaderboardRank)
+async def get_rank(userId: str, mode: GameMode, db: Annotated[Session, Depends(get_db)]):
+    """
+    A player's place among every player's personal best in a mode, e.g.
+    #1,234 of 80,000. Answered from an in-memory index over score counts.
+    """
+    found = db_session.get_cached_rank(userId, mode)
+    if found is None:
+        # The index may not be built yet
+        found = await db_async.get_user_rank(db, userId, mode)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No score in this mode")
+    rank, score, total = found
+    return LeaderboardRank(userId=userId, mode=mode, score=score, rank=rank, total=total)
 
 @router.get("/high-score")
 async def get_high_score(
@@ -33,5 +120,5 @@ async def get_high_score(
     db: Annotated[Session, Depends(get_db)],
     mode: GameMode | None = None
 ):
-    score = db_session.get_user_high_score(db, userId, mode)
+    score = await db_async.get_user_high_score(db, userId, mode)
     return {"score": score}
@@ -1,48 +1,455 @@
+import asyncio
+import contextlib
+import math
+from collections.abc import Callable
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
 
+from src.api.deps import (
+    acquire_rate_limit,
+    get_current_user,
+    get_user_from_token,
+    is_token_current,
+    rate_limit,
+    user_rate_limit_key,
+)
+from src.core import live_codec
+from src.core.config import settings
+from src.core.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from src.core.live_codec import LivePlayerRecord
+from src.core.rate_limit import parse_rate_limit
 from src.db import session as db_session
-from src.schemas.game import LivePlayer
+from src.db.async_session import run_db
+from src.db.database import get_db
+from src.db.live_store import (
+    LiveRecordTooLargeError,
+    LiveStoreFullError,
+    parse_sort_key,
+    sort_key,
+)
+from src.schemas.game import (
+    GameMode,
+    LiveFrame,
+    LivePlayer,
+    LivePlayerDelta,
+    LivePlayerSummary,
+    LivePlayerUpdate,
+    LiveScoreEntry,
+)
+from src.schemas.user import User
 
 router = APIRouter()
 
-@router.get("", response_model=list[LivePlayer])
-async def get_live_players():
-    return db_session.get_live_players()
+_live_frame_adapter = TypeAdapter(LiveFrame)
+_live_players_adapter = TypeAdapter(list[LivePlayer])
+_live_top_adapter = TypeAdapter(dict[GameMode, list[LiveScoreEntry]])
+_live_update_batch_adapter = TypeAdapter(
+    Annotated[list[LivePlayerUpdate], Field(min_length=1, max_length=settings.LIVE_PING_MAX_FRAMES)]
+)
 
-@router.get("/{id}", response_model=LivePlayer)
-async def get_live_player(id: str):
-    player = db_session.get_live_player(id)
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    return player
+# Encoded live listings by media type and query, with the store version they
+# were built from and their extra response headers
+_snapshot_cache: dict[tuple, tuple[str, bytes, dict[str, str]]] = {}
+_SNAPSHOT_CACHE_SIZE = 256
 
-from typing import Annotated
+KEYFRAME_REQUIRED = "Frame out of sequence, send a keyframe"
 
-from fastapi import Depends
+# Full and delta heartbeats, and frames on the live socket, draw from the same bucket
+_ping_rate_limit = rate_limit("ping", settings.RATE_LIMIT_PING, per="user")
+_ping_limit = parse_rate_limit(settings.RATE_LIMIT_PING)
 
-from src.api.deps import get_current_user
-from src.schemas.game import LivePlayerUpdate
-from src.schemas.user import User
+# /ping reads its body by hand to support both encodings and batches, so describe it for the docs
+_UPDATE_SCHEMA = {
+    key: value
+    for key, value in LivePlayerUpdate.model_json_schema(ref_template="#/components/schemas/{model}").items()
+    if key != "$defs"
+}
+_PING_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "anyOf": [
+                        _UPDATE_SCHEMA,
+                        {
+                            "type": "array",
+                            "items": _UPDATE_SCHEMA,
+                            "minItems": 1,
+                            "maxItems": settings.LIVE_PING_MAX_FRAMES,
+                        },
+                    ]
+                }
+            },
+            live_codec.MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+# Errors a live state write can hit with a valid frame, and their HTTP status
+_STORE_ERRORS = {
+    live_codec.FrameEncodeError: 422,
+    LiveRecordTooLargeError: 413,
+    LiveStoreFullError: 503,
+}
+
+@contextlib.contextmanager
+def _storing_live_state():
+    """Report live store write failures as HTTP errors rather than 500s."""
+    try:
+        yield
+    except tuple(_STORE_ERRORS) as e:
+        raise HTTPException(status_code=_STORE_ERRORS[type(e)], detail=str(e)) from e
+
+def _claim(record: LivePlayerRecord, user: User) -> LivePlayerRecord:
+    record.id = user.id
+    record.username = user.username
+    return record
+
+async def read_live_updates(request: Request) -> list[LivePlayerRecord]:
+    """
+    Parse the keyframes of a heartbeat into records: one binary live frame,
+    or JSON holding one update or an array of buffered updates. Binary
+    frames never go through Position models.
+    """
+    body = await request.body()
+    if live_codec.is_binary(request.headers.get("content-type")):
+        try:
+            return [live_codec.decode_update(body)]
+        except live_codec.FrameDecodeError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    try:
+        if body.lstrip()[:1] == b"[":
+            updates = _live_update_batch_adapter.validate_json(body)
+        else:
+            updates = [LivePlayerUpdate.model_validate_json(body)]
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False)) from e
+    return [LivePlayerRecord.from_update(update) for update in updates]
+
+def _wants_binary(request: Request) -> bool:
+    return live_codec.is_binary(request.headers.get("accept"))
+
+def _encode_page(
+    binary: bool,
+    mode: GameMode | None,
+    playing: bool | None,
+    sort: Literal["score", "id"] | None,
+    limit: int | None,
+    cursor: str | None,
+) -> tuple[bytes, dict[str, str]]:
+    """Encode one page of live players; the next page's cursor goes in X-Next-Cursor."""
+    headers = {}
+    if (mode, playing, sort, limit, cursor) == (None,) * 5:
+        records = db_session.get_live_player_records()
+    else:
+        sort = sort or "id"
+        try:
+            after = parse_sort_key(decode_cursor(cursor), sort) if cursor else None
+        except (InvalidCursorError, ValueError) as e:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+        # One extra row tells whether there is a next page
+        records = db_session.query_live_players(mode, playing, sort, after, limit + 1 if limit else None)
+        if limit is not None and len(records) > limit:
+            records = records[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(sort_key(records[-1], sort))
+
+    if binary:
+        return live_codec.encode_records(records), headers
+    return _live_players_adapter.dump_json([record.to_player() for record in records]), headers
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(
+        candidate.strip().removeprefix("W/") in (etag, "*")
+        for candidate in if_none_match.split(",")
+    )
+
+async def _snapshot_response(
+    request: Request,
+    key: tuple,
+    media_type: str,
+    build: Callable[[], tuple[bytes, dict[str, str]]],
+) -> Response:
+    """
+    Serve a view of the live store that is cached per store version and shared
+    by every poller. build() encodes the body and returns it with any extra
+    headers. Clients sending the ETag back in If-None-Match get a 304 while
+    nothing has changed.
+    """
+    version = await db_session.run_live(db_session.get_live_players_version)
+    etag = f'"{version}-{"bin" if media_type == live_codec.MEDIA_TYPE else "json"}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (media_type, *key)
+    cached = _snapshot_cache.get(key)
+    if cached is not None and cached[0] == version:
+        _, body, extra_headers = cached
+    else:
+        body, extra_headers = await db_session.run_live(build)
+        if key not in _snapshot_cache and len(_snapshot_cache) >= _SNAPSHOT_CACHE_SIZE:
+            del _snapshot_cache[next(iter(_snapshot_cache))]
+        _snapshot_cache[key] = (version, body, extra_headers)
+    return Response(body, media_type=media_type, headers={**headers, **extra_headers})
+
+@router.get(
+    "",
+    response_model=list[LivePlayer],
+    responses={200: {"content": {live_codec.MEDIA_TYPE: {}}}, 304: {"description": "Not modified"}},
+)
+async def get_live_players(
+    request: Request,
+    mode: GameMode | None = None,
+    playing: bool | None = None,
+    sort: Literal["score", "id"] | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=settings.LIVE_PLAYERS_MAX_PAGE_SIZE)] = None,
+    cursor: str | None = None,
+):
+    """
+    Live players, optionally filtered by mode and playing state.
+    sort=score lists the highest scores first; any other query is ordered
+    by player ID. With a limit, the X-Next-Cursor header holds the cursor
+    for the next page and is absent on the last one.
+
+    Encoded pages are cached per store version and shared by every poller;
+    send the ETag back in If-None-Match to get a 304 while nothing has changed.
+    """
+    binary = _wants_binary(request)
+    return await _snapshot_response(
+        request,
+        ("players", mode, playing, sort, limit, cursor),
+        live_codec.MEDIA_TYPE if binary else "application/json",
+        lambda: _encode_page(binary, mode, playing, sort, limit, cursor),
+    )
+
+@router.get("/summary", response_model=LivePlayerSummary)
+async def get_live_player_summary():
+    """
+    Live player counts (total, playing, per mode) and the top live score,
+    without transferring any game state.
+    """
+    return await db_session.run_live(db_session.get_live_player_summary)
+
+@router.get("/top", response_model=dict[GameMode, list[LiveScoreEntry]])
+async def get_live_top_scores(
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=settings.LIVE_PLAYERS_MAX_PAGE_SIZE)] = 10,
+):
+    """
+    Live leaderboard: the highest scores among players currently in a game,
+    per mode. Read from the store's score-ordered views rather than sorted
+    per request, and cached per store version like the full list.
+    """
+    return await _snapshot_response(
+        request,
+        ("top", limit),
+        "application/json",
+        lambda: (_live_top_adapter.dump_json(db_session.get_live_top_scores(limit)), {}),
+    )
+
+@router.websocket("/ws")
+async def live_status_socket(
+    websocket: WebSocket,
+    token: str,
+    db: Annotated[Session, Depends(get_db)]
+):
+    """
+    Streaming alternative to POST /ping.
+    The token is checked at connect; every text frame afterwards is a
+    LivePlayerUpdate keyframe or a LivePlayerDelta for the authenticated user,
+    and every binary frame a keyframe in the live_codec encoding. Frames
+    spend from the same RATE_LIMIT_PING bucket as POST /ping; past it they
+    are dropped with an error message giving retryAfter in seconds. Once the
+    token expires or is revoked by logout, the next frame closes the socket
+    with 1008. Disconnecting removes the player from the live list.
+    """
+    user = await run_db(get_user_from_token, token, db)
+    # Release the pooled connection now, the socket may stay open for hours
+    db.close()
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if not await is_token_current(token):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token expired or revoked")
+                raise WebSocketDisconnect(status.WS_1008_POLICY_VIOLATION)
+            if _ping_limit is not None:
+                retry_after = await acquire_rate_limit(user_rate_limit_key("ping", user.id), _ping_limit)
+                if retry_after > 0:
+                    await websocket.send_json({"error": "Too many requests", "retryAfter": math.ceil(retry_after)})
+                    continue
+            try:
+                if message.get("bytes") is not None:
+                    frame = live_codec.decode_update(message["bytes"])
+                else:
+                    frame = _live_frame_adapter.validate_json(message["text"])
+            except live_codec.FrameDecodeError as e:
+                await websocket.send_json({"error": "Invalid frame", "detail": str(e)})
+                continue
+            except ValidationError as e:
+                await websocket.send_json({"error": "Invalid frame", "detail": e.errors(include_url=False, include_context=False)})
+                continue
+            try:
+                if isinstance(frame, LivePlayerDelta):
+                    if not await db_session.run_live(db_session.apply_live_player_delta, user.id, frame):
+                        await websocket.send_json({"error": KEYFRAME_REQUIRED})
+                else:
+                    if isinstance(frame, LivePlayerUpdate):
+                        frame = LivePlayerRecord.from_update(frame)
+                    await db_session.run_live(db_session.update_live_player_batch, [_claim(frame, user)])
+            except tuple(_STORE_ERRORS) as e:
+                await websocket.send_json({"error": "Frame not stored", "detail": str(e)})
+    except WebSocketDisconnect:
+        await db_session.run_live(db_session.remove_live_player, user.id)
+
+@router.websocket("/{id}/ws")
+async def spectate_live_player(websocket: WebSocket, id: str):
+    """
+    Push stream of a live player's state for spectators.
+    Sends the current state on connect, then every update as it arrives.
+    Slow spectators skip straight to the newest frame instead of queueing.
+    """
+    player = await db_session.run_live(db_session.get_live_player, id)
+    if player is None:
+        await websocket.close(code=4404, reason="Player not found")
+        return
+
+    await websocket.accept()
+    subscription = db_session.live_broadcaster.subscribe(id)
+
+    async def pump():
+        await websocket.send_text(player.model_dump_json())
+        async for frame in subscription:
+            await websocket.send_text(frame)
+        # The player left the live list
+        await websocket.close()
+
+    async def wait_for_disconnect():
+        # Spectators don't send anything; this only watches for the socket closing
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = {asyncio.create_task(pump()), asyncio.create_task(wait_for_disconnect())}
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            with contextlib.suppress(WebSocketDisconnect):
+                task.result()
+    finally:
+        subscription.close()
 
+@router.get(
+    "/{id}/frames",
+    response_model=list[LivePlayer],
+    responses={200: {"content": {live_codec.MEDIA_TYPE: {}}}},
+)
+async def get_live_player_frames(
+    id: str,
+    request: Request,
+    since: Annotated[int | None, Query(ge=0)] = None
+):
+    """
+    A live player's recent frames, oldest first, limited to those with seq
+    above `since`. Lets a spectator catch up on everything missed after a
+    hiccup in one call, or replay the last few seconds. Frames are kept by
+    the worker that received them, up to LIVE_REPLAY_FRAMES per player.
+    """
+    frames = await db_session.run_live(db_session.get_live_player_frames, id, since)
+    if frames is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if _wants_binary(request):
+        return Response(live_codec.join_frames(frames), media_type=live_codec.MEDIA_TYPE)
+    return [live_codec.decode_player(frame) for frame in frames]
+
+@router.get(
+    "/{id}",
+    response_model=LivePlayer,
+    responses={200: {"content": {live_codec.MEDIA_TYPE: {}}}},
+)
+async def get_live_player(id: str, request: Request):
+    if _wants_binary(request):
+        record = await db_session.run_live(db_session.get_live_player_record, id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return Response(live_codec.encode_record(record), media_type=live_codec.MEDIA_TYPE)
+    player = await db_session.run_live(db_session.get_live_player, id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return player
 
-@router.post("/ping", status_code=204)
+
+@router.post(
+    "/ping",
+    status_code=204,
+    openapi_extra=_PING_REQUEST_BODY,
+    dependencies=[Depends(_ping_rate_limit)],
+)
 async def update_live_status(
-    status: LivePlayerUpdate,
-    current_user: Annotated[User, Depends(get_current_user)]
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    frames: Annotated[list[LivePlayerRecord], Depends(read_live_updates)]
 ):
     """
     Update the current user's live game status.
     This acts as a heartbeat for the multiplayer mode.
+    Accepts JSON or, with Content-Type application/x-snake-frame, a binary frame.
+    A JSON array of updates sends several buffered ticks at once: the one
+    with the highest seq becomes the live state and the rest go to the
+    replay history. Frames at or below the seq already applied during a
+    game arrived late and are ignored.
+    The X-Heartbeat-Interval header gives the milliseconds to wait before
+    the next heartbeat: longer when nobody is spectating this player or
+    the server is loaded.
     """
-    player = LivePlayer(
-        id=current_user.id,
-        username=current_user.username,
-        score=status.score,
-        mode=status.mode,
-        snake=status.snake,
-        food=status.food,
-        direction=status.direction,
-        isPlaying=status.isPlaying
-    )
-    db_session.update_live_player(player)
+    with _storing_live_state():
+        await db_session.run_live(
+            db_session.update_live_player_batch,
+            [_claim(frame, current_user) for frame in frames],
+        )
+    response.headers["X-Heartbeat-Interval"] = str(db_session.get_heartbeat_interval_ms(current_user.id))
+
+@router.post("/ping/delta", status_code=204, dependencies=[Depends(_ping_rate_limit)])
+async def update_live_status_delta(
+    response: Response,
+    delta: LivePlayerDelta,
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Incremental heartbeat: new head segments, tail segments dropped and the
+    food position if it changed. Returns 409 when the sequence number doesn't
+    follow the last applied frame; the client should then send a keyframe
+    to /ping. Returns 422 if the snake would grow past 65535 segments.
+    Sets X-Heartbeat-Interval like /ping.
+    """
+    with _storing_live_state():
+        applied = await db_session.run_live(db_session.apply_live_player_delta, current_user.id, delta)
+    if not applied:
+        raise HTTPException(status_code=409, detail=KEYFRAME_REQUIRED)
+    response.headers["X-Heartbeat-Interval"] = str(db_session.get_heartbeat_interval_ms(current_user.id))
@@ -0,0 +1,104 @@
+"""
+In-process fan-out of pre-encoded frames to many subscribers.
+"""
+import asyncio
+from collections import deque
+
+
+class Subscription:
+    """
+    A single subscriber's view of a topic.
+
+    Frames are buffered in a bounded queue; when a slow consumer falls behind,
+    the oldest frames are dropped so the newest one always gets through.
+    """
+
+    def __init__(self, broadcaster: "Broadcaster", topic: str, queue_size: int):
+        self.topic = topic
+        self._broadcaster = broadcaster
+        self._frames: deque[str | bytes] = deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+
+    def _push(self, frame: str | bytes | None) -> None:
+        if frame is None:
+            self._closed = True
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+
+    def deliver(self, frame: str | bytes | None) -> None:
+        """Queue a frame (or None to end the stream) from any thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._push(frame)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._push, frame)
+
+    def close(self) -> None:
+        """Stop receiving frames."""
+        self._broadcaster.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str | bytes:
+        while not self._frames:
+            if self._closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+
+class Broadcaster:
+    """
+    Topic-based publisher. Each frame is encoded once by the caller and the
+    same object is handed to every subscriber of the topic.
+    """
+
+    def __init__(self, queue_size: int = 1):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe to a topic. Must be called from the consuming event loop."""
+        subscription = Subscription(self, topic, self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def has_subscribers(self, topic: str) -> bool:
+        return topic in self._subscribers
+
+    def publish(self, topic: str, frame: str | bytes) -> int:
+        """Send a frame to every subscriber of a topic. Returns the number reached."""
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return 0
+        for subscription in tuple(subscribers):
+            subscription.deliver(frame)
+        return len(subscribers)
+
+    def close_topic(self, topic: str) -> None:
+        """End the stream for every subscriber of a topic."""
+        for subscription in tuple(self._subscribers.pop(topic, ())):
+            subscription.deliver(None)
+
+    def clear(self) -> None:
+        for topic in tuple(self._subscribers):
+            self.close_topic(topic)
@@ -19,6 +19,23 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "mock_secret_key_for_dev_only"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_SIZE: int = 10000  # Verified tokens cached to skip the user lookup, 0 disables
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # Longest a cached user may be stale
+    REVOCATION_BACKEND: str = "memory"  # Where logged-out token IDs live: memory, redis (shared by workers)
+    REVOCATION_URL: str = ""  # redis://host:port/db for the redis backend
+    REVOCATION_BLOOM_BITS: int = 1 << 20  # Bloom filter in front of the memory backend, 0 disables
+    PASSWORD_HASH_WORKERS: int = 4  # Threads running bcrypt
+    PASSWORD_HASH_MAX_IN_FLIGHT: int = 64  # Running plus queued hashes before logins get 503
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1  # Retry-After sent with that 503
+
+    # Rate limiting, as "<requests>/<seconds>" per client; empty disables a limit
+    RATE_LIMIT_LOGIN: str = "10/60"  # POST /auth/login, per IP
+    RATE_LIMIT_SIGNUP: str = "5/60"  # POST /auth/signup, per IP
+    RATE_LIMIT_SCORE: str = "30/60"  # POST /leaderboard, per user
+    RATE_LIMIT_PING: str = "40/10"  # POST /live-players/ping and /ping/delta, per user
+    RATE_LIMIT_BACKEND: str = "memory"  # Where buckets live: memory, redis (shared by workers)
+    RATE_LIMIT_URL: str = ""  # redis://host:port/db for the redis backend
+    RATE_LIMIT_MAX_KEYS: int = 100000  # Buckets the memory backend keeps before dropping the oldest
 
     # CORS
     CORS_ORIGINS: list[str] = [
@@ -38,8 +55,37 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",")]
         return v
 
+    # Leaderboard
+    LEADERBOARD_PAGE_SIZE: int = 50  # Entries returned by GET /leaderboard without a limit
+    LEADERBOARD_MAX_PAGE_SIZE: int = 200  # Largest limit accepted by GET /leaderboard
+    LEADERBOARD_CACHE_SIZE: int = 500  # Top entries per mode served from memory, 0 disables
+    LEADERBOARD_CACHE_BACKEND: str = "memory"  # Invalidation between workers: memory (none), redis
+    LEADERBOARD_CACHE_URL: str = ""  # redis://host:port/db for the redis backend
+    LEADERBOARD_AROUND_MAX_RADIUS: int = 50  # Largest radius accepted by GET /leaderboard/around
+    LEADERBOARD_RANK_MAX_SCORE: int = 100000  # Scores the rank index tells apart; higher ones tie
+    LEADERBOARD_RANK_REBUILD_SECONDS: float = 0  # Reload ranks from the database this often, 0 never (single worker)
+
+    # Live players
+    LIVE_PLAYER_TTL_SECONDS: float = 10.0  # Drop players after this long without a heartbeat
+    LIVE_PLAYER_SWEEP_INTERVAL_SECONDS: float = 1.0
+    LIVE_PLAYERS_MAX_PAGE_SIZE: int = 200  # Largest limit accepted by GET /live-players
+    LIVE_SPECTATOR_QUEUE_SIZE: int = 1  # Frames buffered per spectator before the oldest is dropped
+    LIVE_REPLAY_FRAMES: int = 64  # Recent frames kept per live player for replay, 0 disables
+    LIVE_REPLAY_MAX_BYTES: int = 64 * 1024 * 1024  # Cap on replay frames across all players
+    LIVE_PING_MAX_FRAMES: int = 32  # Updates accepted in one batched POST /live-players/ping
+    LIVE_HEARTBEAT_INTERVAL_MS: int = 500  # Heartbeat interval asked of watched players when not loaded
+    LIVE_HEARTBEAT_UNWATCHED_INTERVAL_MS: int = 2000  # Same for players nobody is spectating
+    LIVE_HEARTBEAT_MAX_INTERVAL_MS: int = 5000  # Longest interval asked under load; keep well below the TTL
+    LIVE_HEARTBEAT_PLAYERS_PER_NODE: int = 2000  # Live players served at the base intervals before they stretch
+    LIVE_HEARTBEAT_LAG_THRESHOLD_MS: float = 25.0  # Event-loop lag at which intervals start to stretch
+    LIVE_STORE_BACKEND: str = "memory"  # memory, shm (workers on one host), redis (any number of nodes)
+    LIVE_STORE_URL: str = ""  # File path for shm, redis://host:port/db for redis
+    LIVE_STORE_SHM_SLOTS: int = 4096  # Maximum concurrent live players with the shm backend
+    LIVE_STORE_SHM_SLOT_BYTES: int = 4096  # Largest encoded player the shm backend can hold
+
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./snake_arena.db"  # Default to SQLite for development
+    DB_MAX_CONCURRENCY: int = 15  # Blocking DB calls run at once; keep within the pool (5 + 10 overflow)
 
     model_config = SettingsConfigDict(
         case_sensitive=True,
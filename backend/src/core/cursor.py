@@ -0,0 +1,30 @@
+"""
+Opaque keyset pagination cursors.
+
+A cursor is the sort key of the last item on a page, JSON encoded and
+base64url wrapped so clients treat it as a token rather than parse it.
+"""
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor can't be decoded."""
+
+
+def encode_cursor(key: tuple) -> str:
+    data = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Return the key values a cursor was made from."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError("Malformed cursor")
+    return values
@@ -0,0 +1,121 @@
+"""
+Bounded history of recent encoded frames per stream, for replay.
+"""
+import threading
+from collections import deque
+
+
+class FrameHistory:
+    """
+    Ring buffer of the most recent frames of each stream, oldest first.
+    Each stream keeps at most `frames_per_stream` frames and all streams
+    together at most `max_bytes` of frame data; past that, the oldest frames
+    overall are dropped first.
+
+    Every frame gets a serial number from a global counter. A queue of
+    (serial, stream) in arrival order finds the globally oldest frame;
+    entries for frames already dropped by a stream's own limit are skipped
+    when they reach the front, and the queue is compacted once stale
+    entries outnumber live ones.
+    """
+
+    def __init__(self, frames_per_stream: int, max_bytes: int):
+        self.frames_per_stream = frames_per_stream
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._streams: dict[str, deque[tuple[int, int, bytes]]] = {}  # serial, seq, frame
+        self._order: deque[tuple[int, str]] = deque()
+        self._serial = 0
+        self._count = 0
+        # Shared live stores are written from worker threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of frames held."""
+        return self._count
+
+    def append(self, stream: str, seq: int, frame: bytes) -> None:
+        """
+        Record a frame. A sequence number that doesn't move forward starts a
+        new run (a new game), so the stream's older frames are dropped.
+        Sequence number 0 means the sender doesn't number its frames; those
+        are kept in arrival order and never start a new run.
+        """
+        if self.frames_per_stream <= 0 or len(frame) > self.max_bytes:
+            return
+        with self._lock:
+            frames = self._streams.get(stream)
+            if frames is None:
+                frames = self._streams[stream] = deque()
+            elif frames and seq and seq <= frames[-1][1]:
+                self._discard(stream)
+                frames = self._streams[stream] = deque()
+
+            self._serial += 1
+            frames.append((self._serial, seq, frame))
+            self._order.append((self._serial, stream))
+            self.nbytes += len(frame)
+            self._count += 1
+
+            if len(frames) > self.frames_per_stream:
+                self._drop_oldest(stream, frames)
+            while self.nbytes > self.max_bytes:
+                self._evict()
+            if len(self._order) > 2 * self._count + 64:
+                self._order = deque(entry for entry in self._order if self._is_live(*entry))
+
+    def _drop_oldest(self, stream: str, frames: deque[tuple[int, int, bytes]]) -> None:
+        _, _, frame = frames.popleft()
+        self.nbytes -= len(frame)
+        self._count -= 1
+        if not frames:
+            del self._streams[stream]
+
+    def _is_live(self, serial: int, stream: str) -> bool:
+        # Frames only ever leave a stream from the front
+        frames = self._streams.get(stream)
+        return frames is not None and serial >= frames[0][0]
+
+    def _evict(self) -> None:
+        serial, stream = self._order.popleft()
+        frames = self._streams.get(stream)
+        if frames is not None and frames[0][0] == serial:
+            self._drop_oldest(stream, frames)
+
+    def since(self, stream: str, seq: int | None = None) -> list[bytes] | None:
+        """
+        Frames of a stream with a sequence number above `seq` (all of them if
+        None), oldest first. Returns None for a stream with no history.
+        """
+        with self._lock:
+            frames = self._streams.get(stream)
+            if frames is None:
+                return None
+            if seq is None:
+                return [frame for _, _, frame in frames]
+            newer = []
+            for _, frame_seq, frame in reversed(frames):
+                if frame_seq <= seq:
+                    break
+                newer.append(frame)
+        newer.reverse()
+        return newer
+
+    def discard(self, stream: str) -> None:
+        """Forget a stream's frames."""
+        with self._lock:
+            self._discard(stream)
+
+    def _discard(self, stream: str) -> None:
+        frames = self._streams.pop(stream, None)
+        if frames is None:
+            return
+        self.nbytes -= sum(len(frame) for _, _, frame in frames)
+        self._count -= len(frames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._streams.clear()
+            self._order.clear()
+            self.nbytes = 0
+            self._count = 0
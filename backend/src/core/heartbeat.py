@@ -0,0 +1,79 @@
+"""
+Server-chosen heartbeat intervals, so clients back off when this node is busy.
+"""
+import asyncio
+from collections.abc import Awaitable, Callable
+
+
+class HeartbeatPacer:
+    """
+    Picks the interval each player should wait before its next heartbeat.
+
+    Watched players (with at least one spectator) start from `base_ms` and
+    everyone else from `unwatched_ms`. Both are stretched by the node's load:
+    live players beyond `players_per_node`, or event-loop lag beyond
+    `lag_threshold` seconds, scale the interval proportionally, up to
+    `max_ms`. Lag and the player count are sampled by `monitor`, so asking
+    for an interval costs nothing.
+    """
+
+    def __init__(
+        self,
+        base_ms: int,
+        unwatched_ms: int,
+        max_ms: int,
+        players_per_node: int,
+        lag_threshold: float,
+        smoothing: float = 0.2,
+    ):
+        self.base_ms = base_ms
+        self.unwatched_ms = unwatched_ms
+        self.max_ms = max_ms
+        self.players_per_node = players_per_node
+        self.lag_threshold = lag_threshold
+        self.smoothing = smoothing
+        self.loop_lag = 0.0  # Seconds, exponentially smoothed
+        self.live_players = 0
+
+    def load(self) -> float:
+        """How far past capacity this node is; 1 or less means not loaded."""
+        return max(
+            1.0,
+            self.live_players / self.players_per_node if self.players_per_node > 0 else 0.0,
+            self.loop_lag / self.lag_threshold if self.lag_threshold > 0 else 0.0,
+        )
+
+    def interval_ms(self, spectators: int) -> int:
+        base = self.base_ms if spectators else self.unwatched_ms
+        return min(self.max_ms, max(self.base_ms, round(base * self.load())))
+
+    def observe_lag(self, lag: float) -> None:
+        self.loop_lag += self.smoothing * (lag - self.loop_lag)
+
+    async def monitor(
+        self,
+        count_live_players: Callable[[], Awaitable[int]],
+        probe_interval: float = 0.1,
+        count_interval: float = 1.0,
+    ):
+        """
+        Measure event-loop lag as how late a short sleep wakes up, and
+        refresh the live player count every `count_interval` seconds.
+        Runs until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        next_count = loop.time()
+        while True:
+            if loop.time() >= next_count:
+                self.live_players = await count_live_players()
+                next_count = loop.time() + count_interval
+            expected = loop.time() + probe_interval
+            await asyncio.sleep(probe_interval)
+            self.observe_lag(max(0.0, loop.time() - expected))
+
+    def metrics(self) -> dict[str, float | int]:
+        return {
+            "loop_lag_ms": round(self.loop_lag * 1000, 3),
+            "live_players": self.live_players,
+            "load": round(self.load(), 3),
+        }
@@ -0,0 +1,348 @@
+"""
+Compact binary encoding for live player frames.
+
+All integers are little-endian. A frame is a fixed header followed by
+coordinate pairs packed as uint8, or uint16 when any coordinate is above 255
+(FLAG_WIDE). Frames decode to LivePlayerRecord, which keeps coordinates in a
+flat array; Position objects are only built when a record is turned into a
+schema model.
+
+Update frame (client -> server):
+    B version, B mode, B direction, B flags, I score, I seq, H segment count,
+    food x/y, snake x/y * count
+
+Player frame (server -> client):
+    B version, B mode, B direction, B flags, I score, I seq, H segment count,
+    B id length, B username length, id, username, food x/y, snake x/y * count
+
+Player list:
+    I player count, then per player: I frame length, player frame
+"""
+import struct
+from array import array
+
+from ..schemas.enums import Direction, GameMode
+from ..schemas.game import LivePlayer, LivePlayerDelta, LivePlayerUpdate, Position
+
+MEDIA_TYPE = "application/x-snake-frame"
+
+VERSION = 1
+FLAG_PLAYING = 0x01
+FLAG_WIDE = 0x02
+MAX_SEGMENTS = 0xFFFF  # Segment counts are uint16
+
+_UPDATE_HEADER = struct.Struct("<BBBBIIH")
+_PLAYER_HEADER = struct.Struct("<BBBBIIHBB")
+_COUNT = struct.Struct("<I")
+
+_MODES = tuple(GameMode)
+_DIRECTIONS = tuple(Direction)
+_MODE_CODES = {mode: code for code, mode in enumerate(_MODES)}
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(_DIRECTIONS)}
+
+
+class FrameDecodeError(ValueError):
+    """Raised when a binary frame is malformed."""
+
+
+class FrameEncodeError(ValueError):
+    """Raised when a record holds values too large for the binary frame fields."""
+
+
+class LivePlayerRecord:
+    """
+    Compact live player state, used by the live stores and for decoded
+    frames. Coordinates are kept flat: snake holds x0, y0, x1, y1, ... head
+    first. Decoded update frames have an empty id and username until the
+    receiving endpoint fills them in.
+    """
+    __slots__ = ("id", "username", "score", "mode", "direction", "is_playing", "seq", "food_x", "food_y", "snake")
+
+    def __init__(
+        self,
+        id: str,
+        username: str,
+        score: int,
+        mode: GameMode,
+        direction: Direction,
+        is_playing: bool,
+        seq: int,
+        food_x: int,
+        food_y: int,
+        snake: array,
+    ):
+        self.id = id
+        self.username = username
+        self.score = score
+        self.mode = mode
+        self.direction = direction
+        self.is_playing = is_playing
+        self.seq = seq
+        self.food_x = food_x
+        self.food_y = food_y
+        self.snake = snake
+
+    def __repr__(self) -> str:
+        return f"LivePlayerRecord(id={self.id!r}, score={self.score}, seq={self.seq}, segments={len(self)})"
+
+    def __len__(self) -> int:
+        """Number of snake segments."""
+        return len(self.snake) // 2
+
+    @classmethod
+    def from_update(cls, update: LivePlayerUpdate, player_id: str = "", username: str = "") -> "LivePlayerRecord":
+        return cls(
+            id=player_id,
+            username=username,
+            score=update.score,
+            mode=update.mode,
+            direction=update.direction,
+            is_playing=update.isPlaying,
+            seq=update.seq,
+            food_x=update.food.x,
+            food_y=update.food.y,
+            snake=array("H", _flat_snake(update.snake)),
+        )
+
+    @classmethod
+    def from_player(cls, player: LivePlayer) -> "LivePlayerRecord":
+        return cls.from_update(player, player.id, player.username)
+
+    def to_update(self) -> LivePlayerUpdate:
+        return LivePlayerUpdate.model_construct(
+            score=self.score,
+            mode=self.mode,
+            direction=self.direction,
+            isPlaying=self.is_playing,
+            seq=self.seq,
+            food=Position.model_construct(x=self.food_x, y=self.food_y),
+            snake=_positions(self.snake),
+        )
+
+    def to_player(self) -> LivePlayer:
+        return LivePlayer.model_construct(
+            id=self.id,
+            username=self.username,
+            score=self.score,
+            mode=self.mode,
+            direction=self.direction,
+            isPlaying=self.is_playing,
+            seq=self.seq,
+            food=Position.model_construct(x=self.food_x, y=self.food_y),
+            snake=_positions(self.snake),
+        )
+
+    def apply_delta(self, delta: LivePlayerDelta) -> bool:
+        """
+        Apply a delta frame in place. Returns False, leaving the record
+        untouched, if the delta doesn't follow the last applied frame or
+        would leave the snake empty. Raises FrameEncodeError, also leaving
+        it untouched, if the snake would outgrow the frame's segment count.
+        """
+        if delta.seq != self.seq + 1:
+            return False
+        kept = len(self.snake) - 2 * delta.tailDrop
+        if kept < 0 or kept + len(delta.heads) == 0:
+            return False
+        if kept // 2 + len(delta.heads) > MAX_SEGMENTS:
+            raise FrameEncodeError(f"Snake longer than {MAX_SEGMENTS} segments")
+        del self.snake[kept:]
+        if delta.heads:
+            self.snake[:0] = array("H", _flat_snake(delta.heads))
+
+        if delta.food is not None:
+            self.food_x = delta.food.x
+            self.food_y = delta.food.y
+        self.score = delta.score
+        self.direction = delta.direction
+        self.is_playing = delta.isPlaying
+        self.seq = delta.seq
+        return True
+
+
+def is_binary(content_type: str | None) -> bool:
+    """True if a Content-Type or Accept header asks for the binary encoding."""
+    return content_type is not None and MEDIA_TYPE in content_type
+
+
+def _pack_coords(food: tuple[int, int], snake: array | list[int], flags: int) -> tuple[int, bytes]:
+    coords = array("H", food)
+    coords.extend(snake)
+    if coords and max(coords) > 0xFF:
+        return flags | FLAG_WIDE, coords.tobytes()
+    return flags, array("B", coords).tobytes()
+
+
+def _unpack_coords(data: bytes | memoryview, offset: int, count: int, wide: bool) -> array:
+    typecode = "H" if wide else "B"
+    end = offset + count * 2 * (2 if wide else 1)
+    if len(data) != end:
+        raise FrameDecodeError("Frame length doesn't match its segment count")
+    coords = array(typecode)
+    coords.frombytes(data[offset:end])
+    return coords if wide else array("H", coords)
+
+
+def _positions(coords: array) -> list[Position]:
+    return [Position.model_construct(x=coords[i], y=coords[i + 1]) for i in range(0, len(coords), 2)]
+
+
+def _flat_snake(snake: list[Position]) -> list[int]:
+    flat: list[int] = []
+    for segment in snake:
+        flat.append(segment.x)
+        flat.append(segment.y)
+    return flat
+
+
+def _pack_header(header: struct.Struct, *values: int) -> bytes:
+    try:
+        return header.pack(*values)
+    except struct.error as e:
+        raise FrameEncodeError(f"Value out of range for the binary frame: {e}") from None
+
+
+def encode_update(update: LivePlayerUpdate) -> bytes:
+    record = LivePlayerRecord.from_update(update)
+    flags, coords = _pack_coords(
+        (record.food_x, record.food_y),
+        record.snake,
+        FLAG_PLAYING if record.is_playing else 0,
+    )
+    header = _pack_header(
+        _UPDATE_HEADER,
+        VERSION,
+        _MODE_CODES[record.mode],
+        _DIRECTION_CODES[record.direction],
+        flags,
+        record.score,
+        record.seq,
+        len(record),
+    )
+    return header + coords
+
+
+def _check_header(version: int, mode: int, direction: int) -> None:
+    if version != VERSION:
+        raise FrameDecodeError(f"Unsupported frame version {version}")
+    if mode >= len(_MODES) or direction >= len(_DIRECTIONS):
+        raise FrameDecodeError("Unknown mode or direction")
+
+
+def decode_update(data: bytes) -> LivePlayerRecord:
+    """Decode an update frame into a record with an empty id and username."""
+    if len(data) < _UPDATE_HEADER.size:
+        raise FrameDecodeError("Frame too short")
+    version, mode, direction, flags, score, seq, count = _UPDATE_HEADER.unpack_from(data)
+    _check_header(version, mode, direction)
+
+    coords = _unpack_coords(data, _UPDATE_HEADER.size, count + 1, bool(flags & FLAG_WIDE))
+    return LivePlayerRecord(
+        id="",
+        username="",
+        score=score,
+        mode=_MODES[mode],
+        direction=_DIRECTIONS[direction],
+        is_playing=bool(flags & FLAG_PLAYING),
+        seq=seq,
+        food_x=coords[0],
+        food_y=coords[1],
+        snake=coords[2:],
+    )
+
+
+def encode_record(record: LivePlayerRecord) -> bytes:
+    player_id = record.id.encode()
+    username = record.username.encode()
+    flags, coords = _pack_coords(
+        (record.food_x, record.food_y),
+        record.snake,
+        FLAG_PLAYING if record.is_playing else 0,
+    )
+    header = _pack_header(
+        _PLAYER_HEADER,
+        VERSION,
+        _MODE_CODES[record.mode],
+        _DIRECTION_CODES[record.direction],
+        flags,
+        record.score,
+        record.seq,
+        len(record),
+        len(player_id),
+        len(username),
+    )
+    return b"".join((header, player_id, username, coords))
+
+
+def decode_record(data: bytes | memoryview) -> LivePlayerRecord:
+    if len(data) < _PLAYER_HEADER.size:
+        raise FrameDecodeError("Frame too short")
+    version, mode, direction, flags, score, seq, count, id_len, name_len = _PLAYER_HEADER.unpack_from(data)
+    _check_header(version, mode, direction)
+
+    offset = _PLAYER_HEADER.size
+    player_id = bytes(data[offset:offset + id_len]).decode()
+    offset += id_len
+    username = bytes(data[offset:offset + name_len]).decode()
+    offset += name_len
+    coords = _unpack_coords(data, offset, count + 1, bool(flags & FLAG_WIDE))
+    return LivePlayerRecord(
+        id=player_id,
+        username=username,
+        score=score,
+        mode=_MODES[mode],
+        direction=_DIRECTIONS[direction],
+        is_playing=bool(flags & FLAG_PLAYING),
+        seq=seq,
+        food_x=coords[0],
+        food_y=coords[1],
+        snake=coords[2:],
+    )
+
+
+def encode_player(player: LivePlayer) -> bytes:
+    return encode_record(LivePlayerRecord.from_player(player))
+
+
+def decode_player(data: bytes | memoryview) -> LivePlayer:
+    return decode_record(data).to_player()
+
+
+def decode_player_id(data: bytes | memoryview) -> str:
+    """Read only the player ID from a player frame."""
+    if len(data) < _PLAYER_HEADER.size:
+        raise FrameDecodeError("Frame too short")
+    id_len = data[_PLAYER_HEADER.size - 2]
+    return bytes(data[_PLAYER_HEADER.size:_PLAYER_HEADER.size + id_len]).decode()
+
+
+def join_frames(frames: list[bytes]) -> bytes:
+    """Build a player list from already encoded player frames."""
+    parts = [_COUNT.pack(len(frames))]
+    for frame in frames:
+        parts.append(_COUNT.pack(len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
+
+
+def encode_records(records: list[LivePlayerRecord]) -> bytes:
+    return join_frames([encode_record(record) for record in records])
+
+
+def encode_players(players: list[LivePlayer]) -> bytes:
+    return encode_records([LivePlayerRecord.from_player(player) for player in players])
+
+
+def decode_players(data: bytes) -> list[LivePlayer]:
+    view = memoryview(data)
+    if len(view) < _COUNT.size:
+        raise FrameDecodeError("Frame too short")
+    (count,) = _COUNT.unpack_from(view)
+    offset = _COUNT.size
+    players = []
+    for _ in range(count):
+        (length,) = _COUNT.unpack_from(view, offset)
+        offset += _COUNT.size
+        players.append(decode_player(view[offset:offset + length]))
+        offset += length
+    return players
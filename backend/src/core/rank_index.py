@@ -0,0 +1,131 @@
+"""
+Order-statistic index answering "how many players scored more than x".
+"""
+import threading
+from collections.abc import Hashable, Iterable
+
+
+class FenwickTree:
+    """
+    Binary indexed tree of counts over positions 0..size-1: adding to a
+    position and summing a prefix are both O(log size).
+    """
+
+    def __init__(self, size: int, counts: Iterable[int] = ()):
+        self.size = size
+        self._tree = [0] * (size + 1)
+        for position, count in enumerate(counts):
+            self._tree[position + 1] = count
+        # Linear-time build: push each node's sum up to its parent
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, position: int, delta: int) -> None:
+        i = position + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """Sum of the counts at positions below `end`."""
+        total = 0
+        i = min(end, self.size)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class ScoreRankIndex:
+    """
+    Each player's best score on each board (game mode), counted per score
+    in a Fenwick tree so a rank takes O(log max_score) whatever the number
+    of players. Scores above `max_score` share the top position, so ranks
+    among them are ties; negative scores count as 0. Players' current
+    scores are kept to move them when they improve.
+    """
+
+    def __init__(self, max_score: int):
+        self.max_score = max_score
+        self._trees: dict[Hashable, FenwickTree] = {}
+        self._scores: dict[Hashable, dict[str, int]] = {}
+        self.built = False
+        self.generation = 0
+        # add_score runs on database worker threads
+        self._lock = threading.Lock()
+
+    def _position(self, score: int) -> int:
+        return min(max(score, 0), self.max_score)
+
+    def load(self, rows: Iterable[tuple[str, Hashable, int]], generation: int) -> bool:
+        """
+        Replace the whole index with (player, board, score) rows read from
+        the database. `generation` is the value read before the query; if a
+        score was recorded since, the rows may be stale and are dropped.
+        Returns whether they were installed.
+        """
+        scores: dict[Hashable, dict[str, int]] = {}
+        for player_id, board, score in rows:
+            scores.setdefault(board, {})[player_id] = score
+        trees = {}
+        for board, board_scores in scores.items():
+            counts = [0] * (self.max_score + 1)
+            for score in board_scores.values():
+                counts[self._position(score)] += 1
+            trees[board] = FenwickTree(len(counts), counts)
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._scores = scores
+            self._trees = trees
+            self.built = True
+            return True
+
+    def update(self, player_id: str, board: Hashable, score: int) -> None:
+        """Record a score; it only counts if it beats the player's best."""
+        with self._lock:
+            self.generation += 1
+            board_scores = self._scores.setdefault(board, {})
+            previous = board_scores.get(player_id)
+            if previous is not None and score <= previous:
+                return
+            tree = self._trees.get(board)
+            if tree is None:
+                tree = self._trees[board] = FenwickTree(self.max_score + 1)
+            if previous is not None:
+                tree.add(self._position(previous), -1)
+            tree.add(self._position(score), 1)
+            board_scores[player_id] = score
+
+    def discard(self, player_id: str) -> None:
+        """Forget a player on every board."""
+        with self._lock:
+            self.generation += 1
+            for board, board_scores in self._scores.items():
+                score = board_scores.pop(player_id, None)
+                if score is not None:
+                    self._trees[board].add(self._position(score), -1)
+
+    def rank(self, player_id: str, board: Hashable) -> tuple[int, int, int] | None:
+        """
+        (rank, score, players) for a player on a board, or None if they have
+        no score there. Rank is 1 plus the number of players strictly ahead,
+        so equal scores share a rank.
+        """
+        with self._lock:
+            board_scores = self._scores.get(board, {})
+            score = board_scores.get(player_id)
+            if score is None:
+                return None
+            total = len(board_scores)
+            ahead = total - self._trees[board].prefix_sum(self._position(score) + 1)
+            return ahead + 1, score, total
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._trees.clear()
+            self._scores.clear()
+            self.built = False
@@ -0,0 +1,154 @@
+"""
+Token-bucket rate limiting, keyed per client (user ID or IP) and route.
+
+Limits are written as "<requests>/<seconds>": a bucket holds up to
+<requests> tokens and refills at <requests>/<seconds> per second, so a
+client may burst the whole allowance and then continue at the average
+rate. The backend is chosen with RATE_LIMIT_BACKEND:
+
+- memory: buckets in this process (default, single worker)
+- redis: a Redis-protocol server shared by every worker and node
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from .config import settings
+from .resp import RespClient, RespError
+
+
+class RateLimit(NamedTuple):
+    capacity: int  # Bucket size, the largest burst
+    period: float  # Seconds to refill an empty bucket
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.capacity / self.period
+
+
+def parse_rate_limit(value: str) -> RateLimit | None:
+    """Parse "<requests>/<seconds>". An empty value or 0 requests disables the limit."""
+    if not value.strip():
+        return None
+    try:
+        requests, _, seconds = value.partition("/")
+        limit = RateLimit(int(requests), float(seconds or 1))
+    except ValueError:
+        raise ValueError(f"Invalid rate limit: {value!r}") from None
+    if limit.capacity < 0 or limit.period <= 0:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return limit if limit.capacity else None
+
+
+class RateLimiter(ABC):
+    """Interface shared by the rate limiter backends."""
+
+    # True if acquiring makes a network round trip, so async code must not call it on the event loop
+    blocking = False
+
+    @staticmethod
+    def clock() -> float:
+        return time.time()
+
+    @abstractmethod
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Take one token from the bucket for `key`.
+        Returns 0 if the request may proceed, otherwise the seconds until it could.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Each bucket is a single float: the time at which it will be full again
+    (the GCRA form of a token bucket). A request spends one token by moving
+    that time forward by 1/rate, and is refused if it would land more than a
+    period ahead, so refill is implied rather than computed on a timer.
+    Buckets already full are the same as no bucket and are swept out every
+    `sweep_interval` seconds; past `max_keys`, the oldest tenth is dropped.
+    """
+
+    def __init__(self, max_keys: int = 100_000, sweep_interval: float = 60.0):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._full_at: dict[str, float] = {}
+        self._next_sweep = 0.0
+        # Sync dependencies run in the threadpool
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        with self._lock:
+            now = self.clock()
+            if now >= self._next_sweep or len(self._full_at) >= self.max_keys:
+                self._sweep(now)
+            full_at = max(self._full_at.get(key, now), now) + limit.period / limit.capacity
+            if full_at - now > limit.period:
+                return full_at - now - limit.period
+            self._full_at[key] = full_at
+            return 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self.sweep_interval
+        for key in [key for key, full_at in self._full_at.items() if full_at <= now]:
+            del self._full_at[key]
+        if len(self._full_at) >= self.max_keys:
+            for key in list(self._full_at)[:max(1, self.max_keys // 10)]:
+                del self._full_at[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._full_at.clear()
+            self._next_sweep = 0.0
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Shared limits without server-side scripting: the bucket is approximated
+    by a counter per fixed window of one period, admitting `capacity`
+    requests per window. The average rate and the largest burst within a
+    window match the bucket. The counter is created with an expiry and
+    incremented in one round trip, and lapses on its own.
+    """
+
+    blocking = True
+
+    def __init__(self, client: RespClient, prefix: str = "snake-arena:rate:"):
+        self.client = client
+        self.prefix = prefix
+
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        now = self.clock()
+        window = math.floor(now / limit.period)
+        window_end = (window + 1) * limit.period
+        counter = f"{self.prefix}{key}:{window}"
+        ttl_ms = max(1, math.ceil((window_end - now) * 1000))
+        _, count = self.client.pipeline([
+            ("SET", counter, 0, "NX", "PX", ttl_ms),
+            ("INCR", counter),
+        ])
+        if isinstance(count, RespError):
+            raise count
+        return 0.0 if count <= limit.capacity else window_end - now
+
+    def clear(self) -> None:
+        """Nothing is held locally; shared counters lapse on their own."""
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the backend selected by RATE_LIMIT_BACKEND."""
+    backend = settings.RATE_LIMIT_BACKEND
+    if backend == "memory":
+        return InMemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "redis":
+        return RedisRateLimiter(RespClient(settings.RATE_LIMIT_URL or "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
@@ -0,0 +1,121 @@
+"""
+Minimal synchronous client for the Redis serialization protocol (RESP2).
+
+Only what the shared backends need: plain commands and pipelines over a
+single connection. Works with Redis and protocol-compatible servers.
+"""
+import socket
+import threading
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+class RespClient:
+    """
+    Thread-safe client holding one lazily opened connection.
+    URL format: redis://[:password@]host[:port][/db]
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported URL scheme: {parsed.scheme!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._reader = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        if self.password:
+            self._roundtrip([("AUTH", self.password)])
+        if self.db:
+            self._roundtrip([("SELECT", self.db)])
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            elif isinstance(arg, str):
+                data = arg.encode()
+            else:
+                data = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            return RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def _roundtrip(self, commands: list[tuple]) -> list[Any]:
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        return [self._read_reply() for _ in commands]
+
+    def pipeline(self, commands: list[tuple]) -> list[Any]:
+        """
+        Send several commands in one round trip and return their replies.
+        Error replies are returned as RespError instances, not raised.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(commands)
+                except (ConnectionError, OSError):
+                    # Stale connection: reconnect once, then give up
+                    self._disconnect()
+                    if attempt:
+                        raise
+        raise AssertionError("unreachable")
+
+    def execute(self, *args) -> Any:
+        """Run a single command, raising RespError on an error reply."""
+        [reply] = self.pipeline([args])
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
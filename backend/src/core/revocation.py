@@ -0,0 +1,171 @@
+"""
+Revoked access tokens, identified by their jti claim.
+
+A revocation only needs to outlive the token, so every entry expires at
+the token's exp. The backend is chosen with REVOCATION_BACKEND:
+
+- memory: a dict in this process (default, single worker)
+- redis: a Redis-protocol server shared by every worker and node
+"""
+import hashlib
+import heapq
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from .config import settings
+from .resp import RespClient
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Membership tests have no false
+    negatives, so a miss proves a key was never added. Positions come from
+    one 128-bit BLAKE2b digest by double hashing.
+    """
+
+    def __init__(self, bits: int, hashes: int = 4):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str):
+        h1, h2 = struct.unpack("<QQ", hashlib.blake2b(key.encode(), digest_size=16).digest())
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList(ABC):
+    """Interface shared by the revocation backends."""
+
+    # True if checks make a network round trip, so async code must not call them on the event loop
+    blocking = False
+
+    @staticmethod
+    def clock() -> float:
+        return time.time()
+
+    @abstractmethod
+    def revoke(self, token_id: str, expires_at: float) -> None:
+        """Revoke a token until its exp (a UNIX timestamp)."""
+
+    @abstractmethod
+    def is_revoked(self, token_id: str | None) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryRevocationList(RevocationList):
+    """
+    Dict of revoked IDs to their expiry, with a min-heap of expiries so
+    lapsed entries are dropped in order as they come due. An optional
+    Bloom filter answers most lookups for tokens that were never revoked
+    without touching the dict; it is rebuilt once more entries have lapsed
+    than remain, so it doesn't fill up with dead IDs.
+    """
+
+    def __init__(self, bloom_bits: int = 0):
+        self._expiry: dict[str, float] = {}
+        self._deadlines: list[tuple[float, str]] = []
+        self._bloom = BloomFilter(bloom_bits) if bloom_bits else None
+        self._lapsed = 0
+        # Token checks also run on database worker threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def revoke(self, token_id: str, expires_at: float) -> None:
+        with self._lock:
+            now = self.clock()
+            self._purge(now)
+            if expires_at <= now:
+                return
+            self._expiry[token_id] = max(expires_at, self._expiry.get(token_id, 0.0))
+            heapq.heappush(self._deadlines, (expires_at, token_id))
+            if self._bloom is not None:
+                self._bloom.add(token_id)
+
+    def is_revoked(self, token_id: str | None) -> bool:
+        if token_id is None:
+            return False
+        bloom = self._bloom
+        if bloom is not None and token_id not in bloom:
+            return False
+        with self._lock:
+            self._purge(self.clock())
+            return token_id in self._expiry
+
+    def _purge(self, now: float) -> None:
+        while self._deadlines and self._deadlines[0][0] <= now:
+            expires_at, token_id = heapq.heappop(self._deadlines)
+            if self._expiry.get(token_id) == expires_at:
+                del self._expiry[token_id]
+                self._lapsed += 1
+        if self._bloom is not None and self._lapsed > len(self._expiry):
+            # Build the replacement aside; readers check the filter without the lock
+            bloom = BloomFilter(self._bloom.bits, self._bloom.hashes)
+            for token_id in self._expiry:
+                bloom.add(token_id)
+            self._bloom = bloom
+            self._lapsed = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+            self._deadlines.clear()
+            self._lapsed = 0
+            if self._bloom is not None:
+                self._bloom = BloomFilter(self._bloom.bits, self._bloom.hashes)
+
+
+class RedisRevocationList(RevocationList):
+    """
+    Revocations are keys with a server-side expiry at the token's exp, so
+    every worker sees them. Revocations made by this worker are also kept
+    locally and answered without a round trip.
+    """
+
+    blocking = True
+
+    def __init__(self, client: RespClient, prefix: str = "snake-arena:revoked:"):
+        self.client = client
+        self.prefix = prefix
+        self.local = InMemoryRevocationList()
+
+    def revoke(self, token_id: str, expires_at: float) -> None:
+        self.local.revoke(token_id, expires_at)
+        ttl_ms = int((expires_at - self.clock()) * 1000)
+        if ttl_ms > 0:
+            self.client.execute("SET", f"{self.prefix}{token_id}", "1", "PX", ttl_ms)
+
+    def is_revoked(self, token_id: str | None) -> bool:
+        if token_id is None:
+            return False
+        if self.local.is_revoked(token_id):
+            return True
+        return bool(self.client.execute("EXISTS", f"{self.prefix}{token_id}"))
+
+    def clear(self) -> None:
+        """Forget local revocations; shared keys lapse on their own."""
+        self.local.clear()
+
+
+def create_revocation_list() -> RevocationList:
+    """Build the backend selected by REVOCATION_BACKEND."""
+    backend = settings.REVOCATION_BACKEND
+    if backend == "memory":
+        return InMemoryRevocationList(bloom_bits=settings.REVOCATION_BLOOM_BITS)
+    if backend == "redis":
+        return RedisRevocationList(RespClient(settings.REVOCATION_URL or "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown REVOCATION_BACKEND: {backend!r}")
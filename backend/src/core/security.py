@@ -1,5 +1,10 @@
+import asyncio
+import functools
+import secrets
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 import bcrypt
 import jwt
@@ -16,12 +21,92 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
+@functools.cache
+def _dummy_password_hash() -> str:
+    return get_password_hash(secrets.token_urlsafe(16))
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """
+    Spend as long as a real verification would, for logins to emails with
+    no account, so response timing doesn't reveal which emails exist.
+    Always False.
+    """
+    verify_password(plain_password, _dummy_password_hash())
+    return False
+
+T = TypeVar("T")
+
+
+class PasswordPoolBusyError(RuntimeError):
+    """Raised when too many password hashes are already running or queued."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordPool:
+    """
+    Runs bcrypt on a dedicated, fixed-size thread pool so it never blocks
+    the event loop (bcrypt releases the GIL while hashing). At most
+    `max_in_flight` calls may be running or queued; past that, calls fail
+    fast with PasswordPoolBusyError instead of queueing indefinitely.
+    The counters are only touched from the event loop thread.
+    """
+
+    def __init__(self, workers: int, max_in_flight: int, retry_after: int):
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise PasswordPoolBusyError(self.retry_after)
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def verify_dummy(self, plain_password: str) -> bool:
+        return await self.run(verify_dummy_password, plain_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_in_flight=settings.PASSWORD_HASH_MAX_IN_FLIGHT,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # jti identifies the token for revocation on logout
+    to_encode = {"exp": expire, "sub": str(subject), "jti": secrets.token_urlsafe(16)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -0,0 +1,99 @@
+"""
+Sorted collection of unique keys for secondary indexes.
+"""
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from typing import Any
+
+
+class SortedKeyList:
+    """
+    Sorted set of comparable keys kept in bounded buckets, so an insert or
+    removal shifts at most one bucket instead of the whole list. Bucket
+    maxima are kept in a parallel list to find a key's bucket by bisection.
+    """
+
+    def __init__(self, load: int = 512):
+        self._load = load
+        self._buckets: list[list[Any]] = []
+        self._maxes: list[Any] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key: Any) -> bool:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return False
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        return j < len(bucket) and bucket[j] == key
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.irange()
+
+    def add(self, key: Any) -> None:
+        """Insert a key. Adding a key that is already present is a no-op."""
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            bucket = self._buckets[i]
+            bucket.append(key)
+            self._maxes[i] = key
+        else:
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, key)
+            if j < len(bucket) and bucket[j] == key:
+                return
+            bucket.insert(j, key)
+        self._len += 1
+
+        if len(bucket) > 2 * self._load:
+            half = bucket[self._load:]
+            del bucket[self._load:]
+            self._maxes[i] = bucket[-1]
+            self._buckets.insert(i + 1, half)
+            self._maxes.insert(i + 1, half[-1])
+
+    def discard(self, key: Any) -> bool:
+        """Remove a key if present. Returns whether it was."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return False
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            return False
+
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[i]
+            del self._maxes[i]
+        elif j == len(bucket):
+            self._maxes[i] = bucket[-1]
+        return True
+
+    def irange(self, after: Any = None) -> Iterator[Any]:
+        """Keys in ascending order, starting strictly after `after` if given."""
+        i = 0 if after is None else bisect_right(self._maxes, after)
+        if i == len(self._buckets):
+            return
+        first = self._buckets[i]
+        start = 0 if after is None else bisect_right(first, after)
+        yield from first[start:]
+        for bucket in self._buckets[i + 1:]:
+            yield from bucket
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._maxes.clear()
+        self._len = 0
+
@@ -0,0 +1,107 @@
+"""
+Cache of verified bearer tokens, so authenticated requests skip the user lookup.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from ..schemas.user import User
+
+
+class CachedToken(NamedTuple):
+    user: User
+    token_id: str | None  # jti claim, for revocation checks
+
+
+class TokenCache:
+    """
+    Bounded LRU mapping verified tokens to their user.
+
+    Entries are keyed by the token's signature segment and hold the full
+    token, which must match on lookup. An entry expires at the token's exp
+    claim or `max_age` seconds after it was cached, whichever comes first,
+    so changes to a user show up within `max_age`. A reverse index from user
+    ID to keys drops all of a user's tokens at once.
+    """
+
+    def __init__(self, max_size: int, max_age: float):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries: OrderedDict[str, tuple[str, CachedToken, float]] = OrderedDict()  # token, entry, expires at
+        self._by_user: dict[str, set[str]] = {}
+        # Sync endpoints run in the threadpool and may invalidate concurrently
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock() -> float:
+        return time.time()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return token.rpartition(".")[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> CachedToken | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_token, cached, expires_at = entry
+            if cached_token != token:
+                return None
+            if expires_at <= self.clock():
+                self._drop(key, cached.user.id)
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def put(self, token: str, user: User, expires_at: float | None = None, token_id: str | None = None) -> None:
+        """Cache a verified token. `expires_at` is its exp claim as a UNIX timestamp."""
+        if self.max_size <= 0:
+            return
+        key = self._key(token)
+        deadline = self.clock() + self.max_age
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._unindex(key, previous[1].user.id)
+            self._entries[key] = (token, CachedToken(user, token_id), deadline)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key, (_, oldest, _) = self._entries.popitem(last=False)
+                self._unindex(oldest_key, oldest.user.id)
+
+    def _unindex(self, key: str, user_id: str) -> None:
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def _drop(self, key: str, user_id: str) -> None:
+        del self._entries[key]
+        self._unindex(key, user_id)
+
+    def invalidate_token(self, token: str) -> None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._drop(key, entry[1].user.id)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget every cached token of a user."""
+        with self._lock:
+            for key in self._by_user.pop(user_id, ()):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
@@ -0,0 +1,72 @@
+"""
+Awaitable versions of the CRUD operations in session.py
+
+The engine and sessions stay synchronous; each call runs on a worker
+thread so a query never blocks the event loop. A capacity limiter caps
+the calls running at once at DB_MAX_CONCURRENCY, sized to the connection
+pool, so excess requests wait here rather than holding a thread while
+they wait for a connection.
+"""
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable
+
+from anyio import CapacityLimiter, to_thread
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from . import session
+
+logger = get_logger(__name__)
+
+db_limiter = CapacityLimiter(settings.DB_MAX_CONCURRENCY)
+
+async def run_db[**P, T](func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a blocking database call on a worker thread"""
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=db_limiter)
+
+def _threaded[**P, T](func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+def metrics() -> dict[str, int]:
+    """Worker threads in use and callers waiting for one"""
+    statistics = db_limiter.statistics()
+    return {
+        "max_concurrency": int(db_limiter.total_tokens),
+        "in_use": statistics.borrowed_tokens,
+        "waiting": statistics.tasks_waiting,
+    }
+
+create_user = _threaded(session.create_user)
+get_user_by_email = _threaded(session.get_user_by_email)
+get_user_by_id = _threaded(session.get_user_by_id)
+get_password_hash = _threaded(session.get_password_hash)
+get_user_credentials = _threaded(session.get_user_credentials)
+add_score = _threaded(session.add_score)
+get_leaderboard = _threaded(session.get_leaderboard)
+get_leaderboard_page = _threaded(session.get_leaderboard_page)
+get_personal_bests = _threaded(session.get_personal_bests)
+get_personal_bests_around = _threaded(session.get_personal_bests_around)
+get_user_high_score = _threaded(session.get_user_high_score)
+get_user_rank = _threaded(session.get_user_rank)
+
+async def run_rank_index_rebuilder(session_factory: Callable[[], Session]):
+    """
+    Background task that reloads the rank index every LEADERBOARD_RANK_REBUILD_SECONDS,
+    so scores submitted to other workers are counted. A failed reload is
+    logged and retried on the next tick.
+    """
+    def rebuild():
+        with session_factory() as db:
+            session.rebuild_rank_index(db)
+
+    while True:
+        await asyncio.sleep(settings.LEADERBOARD_RANK_REBUILD_SECONDS)
+        try:
+            await run_db(rebuild)
+        except Exception as e:
+            logger.warning(f"Rank index rebuild failed, keeping the previous index: {e}", exc_info=True)
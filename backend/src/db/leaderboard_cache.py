@@ -0,0 +1,191 @@
+"""
+In-process cache of the top leaderboard entries, per game mode and overall.
+
+Warmed from the database (at startup, or on the first read of a mode) and
+then kept current by add_score, so the first pages of GET /leaderboard
+never touch the database. Workers stay coherent through an invalidation
+hook, chosen with LEADERBOARD_CACHE_BACKEND:
+
+- memory: no hook; scores must all be submitted to this process (default, single worker)
+- redis: a generation counter on a Redis-protocol server; a worker that
+  sees another worker's bump drops its cache and rewarms it
+"""
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import UTC, datetime
+
+from ..core.config import settings
+from ..core.resp import RespClient
+from ..schemas.game import GameMode, LeaderboardEntry
+
+LeaderboardPosition = tuple[int, datetime, str]  # score, created at, entry ID
+
+
+def utc_naive(moment: datetime) -> datetime:
+    """
+    The same instant as a naive UTC datetime, the form SQLite returns, so
+    offset-aware and naive times can be compared. Naive times are taken to
+    be UTC already. Raises OverflowError if the instant is out of range.
+    """
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(UTC).replace(tzinfo=None)
+
+
+def _order_key(score: int, created_at: datetime, entry_id: str) -> tuple[int, datetime, str]:
+    # Leaderboard order: highest score first, then earliest, then by ID
+    return (-score, utc_naive(created_at), entry_id)
+
+
+class LeaderboardSync(ABC):
+    """Invalidation hook telling workers when another worker changed the leaderboard."""
+
+    @abstractmethod
+    def publish(self) -> bool:
+        """Announce a change made here. Returns True if others changed it too since last seen."""
+
+    @abstractmethod
+    def changed(self) -> bool:
+        """True if another worker changed the leaderboard since this worker last looked."""
+
+
+class RedisLeaderboardSync(LeaderboardSync):
+    """
+    One shared counter, bumped with INCR on every change. A worker that
+    finds it further along than its own last bump has missed a change.
+    """
+
+    def __init__(self, client: RespClient, key: str = "snake-arena:leaderboard:generation"):
+        self.client = client
+        self.key = key
+        self._seen = None
+        self._lock = threading.Lock()
+
+    def publish(self) -> bool:
+        generation = self.client.execute("INCR", self.key)
+        with self._lock:
+            missed = self._seen is None or generation != self._seen + 1
+            self._seen = generation
+        return missed
+
+    def changed(self) -> bool:
+        generation = int(self.client.execute("GET", self.key) or 0)
+        with self._lock:
+            missed = generation != self._seen
+            self._seen = generation
+        return missed
+
+
+class LeaderboardCache:
+    """
+    The best `size` entries for each mode and for all modes together, in
+    leaderboard order, with their order keys alongside for bisecting. A list
+    shorter than `size` is the whole board. New scores are inserted only if
+    they make the cut. A generation number is bumped on every change, so a
+    warm-up that raced with a new score is discarded rather than installed.
+    """
+
+    def __init__(self, size: int, sync: LeaderboardSync | None = None):
+        self.size = size
+        self.sync = sync
+        self._entries: dict[GameMode | None, list[LeaderboardEntry]] = {}
+        self._keys: dict[GameMode | None, list[tuple[int, datetime, str]]] = {}
+        self.generation = 0
+        # add_score runs on database worker threads
+        self._lock = threading.Lock()
+
+    @property
+    def blocking(self) -> bool:
+        """True if reading a page makes a network round trip to look for other workers' changes."""
+        return self.sync is not None
+
+    def is_warm(self, mode: GameMode | None) -> bool:
+        return mode in self._entries
+
+    def warm(self, mode: GameMode | None, entries: list[LeaderboardEntry], generation: int) -> bool:
+        """
+        Install the top entries read from the database. `generation` is the
+        value read before the query; if anything changed since, the entries
+        may be stale and are dropped. Returns whether they were installed.
+        """
+        entries = entries[:self.size]
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entries[mode] = entries
+            self._keys[mode] = [_order_key(entry.score, entry.createdAt, entry.id) for entry in entries]
+            return True
+
+    def add(self, entry: LeaderboardEntry) -> None:
+        """Record a newly submitted score in every warm list it qualifies for."""
+        key = _order_key(entry.score, entry.createdAt, entry.id)
+        with self._lock:
+            self.generation += 1
+            for mode in (None, GameMode(entry.mode)):
+                entries = self._entries.get(mode)
+                if entries is None:
+                    continue
+                keys = self._keys[mode]
+                if len(entries) >= self.size and key >= keys[-1]:
+                    continue
+                index = bisect_right(keys, key)
+                keys.insert(index, key)
+                entries.insert(index, entry)
+                if len(entries) > self.size:
+                    keys.pop()
+                    entries.pop()
+        if self.sync is not None and self.sync.publish():
+            self._drop()
+
+    def page(
+        self,
+        mode: GameMode | None,
+        limit: int,
+        after: LeaderboardPosition | None = None,
+    ) -> list[LeaderboardEntry] | None:
+        """
+        Up to `limit` entries following `after`, or None if the cache is
+        cold for this mode or the page runs past the cached entries.
+        """
+        if self.sync is not None and self.sync.changed():
+            self._drop()
+        with self._lock:
+            entries = self._entries.get(mode)
+            if entries is None:
+                return None
+            start = 0 if after is None else bisect_right(self._keys[mode], _order_key(*after))
+            if start + limit > len(entries) and len(entries) >= self.size:
+                return None
+            return entries[start:start + limit]
+
+    def invalidate(self) -> None:
+        """
+        Forget everything here and in every other worker, after a change
+        that can't be applied incrementally (such as deleted scores).
+        Each mode is rewarmed on its next read.
+        """
+        self._drop()
+        if self.sync is not None:
+            self.sync.publish()
+
+    def _drop(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys.clear()
+
+    def clear(self) -> None:
+        """Forget everything in this process only."""
+        self._drop()
+
+
+def create_leaderboard_cache() -> LeaderboardCache:
+    """Build the cache with the invalidation hook selected by LEADERBOARD_CACHE_BACKEND."""
+    backend = settings.LEADERBOARD_CACHE_BACKEND
+    if backend == "memory":
+        return LeaderboardCache(settings.LEADERBOARD_CACHE_SIZE)
+    if backend == "redis":
+        client = RespClient(settings.LEADERBOARD_CACHE_URL or "redis://localhost:6379/0")
+        return LeaderboardCache(settings.LEADERBOARD_CACHE_SIZE, RedisLeaderboardSync(client))
+    raise ValueError(f"Unknown LEADERBOARD_CACHE_BACKEND: {backend!r}")
@@ -0,0 +1,663 @@
+"""
+Storage backends for live player state.
+
+Live state is never written to the database. The backend is chosen with
+LIVE_STORE_BACKEND:
+
+- memory: a dict in this process (default, single worker)
+- shm: a memory-mapped file shared by the workers on one host
+- redis: a Redis-protocol server shared by every worker and node
+"""
+import contextlib
+import fcntl
+import heapq
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Literal
+
+from ..core import live_codec
+from ..core.config import settings
+from ..core.live_codec import LivePlayerRecord
+from ..core.resp import RespClient, RespError
+from ..core.sorted_index import SortedKeyList
+from ..schemas.enums import GameMode
+from ..schemas.game import LivePlayer, LivePlayerDelta, LivePlayerSummary
+
+LiveSort = Literal["score", "id"]
+
+
+class LiveStoreFullError(RuntimeError):
+    """Raised when a fixed-capacity backend has no room for another player."""
+
+
+class LiveRecordTooLargeError(ValueError):
+    """Raised when a player's encoded state doesn't fit a fixed-size slot."""
+
+
+def sort_key(record: LivePlayerRecord, sort: LiveSort) -> tuple:
+    """
+    Position of a player in a listing. Scores sort highest first with ties
+    broken by ID, so every key is unique and can serve as a cursor.
+    """
+    if sort == "score":
+        return (-record.score, record.id)
+    return (record.id,)
+
+
+def parse_sort_key(values: list, sort: LiveSort) -> tuple:
+    """Rebuild a sort key from decoded cursor values. Raises ValueError if they don't fit."""
+    if sort == "score":
+        if len(values) == 2 and type(values[0]) is int and isinstance(values[1], str):
+            return tuple(values)
+    elif len(values) == 1 and isinstance(values[0], str):
+        return tuple(values)
+    raise ValueError(f"Cursor doesn't match sort={sort}")
+
+
+class LivePlayerStore(ABC):
+    """
+    Interface shared by all live player backends. Backends hold players as
+    LivePlayerRecord; get() and all() build schema models for the API.
+    """
+
+    # True if calls make a network round trip or take a file lock, so async
+    # code must not make them on the event loop
+    blocking = False
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @staticmethod
+    def clock() -> float:
+        """Time source for last-seen stamps and expiry."""
+        return time.time()
+
+    @abstractmethod
+    def get_record(self, player_id: str) -> LivePlayerRecord | None:
+        ...
+
+    @abstractmethod
+    def records(self) -> list[LivePlayerRecord]:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of live players, without reading their state."""
+
+    @abstractmethod
+    def put_record(self, record: LivePlayerRecord) -> None:
+        """Store a player's state and stamp it as seen now."""
+
+    @abstractmethod
+    def remove(self, player_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def expire(self, now: float | None = None) -> list[str]:
+        """Remove players not seen for longer than the TTL. Returns their IDs."""
+
+    @abstractmethod
+    def version(self) -> str:
+        """
+        Opaque token that changes whenever the set of players or any player's
+        state changes. Tokens from different store instances never collide.
+        """
+
+    def get(self, player_id: str) -> LivePlayer | None:
+        record = self.get_record(player_id)
+        return record.to_player() if record is not None else None
+
+    def all(self) -> list[LivePlayer]:
+        return [record.to_player() for record in self.records()]
+
+    def put(self, player: LivePlayer) -> None:
+        self.put_record(LivePlayerRecord.from_player(player))
+
+    def apply_delta(self, player_id: str, delta: LivePlayerDelta) -> LivePlayerRecord | None:
+        """
+        Apply a delta frame to a stored player and return the updated record.
+        Returns None if the player is unknown or the delta can't be applied
+        (see LivePlayerRecord.apply_delta).
+        """
+        record = self.get_record(player_id)
+        if record is None or not record.apply_delta(delta):
+            return None
+        self.put_record(record)
+        return record
+
+    def query(
+        self,
+        mode: GameMode | None = None,
+        playing: bool | None = None,
+        sort: LiveSort = "id",
+        after: tuple | None = None,
+        limit: int | None = None,
+    ) -> list[LivePlayerRecord]:
+        """
+        Players matching the filters in sort_key order, starting after the
+        key `after`. Backends without indexes filter and sort a full scan.
+        """
+        records = [
+            record for record in self.records()
+            if (mode is None or record.mode == mode)
+            and (playing is None or record.is_playing == playing)
+            and (after is None or sort_key(record, sort) > after)
+        ]
+        records.sort(key=lambda record: sort_key(record, sort))
+        return records[:limit]
+
+    def summary(self) -> LivePlayerSummary:
+        """Counts and top score. Backends without counters derive it from a scan."""
+        records = self.records()
+        by_mode = dict.fromkeys(GameMode, 0)
+        for record in records:
+            by_mode[record.mode] += 1
+        return LivePlayerSummary(
+            total=len(records),
+            playing=sum(record.is_playing for record in records),
+            byMode=by_mode,
+            topScore=max((record.score for record in records), default=None),
+        )
+
+
+class _LiveCounters:
+    """
+    Incrementally maintained summary. What was counted for each player is
+    remembered, so a player changed in place can still be un-counted.
+    The top score comes from a max-heap whose stale entries (scores nobody
+    holds any more) are discarded when they reach the top.
+    """
+
+    def __init__(self):
+        self.counted: dict[str, tuple[GameMode, bool, int]] = {}
+        self.by_mode = dict.fromkeys(GameMode, 0)
+        self.playing = 0
+        self.score_holders: dict[int, int] = {}
+        self.score_heap: list[int] = []  # Negated scores
+
+    def add(self, player_id: str, mode: GameMode, is_playing: bool, score: int):
+        self.discard(player_id)
+        self.counted[player_id] = (mode, is_playing, score)
+        self.by_mode[mode] += 1
+        self.playing += is_playing
+        holders = self.score_holders.get(score, 0)
+        self.score_holders[score] = holders + 1
+        if not holders:
+            heapq.heappush(self.score_heap, -score)
+
+    def discard(self, player_id: str):
+        counted = self.counted.pop(player_id, None)
+        if counted is None:
+            return
+        mode, is_playing, score = counted
+        self.by_mode[mode] -= 1
+        self.playing -= is_playing
+        holders = self.score_holders[score] - 1
+        if holders:
+            self.score_holders[score] = holders
+        else:
+            del self.score_holders[score]
+
+    def top_score(self) -> int | None:
+        heap = self.score_heap
+        while heap and -heap[0] not in self.score_holders:
+            heapq.heappop(heap)
+        return -heap[0] if heap else None
+
+    def summary(self) -> LivePlayerSummary:
+        return LivePlayerSummary(
+            total=len(self.counted),
+            playing=self.playing,
+            byMode=dict(self.by_mode),
+            topScore=self.top_score(),
+        )
+
+
+class _LiveIndexes:
+    """
+    Sorted views of the live players, one per sort order and filter
+    combination: a mode or any mode, playing, idle or either. A player sits
+    in the four views per sort order matching their mode and playing state;
+    a write only touches the views whose membership or key changed.
+    """
+
+    def __init__(self):
+        self.indexed: dict[str, tuple[GameMode, bool, int]] = {}
+        self.views: dict[tuple[GameMode | None, bool | None, LiveSort], SortedKeyList] = {}
+
+    @staticmethod
+    def _filters(mode: GameMode, is_playing: bool) -> tuple[tuple[GameMode | None, bool | None], ...]:
+        return ((mode, is_playing), (mode, None), (None, is_playing), (None, None))
+
+    def _view(self, mode: GameMode | None, playing: bool | None, sort: LiveSort) -> SortedKeyList:
+        view = self.views.get((mode, playing, sort))
+        if view is None:
+            view = self.views[(mode, playing, sort)] = SortedKeyList()
+        return view
+
+    def add(self, player_id: str, mode: GameMode, is_playing: bool, score: int):
+        previous = self.indexed.get(player_id)
+        if previous == (mode, is_playing, score):
+            return
+        filters = self._filters(mode, is_playing)
+        previous_filters = ()
+        if previous is not None:
+            previous_filters = self._filters(previous[0], previous[1])
+            for mode_filter, playing_filter in previous_filters:
+                self._view(mode_filter, playing_filter, "score").discard((-previous[2], player_id))
+                if (mode_filter, playing_filter) not in filters:
+                    self._view(mode_filter, playing_filter, "id").discard((player_id,))
+        for mode_filter, playing_filter in filters:
+            self._view(mode_filter, playing_filter, "score").add((-score, player_id))
+            if (mode_filter, playing_filter) not in previous_filters:
+                self._view(mode_filter, playing_filter, "id").add((player_id,))
+        self.indexed[player_id] = (mode, is_playing, score)
+
+    def discard(self, player_id: str):
+        previous = self.indexed.pop(player_id, None)
+        if previous is None:
+            return
+        mode, is_playing, score = previous
+        for mode_filter, playing_filter in self._filters(mode, is_playing):
+            self._view(mode_filter, playing_filter, "score").discard((-score, player_id))
+            self._view(mode_filter, playing_filter, "id").discard((player_id,))
+
+    def ids(
+        self,
+        mode: GameMode | None,
+        playing: bool | None,
+        sort: LiveSort,
+        after: tuple | None,
+        limit: int | None,
+    ) -> list[str]:
+        view = self.views.get((mode, playing, sort))
+        if view is None:
+            return []
+        return [key[-1] for key in islice(view.irange(after), limit)]
+
+
+class InMemoryLivePlayerStore(LivePlayerStore):
+    """
+    Per-process dict of records. get_record() returns the stored record
+    itself, so callers may update it in place before calling put_record().
+    Summary counters and the sorted listing views are kept up to date on
+    every write, so summary() is O(1) amortized and query() reads a page
+    without scanning.
+    """
+
+    def __init__(self, ttl: float):
+        super().__init__(ttl)
+        self._players: dict[str, LivePlayerRecord] = {}
+        # Last heartbeat per player and a min-heap of deadlines holding at most
+        # one entry per player. Entries are checked against the last heartbeat
+        # when they come due and pushed back if the player is still active.
+        self._last_seen: dict[str, float] = {}
+        self._deadlines: list[tuple[float, str]] = []
+        self._scheduled: set[str] = set()
+        self._counters = _LiveCounters()
+        self._indexes = _LiveIndexes()
+        self._epoch = secrets.token_hex(4)
+        self._version = 0
+
+    @staticmethod
+    def clock() -> float:
+        return time.monotonic()
+
+    def get_record(self, player_id: str) -> LivePlayerRecord | None:
+        return self._players.get(player_id)
+
+    def records(self) -> list[LivePlayerRecord]:
+        return list(self._players.values())
+
+    def count(self) -> int:
+        return len(self._players)
+
+    def put_record(self, record: LivePlayerRecord) -> None:
+        player_id = record.id
+        self._players[player_id] = record
+        self._counters.add(player_id, record.mode, record.is_playing, record.score)
+        self._indexes.add(player_id, record.mode, record.is_playing, record.score)
+        self._version += 1
+        now = self.clock()
+        self._last_seen[player_id] = now
+        if player_id not in self._scheduled:
+            self._scheduled.add(player_id)
+            heapq.heappush(self._deadlines, (now + self.ttl, player_id))
+
+    def remove(self, player_id: str) -> bool:
+        self._last_seen.pop(player_id, None)
+        self._counters.discard(player_id)
+        self._indexes.discard(player_id)
+        if self._players.pop(player_id, None) is None:
+            return False
+        self._version += 1
+        return True
+
+    def clear(self) -> None:
+        self._players.clear()
+        self._last_seen.clear()
+        self._deadlines.clear()
+        self._scheduled.clear()
+        self._counters = _LiveCounters()
+        self._indexes = _LiveIndexes()
+        self._version += 1
+
+    def version(self) -> str:
+        return f"{self._epoch}-{self._version}"
+
+    def summary(self) -> LivePlayerSummary:
+        return self._counters.summary()
+
+    def query(
+        self,
+        mode: GameMode | None = None,
+        playing: bool | None = None,
+        sort: LiveSort = "id",
+        after: tuple | None = None,
+        limit: int | None = None,
+    ) -> list[LivePlayerRecord]:
+        return [self._players[player_id] for player_id in self._indexes.ids(mode, playing, sort, after, limit)]
+
+    def expire(self, now: float | None = None) -> list[str]:
+        # Only deadlines that have come due are looked at
+        if now is None:
+            now = self.clock()
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, player_id = heapq.heappop(self._deadlines)
+            self._scheduled.discard(player_id)
+            last_seen = self._last_seen.get(player_id)
+            if last_seen is None:
+                continue  # Already removed
+            if last_seen + self.ttl <= now:
+                self.remove(player_id)
+                expired.append(player_id)
+            else:
+                self._scheduled.add(player_id)
+                heapq.heappush(self._deadlines, (last_seen + self.ttl, player_id))
+        return expired
+
+
+class SharedMemoryLivePlayerStore(LivePlayerStore):
+    """
+    Fixed-size open-addressing hash table in a memory-mapped file, so every
+    worker process on the host sees the same players. Each slot holds a
+    last-seen stamp and the player encoded with live_codec. Writers take an
+    exclusive flock on the file and readers a shared one.
+    """
+
+    blocking = True
+
+    MAGIC = b"SNAKELV1"
+    _HEADER = struct.Struct("<8sII8sQ")  # magic, slot count, slot size, epoch, version
+    _VERSION_OFFSET = 24
+    _SLOT = struct.Struct("<BdI")  # state, last seen, payload length
+    _EMPTY, _USED, _DELETED = 0, 1, 2
+
+    def __init__(self, path: str, ttl: float, slots: int, slot_size: int):
+        super().__init__(ttl)
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.capacity = slot_size - self._SLOT.size
+        self._thread_lock = threading.Lock()
+
+        size = self._HEADER.size + slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(exclusive=True):
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            magic, existing_slots, existing_size, _, _ = self._HEADER.unpack_from(self._map)
+            if magic == self.MAGIC:
+                if (existing_slots, existing_size) != (slots, slot_size):
+                    raise ValueError(f"{path} was created with a different slot layout")
+            else:
+                self._HEADER.pack_into(self._map, 0, self.MAGIC, slots, slot_size, secrets.token_bytes(8), 0)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool):
+        # flock serialises processes; the thread lock covers threads sharing our descriptor
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        return self._HEADER.size + index * self.slot_size
+
+    def _slot(self, index: int) -> tuple[int, float, int]:
+        """(state, last seen, payload length) of a slot."""
+        return self._SLOT.unpack_from(self._map, self._offset(index))
+
+    def _payload(self, index: int, length: int) -> bytes:
+        start = self._offset(index) + self._SLOT.size
+        return self._map[start:start + length]
+
+    def _player_id(self, index: int) -> str:
+        start = self._offset(index) + self._SLOT.size
+        with memoryview(self._map) as view:
+            return live_codec.decode_player_id(view[start:start + self.capacity])
+
+    def _write_slot(self, index: int, state: int, last_seen: float, payload: bytes = b"") -> None:
+        offset = self._offset(index)
+        self._map[offset + self._SLOT.size:offset + self._SLOT.size + len(payload)] = payload
+        self._SLOT.pack_into(self._map, offset, state, last_seen, len(payload))
+
+    def _bump_version(self) -> None:
+        (version,) = struct.unpack_from("<Q", self._map, self._VERSION_OFFSET)
+        struct.pack_into("<Q", self._map, self._VERSION_OFFSET, version + 1)
+
+    def version(self) -> str:
+        with self._locked(exclusive=False):
+            _, _, _, epoch, version = self._HEADER.unpack_from(self._map)
+        return f"{epoch.hex()}-{version}"
+
+    def _probe(self, player_id: str) -> tuple[int | None, int | None]:
+        """Return (slot holding player_id, first reusable slot) for a key."""
+        start = zlib.crc32(player_id.encode()) % self.slots
+        free = None
+        for step in range(self.slots):
+            index = (start + step) % self.slots
+            state, _, _ = self._slot(index)
+            if state == self._EMPTY:
+                return None, free if free is not None else index
+            if state == self._DELETED:
+                if free is None:
+                    free = index
+            elif self._player_id(index) == player_id:
+                return index, free
+        return None, free
+
+    def get_record(self, player_id: str) -> LivePlayerRecord | None:
+        with self._locked(exclusive=False):
+            index, _ = self._probe(player_id)
+            if index is None:
+                return None
+            _, _, length = self._slot(index)
+            payload = self._payload(index, length)
+        return live_codec.decode_record(payload)
+
+    def records(self) -> list[LivePlayerRecord]:
+        payloads = []
+        with self._locked(exclusive=False):
+            for index in range(self.slots):
+                state, _, length = self._slot(index)
+                if state == self._USED:
+                    payloads.append(self._payload(index, length))
+        return [live_codec.decode_record(payload) for payload in payloads]
+
+    def count(self) -> int:
+        with self._locked(exclusive=False):
+            return sum(self._slot(index)[0] == self._USED for index in range(self.slots))
+
+    def put_record(self, record: LivePlayerRecord) -> None:
+        payload = live_codec.encode_record(record)
+        if len(payload) > self.capacity:
+            raise LiveRecordTooLargeError(f"Live player frame of {len(payload)} bytes exceeds the {self.capacity} byte slot")
+        with self._locked(exclusive=True):
+            index, free = self._probe(record.id)
+            if index is None:
+                if free is None:
+                    raise LiveStoreFullError("Shared live player table is full")
+                index = free
+            self._write_slot(index, self._USED, self.clock(), payload)
+            self._bump_version()
+
+    def remove(self, player_id: str) -> bool:
+        with self._locked(exclusive=True):
+            index, _ = self._probe(player_id)
+            if index is None:
+                return False
+            self._write_slot(index, self._DELETED, 0.0)
+            self._bump_version()
+            return True
+
+    def clear(self) -> None:
+        with self._locked(exclusive=True):
+            for index in range(self.slots):
+                self._write_slot(index, self._EMPTY, 0.0)
+            self._bump_version()
+
+    def expire(self, now: float | None = None) -> list[str]:
+        if now is None:
+            now = self.clock()
+        expired = []
+        with self._locked(exclusive=True):
+            for index in range(self.slots):
+                state, last_seen, _ = self._slot(index)
+                if state == self._USED and last_seen + self.ttl <= now:
+                    expired.append(self._player_id(index))
+                    self._write_slot(index, self._DELETED, 0.0)
+            if expired:
+                self._bump_version()
+        return expired
+
+
+class RedisLivePlayerStore(LivePlayerStore):
+    """
+    Players are stored as live_codec frames under per-player keys with a
+    server-side TTL, plus a set of known IDs used for listing. Keys that the
+    server has expired are pruned from the set on the next expire() sweep,
+    which is also when the version moves for them.
+    """
+
+    blocking = True
+
+    def __init__(self, client: RespClient, ttl: float, prefix: str = "snake-arena:live:"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+        self._index_key = f"{prefix}ids"
+        self._version_key = f"{prefix}version"
+        self._epoch_key = f"{prefix}epoch"
+
+    def _key(self, player_id: str) -> str:
+        return f"{self.prefix}player:{player_id}"
+
+    def _pipeline(self, commands: list[tuple]) -> list:
+        """Run commands in one round trip, raising the first error reply instead of returning it."""
+        replies = self.client.pipeline(commands)
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def get_record(self, player_id: str) -> LivePlayerRecord | None:
+        payload = self.client.execute("GET", self._key(player_id))
+        return live_codec.decode_record(payload) if payload is not None else None
+
+    def _members(self) -> list[str]:
+        return [member.decode() for member in self.client.execute("SMEMBERS", self._index_key)]
+
+    def records(self) -> list[LivePlayerRecord]:
+        ids = self._members()
+        if not ids:
+            return []
+        payloads = self.client.execute("MGET", *(self._key(player_id) for player_id in ids))
+        return [live_codec.decode_record(payload) for payload in payloads if payload is not None]
+
+    def count(self) -> int:
+        # Includes players whose key expired since the last expire() sweep
+        return self.client.execute("SCARD", self._index_key)
+
+    def put_record(self, record: LivePlayerRecord) -> None:
+        self._pipeline([
+            ("SET", self._key(record.id), live_codec.encode_record(record), "PX", int(self.ttl * 1000)),
+            ("SADD", self._index_key, record.id),
+            ("INCR", self._version_key),
+        ])
+
+    def remove(self, player_id: str) -> bool:
+        deleted, _, _ = self._pipeline([
+            ("DEL", self._key(player_id)),
+            ("SREM", self._index_key, player_id),
+            ("INCR", self._version_key),
+        ])
+        return bool(deleted)
+
+    def clear(self) -> None:
+        ids = self._members()
+        self._pipeline([
+            ("DEL", self._index_key, *(self._key(player_id) for player_id in ids)),
+            ("INCR", self._version_key),
+        ])
+
+    def version(self) -> str:
+        # The first caller fixes the epoch; if the server loses its data the
+        # next caller picks a fresh one, so old tokens can't come back
+        _, epoch, version = self._pipeline([
+            ("SET", self._epoch_key, secrets.token_hex(4), "NX"),
+            ("GET", self._epoch_key),
+            ("GET", self._version_key),
+        ])
+        return f"{epoch.decode()}-{int(version or 0)}"
+
+    def expire(self, now: float | None = None) -> list[str]:
+        # The server already dropped the player keys; find IDs whose key is gone
+        ids = self._members()
+        if not ids:
+            return []
+        exists = self._pipeline([("EXISTS", self._key(player_id)) for player_id in ids])
+        expired = [player_id for player_id, alive in zip(ids, exists, strict=True) if not alive]
+        if expired:
+            self._pipeline([
+                ("SREM", self._index_key, *expired),
+                ("INCR", self._version_key),
+            ])
+        return expired
+
+
+def create_live_store() -> LivePlayerStore:
+    """Build the backend selected by LIVE_STORE_BACKEND."""
+    backend = settings.LIVE_STORE_BACKEND
+    ttl = settings.LIVE_PLAYER_TTL_SECONDS
+    if backend == "memory":
+        return InMemoryLivePlayerStore(ttl)
+    if backend == "shm":
+        return SharedMemoryLivePlayerStore(
+            settings.LIVE_STORE_URL or "/dev/shm/snake-arena-live",
+            ttl,
+            slots=settings.LIVE_STORE_SHM_SLOTS,
+            slot_size=settings.LIVE_STORE_SHM_SLOT_BYTES,
+        )
+    if backend == "redis":
+        return RedisLivePlayerStore(RespClient(settings.LIVE_STORE_URL or "redis://localhost:6379/0"), ttl)
+    raise ValueError(f"Unknown LIVE_STORE_BACKEND: {backend!r}")
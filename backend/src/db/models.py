@@ -3,6 +3,7 @@ SQLAlchemy database models for Snake Arena Live
 """
 import enum
 import uuid
+from datetime import UTC, datetime
 
 from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import DeclarativeBase, relationship
@@ -31,6 +32,7 @@ class User(Base):
 
     # Relationships
     leaderboard_entries = relationship("LeaderboardEntry", back_populates="user", cascade="all, delete-orphan")
+    personal_bests = relationship("PersonalBest", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -44,7 +46,11 @@ class LeaderboardEntry(Base):
     username = Column(String(50), nullable=False)  # Denormalized for performance
     score = Column(Integer, nullable=False, index=True)
     mode = Column(Enum(GameModeEnum), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # Also set client-side: SQLite's CURRENT_TIMESTAMP has no fractional seconds,
+    # so its values wouldn't compare equal to bound datetimes in leaderboard cursors
+    created_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), server_default=func.now(), nullable=False, index=True
+    )
 
     # Relationships
     user = relationship("User", back_populates="leaderboard_entries")
@@ -57,3 +63,21 @@ class LeaderboardEntry(Base):
 
     def __repr__(self):
         return f"<LeaderboardEntry(id={self.id}, username={self.username}, score={self.score}, mode={self.mode})>"
+
+class PersonalBest(Base):
+    """Best score of each user in each mode, kept current by add_score"""
+    __tablename__ = "personal_bests"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    mode = Column(Enum(GameModeEnum), primary_key=True)
+    username = Column(String(50), nullable=False)  # Denormalized for performance
+    best_score = Column(Integer, nullable=False)
+    entry_id = Column(String, nullable=False)  # Leaderboard entry that set it
+    achieved_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_personal_bests_mode_score', 'mode', 'best_score'),
+    )
+
+    def __repr__(self):
+        return f"<PersonalBest(user_id={self.user_id}, mode={self.mode}, best_score={self.best_score})>"
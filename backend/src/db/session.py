@@ -1,18 +1,62 @@
 """
 Database session and CRUD operations using SQLAlchemy
 """
+import asyncio
+import functools
+from collections.abc import Callable
+from datetime import datetime
 
-from sqlalchemy import desc, func
+from anyio import to_thread
+from sqlalchemy import and_, desc, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from ..schemas.game import GameMode, LeaderboardEntry, LivePlayer
+from ..core import live_codec
+from ..core.broadcast import Broadcaster
+from ..core.config import settings
+from ..core.frame_history import FrameHistory
+from ..core.heartbeat import HeartbeatPacer
+from ..core.live_codec import LivePlayerRecord
+from ..core.rank_index import ScoreRankIndex
+from ..schemas.game import (
+    GameMode,
+    LeaderboardEntry,
+    LivePlayer,
+    LivePlayerDelta,
+    LivePlayerSummary,
+    LiveScoreEntry,
+)
 from ..schemas.user import User
+from .leaderboard_cache import LeaderboardPosition, create_leaderboard_cache, utc_naive
+from .live_store import LivePlayerStore, LiveSort, create_live_store
 from .models import GameModeEnum
 from .models import LeaderboardEntry as LeaderboardEntryModel
+from .models import PersonalBest as PersonalBestModel
 from .models import User as UserModel
 
-# Note: LivePlayer is not persisted to database (in-memory only for active games)
-_live_players_cache: dict[str, LivePlayer] = {}
+# Best entries per mode, so the first leaderboard pages are served from memory
+leaderboard_cache = create_leaderboard_cache()
+
+# Personal bests counted by score per mode, for rank lookups without COUNT(*)
+rank_index = ScoreRankIndex(settings.LEADERBOARD_RANK_MAX_SCORE)
+
+# Note: LivePlayer is not persisted to database (see live_store for the backends)
+live_store: LivePlayerStore = create_live_store()
+
+# Spectator streams, one topic per live player ID
+live_broadcaster = Broadcaster(queue_size=settings.LIVE_SPECTATOR_QUEUE_SIZE)
+
+# Recent encoded frames per live player for replay, kept per process like the spectator streams
+live_history = FrameHistory(settings.LIVE_REPLAY_FRAMES, settings.LIVE_REPLAY_MAX_BYTES)
+
+# Heartbeat intervals handed back to players, stretched when this process is loaded
+heartbeat_pacer = HeartbeatPacer(
+    base_ms=settings.LIVE_HEARTBEAT_INTERVAL_MS,
+    unwatched_ms=settings.LIVE_HEARTBEAT_UNWATCHED_INTERVAL_MS,
+    max_ms=settings.LIVE_HEARTBEAT_MAX_INTERVAL_MS,
+    players_per_node=settings.LIVE_HEARTBEAT_PLAYERS_PER_NODE,
+    lag_threshold=settings.LIVE_HEARTBEAT_LAG_THRESHOLD_MS / 1000,
+)
 
 def create_user(db: Session, username: str, email: str, password_hash: str) -> User:
     """Create a new user in the database"""
@@ -61,6 +105,28 @@ def get_user_by_id(db: Session, user_id: str) -> User | None:
         createdAt=db_user.created_at.isoformat()
     )
 
+def get_user_credentials(db: Session, email: str) -> tuple[User, str] | None:
+    """Get a user and their password hash by email address in one query"""
+    row = db.query(
+        UserModel.id,
+        UserModel.username,
+        UserModel.email,
+        UserModel.is_superuser,
+        UserModel.created_at,
+        UserModel.hashed_password
+    ).filter(UserModel.email == email).first()
+    if not row:
+        return None
+
+    user = User(
+        id=row.id,
+        username=row.username,
+        email=row.email,
+        is_superuser=row.is_superuser,
+        createdAt=row.created_at.isoformat()
+    )
+    return user, row.hashed_password
+
 def get_password_hash(db: Session, user_id: str) -> str | None:
     """Get hashed password for a user"""
     db_user = db.query(UserModel).filter(UserModel.id == user_id).first()
@@ -78,10 +144,12 @@ def add_score(db: Session, user_id: str, username: str, score: int, mode: GameMo
         mode=mode_enum
     )
     db.add(db_entry)
+    db.flush()
+    _record_personal_best(db, db_entry)
     db.commit()
     db.refresh(db_entry)
 
-    return LeaderboardEntry(
+    entry = LeaderboardEntry(
         id=db_entry.id,
         userId=db_entry.user_id,
         username=db_entry.username,
@@ -89,17 +157,149 @@ def add_score(db: Session, user_id: str, username: str, score: int, mode: GameMo
         mode=db_entry.mode.value,
         createdAt=db_entry.created_at.isoformat()
     )
+    leaderboard_cache.add(entry)
+    rank_index.update(user_id, GameMode(mode), score)
+    return entry
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _record_personal_best(db: Session, db_entry: LeaderboardEntryModel):
+    """
+    Make a new entry the user's personal best for its mode if it beats the
+    stored one. A single upsert, so concurrent submissions can't lose a best.
+    """
+    insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    statement = insert(PersonalBestModel).values(
+        user_id=db_entry.user_id,
+        mode=db_entry.mode,
+        username=db_entry.username,
+        best_score=db_entry.score,
+        entry_id=db_entry.id,
+        achieved_at=db_entry.created_at,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[PersonalBestModel.user_id, PersonalBestModel.mode],
+        set_={
+            "username": statement.excluded.username,
+            "best_score": statement.excluded.best_score,
+            "entry_id": statement.excluded.entry_id,
+            "achieved_at": statement.excluded.achieved_at,
+        },
+        where=statement.excluded.best_score > PersonalBestModel.best_score,
+    )
+    db.execute(statement)
+
+def backfill_personal_bests(db: Session) -> int:
+    """
+    Fill an empty personal_bests table from the full score history, for
+    databases created before it existed. Returns the number of rows added.
+    """
+    if db.query(PersonalBestModel).first() is not None:
+        return 0
+    best = (
+        db.query(
+            LeaderboardEntryModel.user_id,
+            LeaderboardEntryModel.mode,
+            func.max(LeaderboardEntryModel.score).label("best_score"),
+        )
+        .group_by(LeaderboardEntryModel.user_id, LeaderboardEntryModel.mode)
+        .subquery()
+    )
+    entries = (
+        db.query(LeaderboardEntryModel)
+        .join(best, and_(
+            LeaderboardEntryModel.user_id == best.c.user_id,
+            LeaderboardEntryModel.mode == best.c.mode,
+            LeaderboardEntryModel.score == best.c.best_score,
+        ))
+        .order_by(LeaderboardEntryModel.created_at, LeaderboardEntryModel.id)
+    )
+    added = {}
+    for entry in entries:
+        # The earliest game wins a tie, as on the leaderboard
+        added.setdefault((entry.user_id, entry.mode), PersonalBestModel(
+            user_id=entry.user_id,
+            mode=entry.mode,
+            username=entry.username,
+            best_score=entry.score,
+            entry_id=entry.id,
+            achieved_at=entry.created_at,
+        ))
+    db.add_all(added.values())
+    db.commit()
+    return len(added)
+
+def leaderboard_sort_key(entry: LeaderboardEntry) -> tuple[int, str, str]:
+    """Position of an entry in leaderboard order, as JSON-friendly cursor values"""
+    return (entry.score, entry.createdAt.isoformat(), entry.id)
+
+def parse_leaderboard_key(values: list) -> LeaderboardPosition:
+    """Rebuild a leaderboard position from decoded cursor values. Raises ValueError if they don't fit."""
+    if len(values) == 3 and type(values[0]) is int and isinstance(values[1], str) and isinstance(values[2], str):
+        try:
+            achieved_at = utc_naive(datetime.fromisoformat(values[1]))
+        except OverflowError as e:
+            raise ValueError("Cursor time out of range") from e
+        return (values[0], achieved_at, values[2])
+    raise ValueError("Cursor doesn't match the leaderboard order")
+
+def _seek_after(after: LeaderboardPosition, score_column, time_column, id_column) -> tuple:
+    """
+    Filter for rows after a position in leaderboard order. The plain bound
+    on the score lets the database seek on a (mode, score) index.
+    """
+    score, achieved_at, row_id = after
+    return (
+        score_column <= score,
+        or_(
+            score_column < score,
+            time_column > achieved_at,
+            and_(time_column == achieved_at, id_column > row_id),
+        ),
+    )
+
+def _seek_before(before: LeaderboardPosition, score_column, time_column, id_column) -> tuple:
+    """Filter for rows ahead of a position in leaderboard order; the mirror of _seek_after."""
+    score, achieved_at, row_id = before
+    return (
+        score_column >= score,
+        or_(
+            score_column > score,
+            time_column < achieved_at,
+            and_(time_column == achieved_at, id_column < row_id),
+        ),
+    )
 
-def get_leaderboard(db: Session, mode: GameMode | None = None) -> list[LeaderboardEntry]:
-    """Get leaderboard entries, optionally filtered by game mode"""
+def get_leaderboard(
+    db: Session,
+    mode: GameMode | None = None,
+    limit: int | None = None,
+    after: LeaderboardPosition | None = None,
+) -> list[LeaderboardEntry]:
+    """
+    Get leaderboard entries, optionally filtered by game mode.
+    Ordered by score descending; ties go to the earlier entry, then by ID.
+    `after` is the (score, created_at, id) of the last entry already seen:
+    the page starts with a seek on the (mode, score) index instead of an OFFSET.
+    """
     query = db.query(LeaderboardEntryModel)
 
     if mode:
         mode_enum = GameModeEnum(mode)
         query = query.filter(LeaderboardEntryModel.mode == mode_enum)
 
-    # Order by score descending
-    query = query.order_by(desc(LeaderboardEntryModel.score))
+    if after is not None:
+        query = query.filter(
+            *_seek_after(after, LeaderboardEntryModel.score, LeaderboardEntryModel.created_at, LeaderboardEntryModel.id)
+        )
+
+    query = query.order_by(
+        desc(LeaderboardEntryModel.score), LeaderboardEntryModel.created_at, LeaderboardEntryModel.id
+    )
+
+    if limit is not None:
+        query = query.limit(limit)
 
     entries = query.all()
 
@@ -115,37 +315,291 @@ def get_leaderboard(db: Session, mode: GameMode | None = None) -> list[Leaderboa
         for entry in entries
     ]
 
-def get_user_high_score(db: Session, user_id: str, mode: GameMode | None = None) -> int:
-    """Get the highest score for a user, optionally filtered by game mode"""
-    query = db.query(func.max(LeaderboardEntryModel.score)).filter(
-        LeaderboardEntryModel.user_id == user_id
+def _personal_best_entry(best: PersonalBestModel) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        id=best.entry_id,
+        userId=best.user_id,
+        username=best.username,
+        score=best.best_score,
+        mode=best.mode.value,
+        createdAt=best.achieved_at.isoformat()
     )
 
+def get_personal_bests(
+    db: Session,
+    mode: GameMode | None = None,
+    limit: int | None = None,
+    after: LeaderboardPosition | None = None,
+) -> list[LeaderboardEntry]:
+    """
+    Leaderboard with one entry per player per mode: the game that set each
+    personal best, in the same order and with the same cursors as
+    get_leaderboard, served by the (mode, best_score) index.
+    """
+    query = db.query(PersonalBestModel)
+
     if mode:
         mode_enum = GameModeEnum(mode)
-        query = query.filter(LeaderboardEntryModel.mode == mode_enum)
+        query = query.filter(PersonalBestModel.mode == mode_enum)
+
+    if after is not None:
+        query = query.filter(
+            *_seek_after(after, PersonalBestModel.best_score, PersonalBestModel.achieved_at, PersonalBestModel.entry_id)
+        )
 
-    result = query.scalar()
+    query = query.order_by(
+        desc(PersonalBestModel.best_score), PersonalBestModel.achieved_at, PersonalBestModel.entry_id
+    )
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [_personal_best_entry(best) for best in query.all()]
+
+def get_personal_bests_around(db: Session, user_id: str, mode: GameMode, radius: int) -> list[LeaderboardEntry] | None:
+    """
+    The user's personal best in a mode with up to `radius` players' bests
+    ranked just above and just below it, in leaderboard order. Two seeks on
+    the (mode, best_score) index from the user's position, one each way.
+    None if the user has no score in the mode.
+    """
+    mode_enum = GameModeEnum(mode)
+    own = db.get(PersonalBestModel, (user_id, mode_enum))
+    if own is None:
+        return None
+    position = (own.best_score, own.achieved_at, own.entry_id)
+    columns = (PersonalBestModel.best_score, PersonalBestModel.achieved_at, PersonalBestModel.entry_id)
+    in_mode = db.query(PersonalBestModel).filter(PersonalBestModel.mode == mode_enum)
+
+    above = (
+        in_mode.filter(*_seek_before(position, *columns))
+        .order_by(PersonalBestModel.best_score, desc(PersonalBestModel.achieved_at), desc(PersonalBestModel.entry_id))
+        .limit(radius)
+        .all()
+    )
+    below = (
+        in_mode.filter(*_seek_after(position, *columns))
+        .order_by(desc(PersonalBestModel.best_score), PersonalBestModel.achieved_at, PersonalBestModel.entry_id)
+        .limit(radius)
+        .all()
+    )
+    return [_personal_best_entry(best) for best in [*reversed(above), own, *below]]
+
+def get_cached_leaderboard(
+    mode: GameMode | None,
+    limit: int,
+    after: LeaderboardPosition | None = None,
+) -> list[LeaderboardEntry] | None:
+    """A leaderboard page from memory, or None if the cache doesn't cover it"""
+    return leaderboard_cache.page(mode, limit, after)
+
+def warm_leaderboard_cache(db: Session, mode: GameMode | None) -> None:
+    """Load the top entries of a mode (or of all modes, for None) into the cache"""
+    generation = leaderboard_cache.generation
+    leaderboard_cache.warm(mode, get_leaderboard(db, mode, leaderboard_cache.size), generation)
+
+def get_leaderboard_page(
+    db: Session,
+    mode: GameMode | None,
+    limit: int,
+    after: LeaderboardPosition | None = None,
+) -> list[LeaderboardEntry]:
+    """A leaderboard page, warming the cache for the mode first if it is cold"""
+    if leaderboard_cache.size and not leaderboard_cache.is_warm(mode):
+        warm_leaderboard_cache(db, mode)
+        page = leaderboard_cache.page(mode, limit, after)
+        if page is not None:
+            return page
+    return get_leaderboard(db, mode, limit, after)
+
+def get_user_high_score(db: Session, user_id: str, mode: GameMode | None = None) -> int:
+    """Get the highest score for a user, optionally filtered by game mode"""
+    if mode:
+        best = db.get(PersonalBestModel, (user_id, GameModeEnum(mode)))
+        return best.best_score if best is not None else 0
+
+    result = db.query(func.max(PersonalBestModel.best_score)).filter(
+        PersonalBestModel.user_id == user_id
+    ).scalar()
     return result if result is not None else 0
 
+def rebuild_rank_index(db: Session) -> None:
+    """Reload the rank index from the personal bests table"""
+    # Retry if a score lands while reading; give up after a few tries and
+    # leave the index unbuilt so the next read tries again
+    for _ in range(3):
+        generation = rank_index.generation
+        rows = db.query(PersonalBestModel.user_id, PersonalBestModel.mode, PersonalBestModel.best_score).all()
+        if rank_index.load(((user_id, GameMode(mode.value), score) for user_id, mode, score in rows), generation):
+            return
+
+def get_cached_rank(user_id: str, mode: GameMode) -> tuple[int, int, int] | None:
+    """(rank, score, players) from the rank index; None if it isn't built or the user has no score"""
+    if not rank_index.built:
+        return None
+    return rank_index.rank(user_id, GameMode(mode))
+
+def get_user_rank(db: Session, user_id: str, mode: GameMode) -> tuple[int, int, int] | None:
+    """
+    A user's place among all players' personal bests in a mode, as
+    (rank, score, players). Equal scores share a rank. None if the user
+    has no score in the mode.
+    """
+    if not rank_index.built:
+        rebuild_rank_index(db)
+    return rank_index.rank(user_id, GameMode(mode))
+
 # Live players functions (in-memory, not persisted)
+async def run_live[**P, T](func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """
+    Call a live player function from async code: inline with the in-memory
+    store, on a worker thread with a store whose calls block.
+    """
+    if live_store.blocking:
+        return await to_thread.run_sync(functools.partial(func, *args, **kwargs))
+    return func(*args, **kwargs)
+
 def get_live_players() -> list[LivePlayer]:
     """Get all live players"""
-    return list(_live_players_cache.values())
+    return live_store.all()
+
+def get_live_players_version() -> str:
+    """Opaque token that changes whenever any live player changes"""
+    return live_store.version()
+
+def get_live_player_summary() -> LivePlayerSummary:
+    """Get live player counts per mode and the top live score"""
+    return live_store.summary()
+
+def get_live_player_records() -> list[LivePlayerRecord]:
+    """Get all live players in their compact stored form"""
+    return live_store.records()
+
+def query_live_players(
+    mode: GameMode | None = None,
+    playing: bool | None = None,
+    sort: LiveSort = "id",
+    after: tuple | None = None,
+    limit: int | None = None,
+) -> list[LivePlayerRecord]:
+    """Get a page of live players matching the filters, in sort_key order after the key `after`"""
+    return live_store.query(mode, playing, sort, after, limit)
+
+def get_live_top_scores(limit: int) -> dict[GameMode, list[LiveScoreEntry]]:
+    """Get the highest scoring players currently in a game, per mode"""
+    return {
+        mode: [
+            LiveScoreEntry(id=record.id, username=record.username, score=record.score)
+            for record in live_store.query(mode, True, "score", None, limit)
+        ]
+        for mode in GameMode
+    }
 
 def get_live_player(player_id: str) -> LivePlayer | None:
     """Get a specific live player by ID"""
-    return _live_players_cache.get(player_id)
+    return live_store.get(player_id)
+
+def get_live_player_record(player_id: str) -> LivePlayerRecord | None:
+    """Get a specific live player by ID as a record, ready to encode"""
+    return live_store.get_record(player_id)
+
+def get_live_player_frames(player_id: str, since: int | None = None) -> list[bytes] | None:
+    """
+    Get a live player's recent frames with seq above `since`, oldest first,
+    encoded with live_codec. Returns None if the player isn't live.
+    """
+    frames = live_history.since(player_id, since)
+    if frames is None and live_store.get_record(player_id) is not None:
+        return []
+    return frames
+
+def _live_player_changed(record: LivePlayerRecord):
+    # Replay history and spectator streams are per process; with a shared
+    # store each worker only sees the updates it receives itself
+    if live_history.frames_per_stream:
+        live_history.append(record.id, record.seq, live_codec.encode_record(record))
+    if live_broadcaster.has_subscribers(record.id):
+        live_broadcaster.publish(record.id, record.to_player().model_dump_json())
 
 def update_live_player(player: LivePlayer):
     """Update or add a live player"""
-    _live_players_cache[player.id] = player
+    update_live_player_record(LivePlayerRecord.from_player(player))
+
+def update_live_player_record(record: LivePlayerRecord):
+    """Update or add a live player from a compact record, which the store takes ownership of"""
+    live_store.put_record(record)
+    _live_player_changed(record)
+
+def update_live_player_batch(records: list[LivePlayerRecord]):
+    """
+    Apply several buffered keyframes from one player. Numbered frames at or
+    below the stored seq arrived late or were retried, and are dropped
+    unless the player had stopped playing (a new game numbers its frames
+    afresh). Of the rest, the one with the highest seq is stored and pushed
+    to spectators and the others are kept in the replay history. A repeated
+    seq keeps the last frame sent with it. Unnumbered frames (seq 0) are all
+    kept, in the order sent, ahead of any numbered ones.
+    """
+    stored = live_store.get_record(records[0].id)
+    floor = stored.seq if stored is not None and stored.is_playing else 0
+    numbered = {record.seq: record for record in records if record.seq > floor}
+    frames = [record for record in records if record.seq == 0]
+    frames += sorted(numbered.values(), key=lambda record: record.seq)
+    if not frames:
+        return
+    if live_history.frames_per_stream:
+        for record in frames[:-1]:
+            live_history.append(record.id, record.seq, live_codec.encode_record(record))
+    update_live_player_record(frames[-1])
+
+def apply_live_player_delta(player_id: str, delta: LivePlayerDelta) -> bool:
+    """
+    Apply a delta frame to a live player's stored state.
+    Returns False if the player is unknown or the delta doesn't follow the
+    last applied frame, in which case the client must send a keyframe.
+    """
+    record = live_store.apply_delta(player_id, delta)
+    if record is None:
+        return False
+    _live_player_changed(record)
+    return True
 
 def remove_live_player(player_id: str):
     """Remove a live player"""
-    if player_id in _live_players_cache:
-        del _live_players_cache[player_id]
+    live_store.remove(player_id)
+    live_history.discard(player_id)
+    live_broadcaster.close_topic(player_id)
 
 def clear_live_players():
     """Clear all live players"""
-    _live_players_cache.clear()
+    live_store.clear()
+    live_history.clear()
+    live_broadcaster.clear()
+
+def expire_live_players(now: float | None = None) -> int:
+    """
+    Remove live players whose last heartbeat is older than LIVE_PLAYER_TTL_SECONDS
+    and end their spectator streams. Returns the number removed.
+    """
+    expired = live_store.expire(now)
+    for player_id in expired:
+        live_history.discard(player_id)
+        live_broadcaster.close_topic(player_id)
+    return len(expired)
+
+def get_heartbeat_interval_ms(player_id: str) -> int:
+    """
+    Milliseconds the player should wait before its next heartbeat.
+    Spectators are counted in this process only, like the streams they read.
+    """
+    return heartbeat_pacer.interval_ms(live_broadcaster.subscriber_count(player_id))
+
+async def run_heartbeat_monitor():
+    """Background task that samples event-loop lag and the live player count."""
+    await heartbeat_pacer.monitor(lambda: run_live(live_store.count))
+
+async def run_live_player_reaper():
+    """Background task that periodically expires silent live players."""
+    while True:
+        await asyncio.sleep(settings.LIVE_PLAYER_SWEEP_INTERVAL_SECONDS)
+        await run_live(expire_live_players)
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import time
 from contextlib import asynccontextmanager
 
@@ -9,7 +11,17 @@ from .api.v1.api import api_router
 from .api.v1.endpoints import health
 from .core.config import settings
 from .core.logging import get_logger, setup_logging
-from .db.database import init_db
+from .core.security import PasswordPoolBusyError
+from .db.async_session import run_rank_index_rebuilder
+from .db.database import SessionLocal, init_db
+from .db.session import (
+    backfill_personal_bests,
+    rebuild_rank_index,
+    run_heartbeat_monitor,
+    run_live_player_reaper,
+    warm_leaderboard_cache,
+)
+from .schemas.enums import GameMode
 
 # Setup logging
 setup_logging(
@@ -35,11 +47,37 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
         raise
 
+    # Fill personal bests for databases that predate them, then load the top
+    # of each leaderboard and the rank index so reads are served from memory
+    try:
+        with SessionLocal() as db:
+            added = backfill_personal_bests(db)
+            if added:
+                logger.info(f"Backfilled {added} personal bests from score history")
+            for mode in (None, *GameMode):
+                warm_leaderboard_cache(db, mode)
+            rebuild_rank_index(db)
+    except Exception as e:
+        logger.warning(f"Leaderboard startup tasks failed, caches will fill on first read: {e}")
+
+    # Background task: expire live players that stopped sending heartbeats
+    reaper = asyncio.create_task(run_live_player_reaper())
+    # Background task: measure load for the heartbeat intervals handed to players
+    heartbeat_monitor = asyncio.create_task(run_heartbeat_monitor())
+    background = [reaper, heartbeat_monitor]
+    if settings.LEADERBOARD_RANK_REBUILD_SECONDS > 0:
+        # Background task: pick up scores submitted to other workers
+        background.append(asyncio.create_task(run_rank_index_rebuilder(SessionLocal)))
+
     logger.info("Snake Arena API started successfully")
     yield
 
-    # Shutdown: Add cleanup logic here if needed
+    # Shutdown
     logger.info("Shutting down Snake Arena API...")
+    for task in background:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
 
 app = FastAPI(
@@ -103,10 +141,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the frontend from cross-origin responses
+    expose_headers=["X-Heartbeat-Interval", "X-Next-Cursor", "Retry-After"],
 )
 
 
 # Exception handlers
+@app.exception_handler(PasswordPoolBusyError)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusyError):
+    """Shed logins and signups while bcrypt is saturated instead of queueing them."""
+    logger.warning(
+        "Password hashing pool saturated, shedding request",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+        }
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions globally."""
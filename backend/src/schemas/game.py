@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Annotated, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Discriminator, Field, Tag
 
 from .enums import Direction, GameMode
 
@@ -13,13 +14,21 @@ class LeaderboardEntry(BaseModel):
     mode: GameMode
     createdAt: datetime
 
+class LeaderboardRank(BaseModel):
+    userId: str
+    mode: GameMode
+    score: int  # The user's personal best in this mode
+    rank: int  # 1 for the best score; equal scores share a rank
+    total: int  # Players with a score in this mode
+
 class ScoreSubmission(BaseModel):
     score: int
     mode: GameMode
 
 class Position(BaseModel):
-    x: int
-    y: int
+    # Board coordinates; bounded so they fit the binary live frame encoding
+    x: int = Field(ge=0, le=0xFFFF)
+    y: int = Field(ge=0, le=0xFFFF)
 
 class LivePlayer(BaseModel):
     id: str
@@ -30,11 +39,48 @@ class LivePlayer(BaseModel):
     food: Position
     direction: Direction
     isPlaying: bool
+    seq: int = 0
 
-class LivePlayerUpdate(BaseModel):
+class LivePlayerSummary(BaseModel):
+    total: int
+    playing: int
+    byMode: dict[GameMode, int]
+    topScore: int | None  # Highest score among live players, None when nobody is live
+
+class LiveScoreEntry(BaseModel):
+    id: str
+    username: str
     score: int
+
+class LivePlayerUpdate(BaseModel):
+    """Full state of a live game (a keyframe)."""
+    score: int = Field(ge=0, le=0xFFFFFFFF)
     mode: GameMode
-    snake: list[Position]
+    snake: list[Position] = Field(max_length=0xFFFF)
     food: Position
     direction: Direction
     isPlaying: bool
+    seq: int = Field(default=0, ge=0, le=0xFFFFFFFF)
+
+class LivePlayerDelta(BaseModel):
+    """
+    Changes since the previous frame. Only valid when seq directly follows
+    the last frame the server applied for the player.
+    """
+    seq: int = Field(ge=0, le=0xFFFFFFFF)
+    score: int = Field(ge=0, le=0xFFFFFFFF)
+    direction: Direction
+    isPlaying: bool
+    heads: list[Position] = Field(default=[], max_length=0xFFFF)  # New head segments, newest first
+    tailDrop: int = Field(default=0, ge=0)  # Segments removed from the tail
+    food: Position | None = None  # Only sent when the food moved
+
+def _live_frame_kind(frame: Any) -> str:
+    # Keyframes always carry the whole snake, deltas never do
+    snake = frame.get("snake") if isinstance(frame, dict) else getattr(frame, "snake", None)
+    return "delta" if snake is None else "keyframe"
+
+LiveFrame = Annotated[
+    Annotated[LivePlayerUpdate, Tag("keyframe")] | Annotated[LivePlayerDelta, Tag("delta")],
+    Discriminator(_live_frame_kind),
+]
@@ -0,0 +1,122 @@
+"""
+Local stand-in for a Redis server, speaking enough of RESP2 to exercise
+the shared backends in tests.
+"""
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, bool):
+            return b":%d\r\n" % value
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, Exception):
+            return b"-ERR %s\r\n" % str(value).encode()
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(self._reply(item) for item in value)
+
+    def handle(self):
+        while (args := self._read_command()) is not None:
+            name, *rest = args
+            with self.server.lock:
+                try:
+                    result = self.server.run(name.decode().upper(), rest)
+                except Exception as e:  # noqa: BLE001 - reported back like Redis would
+                    result = e
+            self.wfile.write(self._reply(result))
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.data: dict[bytes, object] = {}
+        self.expires: dict[bytes, float] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RespStandIn":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, key: bytes):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def run(self, name: str, args: list[bytes]):
+        if name in ("AUTH", "SELECT", "PING"):
+            return "OK"
+        if name == "SET":
+            key, value, *options = args
+            options = [option.upper() for option in options]
+            if b"NX" in options and self._live(key) is not None:
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if b"PX" in options:
+                self.expires[key] = time.time() + int(options[options.index(b"PX") + 1]) / 1000
+            return "OK"
+        if name == "INCR":
+            value = int(self._live(args[0]) or 0) + 1
+            self.data[args[0]] = str(value).encode()
+            return value
+        if name == "GET":
+            return self._live(args[0])
+        if name == "MGET":
+            return [self._live(key) for key in args]
+        if name == "EXISTS":
+            return sum(self._live(key) is not None for key in args)
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                removed += self._live(key) is not None
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name == "SADD":
+            members = self.data.setdefault(args[0], set())
+            before = len(members)
+            members.update(args[1:])
+            return len(members) - before
+        if name == "SREM":
+            members = self._live(args[0]) or set()
+            before = len(members)
+            members.difference_update(args[1:])
+            return before - len(members)
+        if name == "SMEMBERS":
+            return sorted(self._live(args[0]) or ())
+        if name == "SCARD":
+            return len(self._live(args[0]) or ())
+        raise ValueError(f"unknown command '{name}'")
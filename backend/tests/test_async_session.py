@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+from src.core.config import settings
+from src.db import async_session
+
+
+def test_calls_run_off_the_event_loop_within_the_limit(monkeypatch):
+    """Blocking calls run on worker threads, never more at once than the limiter allows."""
+    monkeypatch.setattr(async_session.db_limiter, "total_tokens", 2)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def blocking_query(n: int) -> tuple[int, int]:
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return n, threading.get_ident()
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        results = await asyncio.gather(*(async_session.run_db(blocking_query, n) for n in range(6)))
+        return loop_thread, results
+
+    loop_thread, results = asyncio.run(scenario())
+    assert [n for n, _ in results] == list(range(6))
+    assert all(thread != loop_thread for _, thread in results)
+    assert peak[0] == 2
+
+
+def test_rank_index_rebuilder_survives_failures(monkeypatch):
+    """A failed rebuild is logged and retried; sessions open and close off the event loop."""
+    monkeypatch.setattr(settings, "LEADERBOARD_RANK_REBUILD_SECONDS", 0)
+    session_threads = []
+    rebuilds = []
+
+    class FakeSession:
+        def __enter__(self):
+            session_threads.append(threading.get_ident())
+            return self
+
+        def __exit__(self, *exc):
+            session_threads.append(threading.get_ident())
+
+    def rebuild_rank_index(db):
+        rebuilds.append(db)
+        if len(rebuilds) == 1:
+            raise RuntimeError("database went away")
+
+    monkeypatch.setattr(async_session.session, "rebuild_rank_index", rebuild_rank_index)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        task = asyncio.create_task(async_session.run_rank_index_rebuilder(FakeSession))
+        while len(rebuilds) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return loop_thread
+
+    loop_thread = asyncio.run(scenario())
+    assert len(rebuilds) >= 3
+    assert session_threads and loop_thread not in session_threads
@@ -0,0 +1,34 @@
+import asyncio
+
+from src.core.broadcast import Broadcaster
+
+
+def test_slow_subscriber_gets_latest_frame():
+    """A subscriber that falls behind skips to the newest frame."""
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=1)
+        subscription = broadcaster.subscribe("p1")
+        for i in range(5):
+            broadcaster.publish("p1", f"frame-{i}")
+        frame = await subscription.__anext__()
+        subscription.close()
+        return frame, broadcaster.has_subscribers("p1")
+
+    frame, still_subscribed = asyncio.run(scenario())
+    assert frame == "frame-4"
+    assert still_subscribed is False
+
+
+def test_publish_fans_out_and_close_ends_stream():
+    """Every subscriber sees the same frame and the stream ends when the topic closes."""
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=4)
+        subscriptions = [broadcaster.subscribe("p1") for _ in range(3)]
+        reached = broadcaster.publish("p1", b"frame")
+        broadcaster.close_topic("p1")
+        received = [[frame async for frame in sub] for sub in subscriptions]
+        return reached, received
+
+    reached, received = asyncio.run(scenario())
+    assert reached == 3
+    assert received == [[b"frame"]] * 3
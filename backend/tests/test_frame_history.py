@@ -0,0 +1,54 @@
+from src.core.frame_history import FrameHistory
+
+
+def test_keeps_the_newest_frames_per_stream():
+    """Each stream keeps its last frames, and `since` returns those after a sequence number."""
+    history = FrameHistory(frames_per_stream=3, max_bytes=1000)
+    for seq in range(1, 6):
+        history.append("a", seq, b"a%d" % seq)
+
+    assert history.since("a") == [b"a3", b"a4", b"a5"]
+    assert history.since("a", 3) == [b"a4", b"a5"]
+    assert history.since("a", 5) == []
+    assert history.since("b") is None
+    assert (len(history), history.nbytes) == (3, 6)
+
+
+def test_byte_cap_drops_the_oldest_frames_overall():
+    """Past the global byte cap the oldest frames go first, whichever stream they belong to."""
+    history = FrameHistory(frames_per_stream=10, max_bytes=8)
+    history.append("a", 1, b"aa")
+    history.append("b", 1, b"bb")
+    history.append("a", 2, b"aa")
+    history.append("b", 2, b"bb")
+    history.append("a", 3, b"aa")
+
+    assert history.since("a") == [b"aa", b"aa"]
+    assert history.since("b") == [b"bb", b"bb"]
+    assert history.nbytes == 8
+
+
+def test_restarted_sequence_starts_a_new_run():
+    """A sequence number that goes backwards (a new game) drops the old frames."""
+    history = FrameHistory(frames_per_stream=10, max_bytes=1000)
+    history.append("a", 7, b"old")
+    history.append("a", 8, b"old")
+    history.append("a", 1, b"new")
+
+    assert history.since("a") == [b"new"]
+    assert len(history) == 1
+
+    # Stale bookkeeping is compacted away rather than growing forever
+    for seq in range(2, 500):
+        history.append("a", seq, b"x")
+    assert len(history._order) <= 2 * len(history) + 64
+
+
+def test_unnumbered_frames_accumulate():
+    """Frames sent without a sequence number (seq 0) are kept in order instead of resetting the stream."""
+    history = FrameHistory(frames_per_stream=3, max_bytes=1000)
+    for frame in (b"f1", b"f2", b"f3", b"f4"):
+        history.append("a", 0, frame)
+
+    assert history.since("a") == [b"f2", b"f3", b"f4"]
+    assert len(history) == 3
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from src.core.heartbeat import HeartbeatPacer
+
+
+def make_pacer() -> HeartbeatPacer:
+    return HeartbeatPacer(base_ms=500, unwatched_ms=2000, max_ms=5000, players_per_node=100, lag_threshold=0.02)
+
+
+def test_watched_players_report_faster():
+    pacer = make_pacer()
+
+    assert pacer.interval_ms(spectators=1) == 500
+    assert pacer.interval_ms(spectators=0) == 2000
+
+
+def test_intervals_stretch_with_load_up_to_the_cap():
+    """Players past capacity or loop lag past the threshold scale intervals proportionally."""
+    pacer = make_pacer()
+
+    pacer.live_players = 200
+    assert pacer.interval_ms(spectators=1) == 1000
+    assert pacer.interval_ms(spectators=0) == 4000
+
+    pacer.live_players = 0
+    pacer.loop_lag = 0.06
+    assert pacer.interval_ms(spectators=1) == 1500
+    assert pacer.interval_ms(spectators=0) == 5000
+
+
+def test_monitor_measures_blocked_loop_and_counts_players():
+    """A loop blocked by synchronous work shows up as lag."""
+    pacer = make_pacer()
+
+    async def count_live_players():
+        return 42
+
+    async def scenario():
+        monitor = asyncio.create_task(pacer.monitor(count_live_players, probe_interval=0.01))
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.02)
+        monitor.cancel()
+
+    asyncio.run(scenario())
+    assert pacer.live_players == 42
+    assert pacer.loop_lag > 0.02
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from datetime import UTC, datetime, timedelta
+
+from fastapi import Response
+
+from src.api.v1.endpoints import leaderboard
+from src.core.resp import RespClient
+from src.db import session as db_session
+from src.db.leaderboard_cache import LeaderboardCache, RedisLeaderboardSync
+from src.schemas.game import GameMode, LeaderboardEntry
+from tests.resp_server import RespStandIn
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def entry(n: int, score: int, mode: GameMode = GameMode.walls) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        id=f"e{n:03d}", userId="u", username="u", score=score, mode=mode, createdAt=START + timedelta(seconds=n)
+    )
+
+
+def position(item: LeaderboardEntry) -> tuple:
+    return (item.score, item.createdAt, item.id)
+
+
+def test_pages_are_served_within_the_cached_entries():
+    """Pages inside the top entries come from memory; pages past them need the database."""
+    cache = LeaderboardCache(size=4)
+    assert cache.page(GameMode.walls, 2) is None
+
+    entries = [entry(1, 90), entry(2, 80), entry(3, 80), entry(4, 70)]
+    assert cache.warm(GameMode.walls, entries, cache.generation)
+
+    assert cache.page(GameMode.walls, 2) == entries[:2]
+    assert cache.page(GameMode.walls, 2, after=position(entries[1])) == entries[2:]
+    assert cache.page(GameMode.walls, 3, after=position(entries[1])) is None
+    assert cache.page(None, 2) is None
+
+
+def test_short_board_is_complete():
+    """A list shorter than the cache size is the whole board, so any page can be served."""
+    cache = LeaderboardCache(size=10)
+    cache.warm(GameMode.walls, [entry(1, 50)], cache.generation)
+
+    assert cache.page(GameMode.walls, 5) == [entry(1, 50)]
+    assert cache.page(GameMode.walls, 5, after=position(entry(1, 50))) == []
+
+
+def test_new_scores_are_inserted_only_if_they_qualify():
+    cache = LeaderboardCache(size=3)
+    cache.warm(GameMode.walls, [entry(1, 90), entry(2, 80), entry(3, 70)], cache.generation)
+    cache.warm(None, [entry(1, 90), entry(2, 80), entry(3, 70)], cache.generation)
+
+    cache.add(entry(4, 60))
+    assert [item.score for item in cache.page(GameMode.walls, 3)] == [90, 80, 70]
+
+    cache.add(entry(5, 85))
+    assert [item.id for item in cache.page(GameMode.walls, 3)] == ["e001", "e005", "e002"]
+    assert [item.id for item in cache.page(None, 3)] == ["e001", "e005", "e002"]
+
+    cache.add(entry(6, 95, GameMode.pass_through))
+    assert [item.score for item in cache.page(GameMode.walls, 3)] == [90, 85, 80]
+    assert [item.score for item in cache.page(None, 3)] == [95, 90, 85]
+
+
+def test_warm_up_racing_a_new_score_is_discarded():
+    """Entries read before a score was added may miss it, so they aren't installed."""
+    cache = LeaderboardCache(size=3)
+    generation = cache.generation
+    cache.add(entry(1, 100))
+
+    assert not cache.warm(GameMode.walls, [entry(2, 50)], generation)
+    assert not cache.is_warm(GameMode.walls)
+
+
+def test_workers_drop_their_cache_when_another_changes_the_board():
+    server = RespStandIn().start()
+    try:
+        first = LeaderboardCache(size=3, sync=RedisLeaderboardSync(RespClient(server.url)))
+        second = LeaderboardCache(size=3, sync=RedisLeaderboardSync(RespClient(server.url)))
+        for cache in (first, second):
+            cache.page(GameMode.walls, 1)
+            cache.warm(GameMode.walls, [entry(1, 90)], cache.generation)
+
+        first.add(entry(2, 95))
+        assert first.page(GameMode.walls, 2) == [entry(2, 95), entry(1, 90)]
+        assert second.page(GameMode.walls, 2) is None
+
+        second.warm(GameMode.walls, [entry(2, 95), entry(1, 90)], second.generation)
+        assert second.page(GameMode.walls, 2) == [entry(2, 95), entry(1, 90)]
+    finally:
+        server.stop()
+
+
+def test_shared_generation_is_checked_off_the_event_loop(monkeypatch):
+    """GET /leaderboard served from a cache synced through a server doesn't block the event loop on it."""
+    server = RespStandIn().start()
+    try:
+        sync = RedisLeaderboardSync(RespClient(server.url))
+        callers = []
+        execute = sync.client.execute
+        def recording_execute(*args):
+            callers.append(threading.get_ident())
+            return execute(*args)
+        sync.client.execute = recording_execute
+        cache = LeaderboardCache(size=3, sync=sync)
+        cache.page(GameMode.walls, 1)
+        cache.warm(GameMode.walls, [entry(1, 90)], cache.generation)
+        callers.clear()
+        monkeypatch.setattr(db_session, "leaderboard_cache", cache)
+
+        async def scenario():
+            page = await leaderboard.get_leaderboard(Response(), db=None, mode=GameMode.walls, limit=5, cursor=None)
+            return threading.get_ident(), page
+
+        loop_thread, page = asyncio.run(scenario())
+        assert page == [entry(1, 90)]
+        assert callers and loop_thread not in callers
+    finally:
+        server.stop()
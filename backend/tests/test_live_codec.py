@@ -0,0 +1,82 @@
+import pytest
+
+from src.core import live_codec
+from src.schemas.enums import Direction, GameMode
+from src.schemas.game import LivePlayer, LivePlayerDelta, LivePlayerUpdate, Position
+
+
+def make_update(**overrides) -> LivePlayerUpdate:
+    fields = {
+        "score": 120,
+        "mode": GameMode.pass_through,
+        "snake": [Position(x=4, y=7), Position(x=3, y=7), Position(x=2, y=7)],
+        "food": Position(x=10, y=1),
+        "direction": Direction.RIGHT,
+        "isPlaying": True,
+        "seq": 42,
+    }
+    return LivePlayerUpdate(**{**fields, **overrides})
+
+
+def test_update_round_trip():
+    """An update survives encoding and decoding, with coordinates packed as single bytes."""
+    update = make_update()
+    data = live_codec.encode_update(update)
+
+    # Header plus one byte per coordinate for the food and three segments
+    assert len(data) == 14 + 8
+    frame = live_codec.decode_update(data)
+    assert list(frame.snake) == [4, 7, 3, 7, 2, 7]
+    assert (frame.food_x, frame.food_y) == (10, 1)
+    assert frame.to_update() == update
+
+
+def test_wide_coordinates():
+    """Coordinates above 255 switch the frame to 16-bit coordinates."""
+    update = make_update(snake=[Position(x=300, y=2)], isPlaying=False)
+    frame = live_codec.decode_update(live_codec.encode_update(update))
+    assert frame.to_update() == update
+
+
+def test_player_list_round_trip():
+    """A list of players decodes back to the same schema models."""
+    players = [
+        LivePlayer(id=f"p{i}", username=f"spieler-{i}-ü", **make_update(score=i).model_dump())
+        for i in range(3)
+    ]
+    assert live_codec.decode_players(live_codec.encode_players(players)) == players
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda data: data[:5],
+    lambda data: data[:-1],
+    lambda data: bytes([9]) + data[1:],
+    lambda data: data[:1] + bytes([7]) + data[2:],
+])
+def test_malformed_frames_are_rejected(mutate):
+    """Truncated frames, unknown versions and out-of-range enums raise FrameDecodeError."""
+    data = live_codec.encode_update(make_update())
+    with pytest.raises(live_codec.FrameDecodeError):
+        live_codec.decode_update(mutate(data))
+
+
+def test_out_of_range_values_raise_encode_error():
+    """Values that overflow the header fields raise FrameEncodeError rather than struct.error."""
+    record = live_codec.LivePlayerRecord.from_update(make_update(), "p1", "alice")
+    record.score = 2**32
+    with pytest.raises(live_codec.FrameEncodeError):
+        live_codec.encode_record(record)
+
+
+def test_delta_past_segment_limit_is_refused():
+    """A delta that would grow the snake past the uint16 segment count leaves the record alone."""
+    record = live_codec.LivePlayerRecord.from_update(make_update(seq=1), "p1", "alice")
+    record.snake.extend([1, 1] * (live_codec.MAX_SEGMENTS - len(record)))
+    delta = LivePlayerDelta(seq=2, score=0, direction=Direction.RIGHT, isPlaying=True, heads=[Position(x=5, y=7)])
+    with pytest.raises(live_codec.FrameEncodeError):
+        record.apply_delta(delta)
+    assert (record.seq, len(record)) == (1, live_codec.MAX_SEGMENTS)
+
+    # Dropping a tail segment in the same frame keeps it within the limit
+    assert record.apply_delta(delta.model_copy(update={"tailDrop": 1}))
+    assert len(record) == live_codec.MAX_SEGMENTS
@@ -0,0 +1,212 @@
+import time
+from array import array
+
+import pytest
+
+from src.core.resp import RespClient, RespError
+from src.db.live_store import (
+    InMemoryLivePlayerStore,
+    LiveStoreFullError,
+    RedisLivePlayerStore,
+    SharedMemoryLivePlayerStore,
+    sort_key,
+)
+from src.schemas.enums import Direction, GameMode
+from src.schemas.game import LivePlayer, LivePlayerDelta, Position
+from tests.resp_server import RespStandIn
+
+
+def make_player(player_id: str, score: int = 0) -> LivePlayer:
+    return LivePlayer(
+        id=player_id,
+        username=f"user-{player_id}",
+        score=score,
+        mode=GameMode.walls,
+        snake=[Position(x=3, y=3), Position(x=2, y=3)],
+        food=Position(x=9, y=9),
+        direction=Direction.RIGHT,
+        isPlaying=True,
+    )
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStandIn().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "shm", "redis"])
+def store_pair(request, tmp_path):
+    """Two handles on one store, standing in for two worker processes."""
+    if request.param == "memory":
+        store = InMemoryLivePlayerStore(ttl=10)
+        yield store, store
+    elif request.param == "shm":
+        path = str(tmp_path / "live")
+        first = SharedMemoryLivePlayerStore(path, ttl=10, slots=8, slot_size=256)
+        second = SharedMemoryLivePlayerStore(path, ttl=10, slots=8, slot_size=256)
+        yield first, second
+        first.close()
+        second.close()
+    else:
+        server = request.getfixturevalue("resp_server")
+        yield (
+            RedisLivePlayerStore(RespClient(server.url), ttl=10),
+            RedisLivePlayerStore(RespClient(server.url), ttl=10),
+        )
+
+
+def test_writes_are_visible_to_other_workers(store_pair):
+    """A ping handled by one worker is visible to a spectator on another."""
+    writer, reader = store_pair
+    writer.put(make_player("a", score=10))
+    writer.put(make_player("b"))
+    writer.put(make_player("a", score=20))
+
+    assert reader.get("a") == make_player("a", score=20)
+    assert sorted(player.id for player in reader.all()) == ["a", "b"]
+
+    assert reader.remove("a") is True
+    assert writer.get("a") is None
+    assert reader.remove("a") is False
+
+    writer.clear()
+    assert reader.all() == []
+
+
+def test_expire_drops_silent_players(store_pair):
+    """Players not seen within the TTL are expired and reported once."""
+    writer, reader = store_pair
+    writer.ttl = reader.ttl = 0.05
+    writer.put(make_player("a"))
+
+    if isinstance(writer, RedisLivePlayerStore):
+        # The server expires the key on its own clock
+        time.sleep(0.1)
+        expired = reader.expire()
+    else:
+        expired = reader.expire(now=writer.clock() + 1)
+
+    assert expired == ["a"]
+    assert reader.get("a") is None
+    assert reader.expire(now=writer.clock() + 2) == []
+
+
+def test_shared_memory_slots_are_reused(tmp_path):
+    """Removed slots are reused and a full table is reported, not overwritten."""
+    store = SharedMemoryLivePlayerStore(str(tmp_path / "live"), ttl=10, slots=2, slot_size=256)
+    store.put(make_player("a"))
+    store.put(make_player("b"))
+    with pytest.raises(LiveStoreFullError):
+        store.put(make_player("c"))
+
+    store.remove("a")
+    store.put(make_player("c"))
+    assert sorted(player.id for player in store.all()) == ["b", "c"]
+    store.close()
+
+
+def test_summary_matches_across_backends(store_pair):
+    """Every backend reports the same summary, counted or scanned."""
+    writer, reader = store_pair
+    writer.put(make_player("a", score=50))
+    writer.put(make_player("b", score=70))
+    writer.put(make_player("b", score=20))
+
+    summary = reader.summary()
+    assert summary.total == 2
+    assert summary.playing == 2
+    assert summary.byMode == {GameMode.walls: 2, GameMode.pass_through: 0}
+    assert summary.topScore == 50
+
+
+def test_count_matches_across_backends(store_pair):
+    """count() gives the number of live players on every backend without reading them."""
+    writer, reader = store_pair
+    assert reader.count() == 0
+    writer.put(make_player("a"))
+    writer.put(make_player("b"))
+    writer.put(make_player("a", score=5))
+    assert reader.count() == 2
+    writer.remove("b")
+    assert reader.count() == 1
+
+
+def test_version_moves_on_every_change(store_pair):
+    """Writes through any handle change the version seen by the others."""
+    writer, reader = store_pair
+    seen = {reader.version()}
+
+    writer.put(make_player("a"))
+    seen.add(reader.version())
+    writer.put(make_player("a", score=5))
+    seen.add(reader.version())
+    assert reader.version() == writer.version()
+
+    writer.remove("a")
+    seen.add(reader.version())
+    assert len(seen) == 4
+
+
+def test_deltas_apply_on_every_backend(store_pair):
+    """A delta applied through one handle grows the head and drops the tail for all."""
+    writer, reader = store_pair
+    writer.put(make_player("a"))
+    delta = LivePlayerDelta(
+        seq=1, score=5, direction=Direction.RIGHT, isPlaying=True,
+        heads=[Position(x=4, y=3)], tailDrop=1,
+    )
+
+    assert writer.apply_delta("a", delta).seq == 1
+    player = reader.get("a")
+    assert player.snake == [Position(x=4, y=3), Position(x=3, y=3)]
+    assert (player.score, player.seq) == (5, 1)
+
+    # Replaying the same sequence number is rejected and changes nothing
+    assert writer.apply_delta("a", delta) is None
+    assert reader.get("a") == player
+    assert writer.apply_delta("missing", delta) is None
+
+
+def test_memory_store_keeps_compact_records():
+    """The in-memory backend holds flat coordinate arrays, not Position models."""
+    store = InMemoryLivePlayerStore(ttl=10)
+    store.put(make_player("a"))
+
+    record = store.get_record("a")
+    assert isinstance(record.snake, array)
+    assert list(record.snake) == [3, 3, 2, 3]
+    assert not hasattr(record, "__dict__")
+
+
+def test_query_filters_sorts_and_pages(store_pair):
+    """Indexed and scanning backends return the same filtered, keyset-paged listing."""
+    writer, reader = store_pair
+    for player_id, score, mode in [("a", 30, GameMode.walls), ("b", 50, GameMode.pass_through),
+                                   ("c", 30, GameMode.walls), ("d", 10, GameMode.walls)]:
+        player = make_player(player_id, score=score)
+        player.mode = mode
+        writer.put(player)
+    idle = make_player("c", score=40)
+    idle.isPlaying = False
+    writer.put(idle)
+
+    by_score = [record.id for record in reader.query(sort="score")]
+    assert by_score == ["b", "c", "a", "d"]
+    assert [record.id for record in reader.query(mode=GameMode.walls, playing=True, sort="score")] == ["a", "d"]
+    assert [record.id for record in reader.query(playing=False)] == ["c"]
+
+    first = reader.query(sort="score", limit=2)
+    rest = reader.query(sort="score", after=sort_key(first[-1], "score"))
+    assert [record.id for record in first + rest] == by_score
+
+
+def test_redis_store_raises_error_replies(resp_server):
+    """Error replies to a write (NOAUTH, OOM) are raised rather than dropped."""
+    store = RedisLivePlayerStore(RespClient(resp_server.url), ttl=10)
+    store.client.pipeline = lambda commands: [RespError("OOM command not allowed"), *([1] * (len(commands) - 1))]
+    with pytest.raises(RespError):
+        store.put(make_player("a"))
+    with pytest.raises(RespError):
+        store.remove("a")
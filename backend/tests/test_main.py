@@ -4,9 +4,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from src.api.deps import rate_limiter
 from src.core.config import settings
 from src.db.database import get_db
 from src.db.models import Base
+from src.db.session import leaderboard_cache, rank_index
 from src.main import app
 
 
@@ -44,9 +46,12 @@ def client(test_session):
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    rate_limiter.clear()
+    leaderboard_cache.clear()
+    rank_index.clear()
 
     from unittest.mock import patch
-    with patch("src.main.init_db"):
+    with patch("src.main.init_db"), patch("src.main.SessionLocal", test_session):
         with TestClient(app) as test_client:
             yield test_client
 
@@ -118,3 +123,21 @@ def test_leaderboard(client):
     response = client.get(f"{settings.API_V1_STR}/leaderboard/high-score?userId={user_id}&mode=walls")
     assert response.status_code == 200
     assert response.json()["score"] == 100
+
+
+def test_login_is_shed_when_password_pool_is_saturated(client):
+    """Logins get 503 with Retry-After instead of queueing behind a saturated bcrypt pool."""
+    from unittest.mock import patch
+
+    from src.core.security import password_pool
+
+    with patch.object(password_pool, "in_flight", password_pool.max_in_flight):
+        response = client.post(
+            f"{settings.API_V1_STR}/auth/signup",
+            json={"email": "busy@example.com", "password": "pwd"}
+        )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+
+    metrics = client.get(f"{settings.API_V1_STR}/health/metrics").json()["password_pool"]
+    assert metrics["rejected"] >= 1
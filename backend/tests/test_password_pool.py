@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.security import PasswordPool, PasswordPoolBusyError, get_password_hash
+
+
+def test_hash_and_verify_off_the_event_loop():
+    """Hashing and verification run on the pool's threads and give the usual results."""
+    pool = PasswordPool(workers=2, max_in_flight=4, retry_after=1)
+
+    async def scenario():
+        hashed = await pool.hash("hunter2")
+        return await pool.verify("hunter2", hashed), await pool.verify("wrong", hashed)
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert pool.metrics()["completed"] == 3
+    assert pool.metrics()["in_flight"] == 0
+
+
+def test_saturated_pool_sheds_calls():
+    """Calls past max_in_flight fail fast with the configured Retry-After."""
+    pool = PasswordPool(workers=1, max_in_flight=2, retry_after=3)
+    release = threading.Event()
+    hashed = get_password_hash("pw")
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        metrics = pool.metrics()
+        with pytest.raises(PasswordPoolBusyError) as excinfo:
+            await pool.verify("pw", hashed)
+        release.set()
+        await asyncio.gather(*blocked)
+        return metrics, excinfo.value.retry_after
+
+    metrics, retry_after = asyncio.run(scenario())
+    assert (metrics["in_flight"], metrics["queued"]) == (2, 1)
+    assert retry_after == 3
+    assert pool.metrics()["rejected"] == 1
@@ -0,0 +1,60 @@
+import random
+
+from src.core.rank_index import FenwickTree, ScoreRankIndex
+
+
+def test_fenwick_prefix_sums_match_a_plain_list():
+    rng = random.Random(7)
+    counts = [rng.randrange(5) for _ in range(100)]
+    tree = FenwickTree(len(counts), counts)
+    for _ in range(200):
+        position = rng.randrange(len(counts))
+        delta = rng.choice([-1, 1, 3])
+        counts[position] += delta
+        tree.add(position, delta)
+    assert [tree.prefix_sum(end) for end in range(102)] == [sum(counts[:end]) for end in range(102)]
+
+
+def test_ranks_share_ties_and_follow_improvements():
+    index = ScoreRankIndex(max_score=1000)
+    index.load([("a", "walls", 50), ("b", "walls", 80), ("c", "walls", 80), ("d", "pass", 10)], index.generation)
+
+    assert index.rank("b", "walls") == (1, 80, 3)
+    assert index.rank("c", "walls") == (1, 80, 3)
+    assert index.rank("a", "walls") == (3, 50, 3)
+    assert index.rank("a", "pass") is None
+
+    index.update("a", "walls", 40)
+    assert index.rank("a", "walls") == (3, 50, 3)
+    index.update("a", "walls", 90)
+    assert index.rank("a", "walls") == (1, 90, 3)
+    assert index.rank("b", "walls") == (2, 80, 3)
+
+    index.update("e", "walls", 5)
+    assert index.rank("e", "walls") == (4, 5, 4)
+
+    index.discard("a")
+    assert index.rank("a", "walls") is None
+    assert index.rank("b", "walls") == (1, 80, 3)
+
+
+def test_scores_beyond_the_range_are_clamped():
+    index = ScoreRankIndex(max_score=100)
+    index.update("a", "walls", 500)
+    index.update("b", "walls", 300)
+    index.update("c", "walls", -5)
+
+    assert index.rank("a", "walls") == (1, 500, 3)
+    assert index.rank("b", "walls") == (1, 300, 3)
+    assert index.rank("c", "walls") == (3, -5, 3)
+
+
+def test_load_racing_a_new_score_is_discarded():
+    index = ScoreRankIndex(max_score=100)
+    generation = index.generation
+    index.update("a", "walls", 10)
+
+    assert not index.load([("b", "walls", 20)], generation)
+    assert not index.built
+    assert index.load([("a", "walls", 10), ("b", "walls", 20)], index.generation)
+    assert index.rank("a", "walls") == (2, 10, 2)
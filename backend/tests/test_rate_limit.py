@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.api import deps
+from src.core.rate_limit import InMemoryRateLimiter, RateLimit, RedisRateLimiter, parse_rate_limit
+from src.core.resp import RespClient
+from tests.resp_server import RespStandIn
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("10/60") == RateLimit(10, 60.0)
+    assert parse_rate_limit("5") == RateLimit(5, 1.0)
+    assert parse_rate_limit("") is None
+    assert parse_rate_limit("0/60") is None
+    with pytest.raises(ValueError):
+        parse_rate_limit("ten/60")
+    with pytest.raises(ValueError):
+        parse_rate_limit("10/0")
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate():
+    """A full bucket admits `capacity` requests at once, then one per 1/rate."""
+    limiter = InMemoryRateLimiter()
+    now = [1000.0]
+    limiter.clock = lambda: now[0]
+    limit = RateLimit(capacity=3, period=3.0)
+
+    assert [limiter.acquire("a", limit) for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a", limit) == pytest.approx(1.0)
+    assert limiter.acquire("b", limit) == 0
+
+    now[0] += 1.0
+    assert limiter.acquire("a", limit) == 0
+    assert limiter.acquire("a", limit) == pytest.approx(1.0)
+
+
+def test_idle_buckets_are_swept():
+    """Buckets that have refilled completely are dropped; the oldest go when over max_keys."""
+    limiter = InMemoryRateLimiter(max_keys=10, sweep_interval=5.0)
+    now = [1000.0]
+    limiter.clock = lambda: now[0]
+    limit = RateLimit(capacity=2, period=2.0)
+
+    for i in range(5):
+        limiter.acquire(f"idle-{i}", limit)
+    assert len(limiter) == 5
+
+    now[0] += 10
+    limiter.acquire("active", limit)
+    assert len(limiter) == 1
+
+    for i in range(20):
+        limiter.acquire(f"busy-{i}", limit)
+    assert len(limiter) <= 10
+
+
+def test_shared_limits_apply_across_workers():
+    """Workers sharing a server draw from the same per-window allowance."""
+    server = RespStandIn().start()
+    try:
+        first = RedisRateLimiter(RespClient(server.url))
+        second = RedisRateLimiter(RespClient(server.url))
+        first.clock = second.clock = lambda: 6001.0
+        limit = RateLimit(capacity=2, period=60.0)
+
+        assert first.acquire("a", limit) == 0
+        assert second.acquire("a", limit) == 0
+        assert first.acquire("a", limit) == pytest.approx(59.0)
+        assert second.acquire("b", limit) == 0
+    finally:
+        server.stop()
+
+
+def test_shared_limits_are_checked_off_the_event_loop(monkeypatch):
+    """The rate limit dependency makes the shared counter round trip on a worker thread."""
+    server = RespStandIn().start()
+    try:
+        limiter = RedisRateLimiter(RespClient(server.url))
+        limiter.clock = lambda: 6001.0
+        callers = []
+        pipeline = limiter.client.pipeline
+        def recording_pipeline(commands):
+            callers.append(threading.get_ident())
+            return pipeline(commands)
+        limiter.client.pipeline = recording_pipeline
+        monkeypatch.setattr(deps, "rate_limiter", limiter)
+        dependency = deps.rate_limit("test", "1/60", per="ip")
+        request = Request({"type": "http", "client": ("203.0.113.7", 1234), "headers": []})
+
+        async def scenario():
+            await dependency(request)
+            with pytest.raises(HTTPException) as exc_info:
+                await dependency(request)
+            return threading.get_ident(), exc_info.value.status_code
+
+        loop_thread, status_code = asyncio.run(scenario())
+        assert status_code == 429
+        assert len(callers) == 2 and loop_thread not in callers
+    finally:
+        server.stop()
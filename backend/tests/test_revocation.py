@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from src.api import deps
+from src.api.v1.endpoints import auth
+from src.core.resp import RespClient
+from src.core.revocation import BloomFilter, InMemoryRevocationList, RedisRevocationList
+from src.core.security import create_access_token
+from src.core.token_cache import TokenCache
+from src.schemas.user import User
+from tests.resp_server import RespStandIn
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added key is reported present, and most others are not."""
+    bloom = BloomFilter(bits=4096)
+    added = [f"jti-{i}" for i in range(100)]
+    for key in added:
+        bloom.add(key)
+
+    assert all(key in bloom for key in added)
+    assert sum(f"other-{i}" in bloom for i in range(1000)) < 50
+
+
+@pytest.mark.parametrize("bloom_bits", [0, 1024])
+def test_revocations_lapse_at_token_expiry(bloom_bits):
+    """A revoked ID stays revoked until the token's exp, then is forgotten."""
+    revocations = InMemoryRevocationList(bloom_bits=bloom_bits)
+    now = [1000.0]
+    revocations.clock = lambda: now[0]
+
+    revocations.revoke("a", expires_at=1010)
+    revocations.revoke("b", expires_at=1100)
+    revocations.revoke("stale", expires_at=999)
+    assert revocations.is_revoked("a") and revocations.is_revoked("b")
+    assert not revocations.is_revoked("stale")
+    assert not revocations.is_revoked("never")
+    assert not revocations.is_revoked(None)
+
+    now[0] = 1050
+    assert not revocations.is_revoked("a")
+    assert revocations.is_revoked("b")
+    assert len(revocations) == 1
+
+
+def test_shared_revocations_are_seen_by_other_workers():
+    """A logout on one worker is honoured by every worker sharing the server."""
+    server = RespStandIn().start()
+    try:
+        first = RedisRevocationList(RespClient(server.url))
+        second = RedisRevocationList(RespClient(server.url))
+        first.revoke("a", expires_at=first.clock() + 60)
+
+        assert second.is_revoked("a")
+        assert not second.is_revoked("b")
+    finally:
+        server.stop()
+
+
+def test_shared_revocation_checks_run_off_the_event_loop(monkeypatch):
+    """Authenticating a cached token doesn't make the revocation round trip on the event loop."""
+    server = RespStandIn().start()
+    try:
+        revocations = RedisRevocationList(RespClient(server.url))
+        callers = []
+        execute = revocations.client.execute
+        def recording_execute(*args):
+            callers.append(threading.get_ident())
+            return execute(*args)
+        revocations.client.execute = recording_execute
+
+        user = User(id="u1", username="alice", email="alice@example.com", is_superuser=False, createdAt=datetime.now(UTC))
+        cache = TokenCache(max_size=10, max_age=60)
+        cache.put("token", user, time.time() + 60, "jti-1")
+        monkeypatch.setattr(deps, "auth_cache", cache)
+        monkeypatch.setattr(deps, "token_revocations", revocations)
+
+        async def scenario():
+            return threading.get_ident(), await deps.get_current_user("token", db=None)
+
+        loop_thread, current_user = asyncio.run(scenario())
+        assert current_user == user
+        assert callers and loop_thread not in callers
+    finally:
+        server.stop()
+
+
+def test_logout_writes_shared_revocations_off_the_event_loop(monkeypatch):
+    """Logging out makes the shared revocation write on a worker thread, and the token stops being current."""
+    server = RespStandIn().start()
+    try:
+        revocations = RedisRevocationList(RespClient(server.url))
+        callers = []
+        execute = revocations.client.execute
+        def recording_execute(*args):
+            callers.append(threading.get_ident())
+            return execute(*args)
+        revocations.client.execute = recording_execute
+        monkeypatch.setattr(deps, "token_revocations", revocations)
+        monkeypatch.setattr(auth, "token_revocations", revocations)
+        token = create_access_token("alice@example.com")
+        user = User(id="u1", username="alice", email="alice@example.com", is_superuser=False, createdAt=datetime.now(UTC))
+
+        async def scenario():
+            assert await deps.is_token_current(token)
+            await auth.logout(current_user=user, token=token)
+            return threading.get_ident(), await deps.is_token_current(token)
+
+        loop_thread, current = asyncio.run(scenario())
+        assert not current
+        assert callers and loop_thread not in callers
+    finally:
+        server.stop()
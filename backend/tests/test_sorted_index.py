@@ -0,0 +1,33 @@
+import random
+
+from src.core.sorted_index import SortedKeyList
+
+
+def test_matches_a_sorted_set_under_churn():
+    """Random inserts and removals across bucket splits keep the keys sorted and unique."""
+    rng = random.Random(7)
+    index = SortedKeyList(load=4)
+    expected = set()
+    for _ in range(2000):
+        key = (rng.randrange(50), f"p{rng.randrange(40)}")
+        if rng.random() < 0.6:
+            index.add(key)
+            expected.add(key)
+        else:
+            assert index.discard(key) is (key in expected)
+            expected.discard(key)
+
+    assert list(index) == sorted(expected)
+    assert len(index) == len(expected)
+
+
+def test_irange_starts_after_the_given_key():
+    """irange resumes strictly after a key, whether or not the key is present."""
+    index = SortedKeyList(load=2)
+    for key in range(0, 20, 2):
+        index.add(key)
+
+    assert list(index.irange(after=6)) == [8, 10, 12, 14, 16, 18]
+    assert list(index.irange(after=7)) == [8, 10, 12, 14, 16, 18]
+    assert list(index.irange(after=18)) == []
+    assert list(index.irange(after=-1))[:2] == [0, 2]
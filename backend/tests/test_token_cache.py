@@ -0,0 +1,57 @@
+from datetime import UTC, datetime
+
+from src.core.token_cache import TokenCache
+from src.schemas.user import User
+
+
+def make_user(user_id: str) -> User:
+    return User(
+        id=user_id,
+        username=f"user-{user_id}",
+        email=f"{user_id}@example.com",
+        is_superuser=False,
+        createdAt=datetime.now(UTC),
+    )
+
+
+def test_entries_expire_at_exp_or_max_age():
+    """A cached token is served until its exp claim or the cache's max age, whichever is sooner."""
+    cache = TokenCache(max_size=10, max_age=60)
+    now = [1000.0]
+    cache.clock = lambda: now[0]
+
+    cache.put("h.p.short", make_user("a"), expires_at=1010)
+    cache.put("h.p.long", make_user("b"), expires_at=5000)
+    assert cache.get("h.p.short").user.id == "a"
+
+    now[0] = 1020
+    assert cache.get("h.p.short") is None
+    assert cache.get("h.p.long").user.id == "b"
+
+    now[0] = 1061
+    assert cache.get("h.p.long") is None
+    assert len(cache) == 0
+
+
+def test_lookup_requires_the_full_token():
+    """A token reusing a cached signature with another payload is not served from the cache."""
+    cache = TokenCache(max_size=10, max_age=60)
+    cache.put("h.payload.sig", make_user("a"))
+    assert cache.get("h.forged.sig") is None
+
+
+def test_lru_eviction_and_user_invalidation():
+    """The least recently used token is evicted first, and invalidating a user drops all their tokens."""
+    cache = TokenCache(max_size=2, max_age=60)
+    cache.put("h.p.a1", make_user("a"))
+    cache.put("h.p.b1", make_user("b"))
+    cache.get("h.p.a1")
+    cache.put("h.p.a2", make_user("a"))
+
+    assert cache.get("h.p.b1") is None
+    assert cache.get("h.p.a1") is not None
+
+    cache.invalidate_user("a")
+    assert cache.get("h.p.a1") is None
+    assert cache.get("h.p.a2") is None
+    assert len(cache) == 0
@@ -6,6 +6,8 @@ import { Button } from '@/components/ui/button';
 import { Eye, Users, ChevronLeft, ChevronRight } from 'lucide-react';
 import { Badge } from '@/components/ui/badge';
 
+const POLL_INTERVAL = 500; // Used while pushed updates aren't arriving
+
 const SpectatorView: React.FC = () => {
   const [livePlayers, setLivePlayers] = useState<LivePlayer[]>([]);
   const [selectedPlayer, setSelectedPlayer] = useState<LivePlayer | null>(null);
@@ -31,24 +33,44 @@ const SpectatorView: React.FC = () => {
     fetchPlayers();
   }, []);
 
-  // Periodically refresh player data from backend
+  // Subscribe to pushed updates for the selected player, polling instead
+  // whenever the socket has closed or gone quiet. Updates are only pushed by
+  // the server process the player sends to, so a socket opened on another
+  // one receives nothing after the first frame.
   useEffect(() => {
     if (!selectedPlayer) return;
 
-    // Fetch updates every 500ms
+    const playerId = selectedPlayer.id;
+    let socketOpen = true;
+    let lastPush = Date.now();
+    const unwatch = api.livePlayers.watchPlayer(
+      playerId,
+      (updatedPlayer) => {
+        lastPush = Date.now();
+        setSelectedPlayer(updatedPlayer);
+      },
+      () => {
+        socketOpen = false;
+      }
+    );
+
     const intervalId = setInterval(async () => {
+      if (socketOpen && Date.now() - lastPush < 2 * POLL_INTERVAL) {
+        return;
+      }
       try {
-        const updatedPlayer = await api.livePlayers.getPlayerStream(selectedPlayer.id);
+        const updatedPlayer = await api.livePlayers.getPlayerStream(playerId);
         if (updatedPlayer) {
           setSelectedPlayer(updatedPlayer);
         }
       } catch (error) {
         console.error('Failed to fetch player update:', error);
       }
-    }, 500);
+    }, POLL_INTERVAL);
 
     return () => {
       clearInterval(intervalId);
+      unwatch();
     };
   }, [selectedPlayer?.id]);
 
@@ -5,6 +5,7 @@ const GRID_SIZE = 20;
 const INITIAL_SPEED = 200;
 const SPEED_INCREMENT = 3;
 const MIN_SPEED = 50;
+const DEFAULT_HEARTBEAT_INTERVAL = 500; // Used until the server sends X-Heartbeat-Interval
 
 const getInitialSnake = (): Position[] => [
   { x: 10, y: 10 },
@@ -120,6 +121,8 @@ export const useGameLogic = (initialMode: GameMode = 'pass-through') => {
   const gameLoopRef = useRef<number | null>(null);
   const directionQueueRef = useRef<Direction[]>([]);
   const gameStateRef = useRef<GameState>(gameState);
+  // Numbers heartbeats within a game so the server's replay history keeps them in order
+  const heartbeatSeqRef = useRef(0);
 
   // Keep gameStateRef in sync with gameState
   useEffect(() => {
@@ -134,6 +137,7 @@ export const useGameLogic = (initialMode: GameMode = 'pass-through') => {
     setGameState(newState);
     gameStateRef.current = newState;
     directionQueueRef.current = [];
+    heartbeatSeqRef.current = 0;
   }, []);
 
   const pauseGame = useCallback(() => {
@@ -202,33 +206,38 @@ export const useGameLogic = (initialMode: GameMode = 'pass-through') => {
           return;
         }
 
-        // Send initial update immediately
-        api.livePlayers.updateLiveStatus({
-          score: gameState.score,
-          mode: gameState.mode,
-          snake: gameState.snake,
-          food: gameState.food,
-          direction: gameState.direction,
-          isPlaying: true,
-        }).catch(err => console.error('Failed to update live status:', err));
-
-        // Then send updates every 500ms
-        const heartbeatInterval = setInterval(() => {
+        // Send updates as often as the server asks, falling back to every 500ms
+        let heartbeatTimeout: ReturnType<typeof setTimeout> | undefined;
+        let stopped = false;
+        const sendHeartbeat = () => {
           const currentState = gameStateRef.current;
-          if (currentState.status === 'playing') {
-            api.livePlayers.updateLiveStatus({
-              score: currentState.score,
-              mode: currentState.mode,
-              snake: currentState.snake,
-              food: currentState.food,
-              direction: currentState.direction,
-              isPlaying: true,
-            }).catch(err => console.error('Failed to update live status:', err));
+          if (stopped || currentState.status !== 'playing') {
+            return;
           }
-        }, 500);
+          api.livePlayers.updateLiveStatus({
+            score: currentState.score,
+            mode: currentState.mode,
+            snake: currentState.snake,
+            food: currentState.food,
+            direction: currentState.direction,
+            isPlaying: true,
+            seq: ++heartbeatSeqRef.current,
+          })
+            .catch(err => {
+              console.error('Failed to update live status:', err);
+              return null;
+            })
+            .then(interval => {
+              if (!stopped) {
+                heartbeatTimeout = setTimeout(sendHeartbeat, interval ?? DEFAULT_HEARTBEAT_INTERVAL);
+              }
+            });
+        };
+        sendHeartbeat();
 
         return () => {
-          clearInterval(heartbeatInterval);
+          stopped = true;
+          clearTimeout(heartbeatTimeout);
           // Send final update with isPlaying: false
           const currentState = gameStateRef.current;
           api.livePlayers.updateLiveStatus({
@@ -238,6 +247,7 @@ export const useGameLogic = (initialMode: GameMode = 'pass-through') => {
             food: currentState.food,
             direction: currentState.direction,
             isPlaying: false,
+            seq: ++heartbeatSeqRef.current,
           }).catch(err => console.error('Failed to update live status:', err));
         };
       });
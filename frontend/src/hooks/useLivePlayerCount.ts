@@ -8,8 +8,8 @@ export const useLivePlayerCount = () => {
     useEffect(() => {
         const fetchCount = async () => {
             try {
-                const players = await api.livePlayers.getLivePlayers();
-                setCount(players.length);
+                const summary = await api.livePlayers.getSummary();
+                setCount(summary.total);
                 setIsLoading(false);
             } catch (error) {
                 console.error('Failed to fetch live player count:', error);
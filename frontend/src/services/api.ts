@@ -2,6 +2,7 @@ import {
     User,
     LeaderboardEntry,
     LivePlayer,
+    LivePlayerSummary,
     AuthCredentials,
     AuthResponse,
     GameMode,
@@ -11,6 +12,13 @@ import {
 // Use relative path for Docker nginx proxy, or fall back to environment variable
 const API_BASE_URL = import.meta.env.VITE_API_URL || '/api/v1';
 
+// Build a WebSocket URL for an API endpoint (API_BASE_URL may be relative to the page)
+const wsUrl = (endpoint: string): string => {
+    const url = new URL(`${API_BASE_URL}${endpoint}`, window.location.href);
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+    return url.toString();
+};
+
 // Helper function to get auth token from localStorage
 const getAuthToken = (): string | null => {
     return localStorage.getItem('authToken');
@@ -30,11 +38,11 @@ const handleApiError = async (response: Response): Promise<never> => {
     throw new Error(errorMessage);
 };
 
-// Generic fetch wrapper with auth headers
-const apiFetch = async <T>(
+// Fetch with auth headers, returning the raw response for callers that read headers
+const apiRequest = async (
     endpoint: string,
     options: RequestInit = {}
-): Promise<T> => {
+): Promise<Response> => {
     const token = getAuthToken();
     const headers: HeadersInit = {
         'Content-Type': 'application/json',
@@ -54,6 +62,16 @@ const apiFetch = async <T>(
         await handleApiError(response);
     }
 
+    return response;
+};
+
+// Generic fetch wrapper with auth headers
+const apiFetch = async <T>(
+    endpoint: string,
+    options: RequestInit = {}
+): Promise<T> => {
+    const response = await apiRequest(endpoint, options);
+
     // Handle 204 No Content responses
     if (response.status === 204) {
         return undefined as T;
@@ -163,6 +181,10 @@ export const livePlayersApi = {
         return apiFetch<LivePlayer[]>('/live-players');
     },
 
+    async getSummary(): Promise<LivePlayerSummary> {
+        return apiFetch<LivePlayerSummary>('/live-players/summary');
+    },
+
     async getPlayerStream(playerId: string): Promise<LivePlayer | null> {
         try {
             return await apiFetch<LivePlayer>(`/live-players/${playerId}`);
@@ -175,6 +197,23 @@ export const livePlayersApi = {
         }
     },
 
+    // Subscribe to pushed updates for one player. onEnd runs when the stream ends,
+    // including when the socket fails to connect. Returns a function that unsubscribes.
+    watchPlayer(
+        playerId: string,
+        onUpdate: (player: LivePlayer) => void,
+        onEnd?: () => void
+    ): () => void {
+        const socket = new WebSocket(wsUrl(`/live-players/${encodeURIComponent(playerId)}/ws`));
+        socket.onmessage = (event) => onUpdate(JSON.parse(event.data));
+        socket.onclose = () => onEnd?.();
+        return () => {
+            socket.onclose = null;
+            socket.close();
+        };
+    },
+
+    // Resolves to the milliseconds the server wants before the next heartbeat, if it said
     async updateLiveStatus(gameState: {
         score: number;
         mode: GameMode;
@@ -182,11 +221,14 @@ export const livePlayersApi = {
         food: { x: number; y: number };
         direction: string;
         isPlaying: boolean;
-    }): Promise<void> {
-        await apiFetch<void>('/live-players/ping', {
+        seq?: number;
+    }): Promise<number | null> {
+        const response = await apiRequest('/live-players/ping', {
             method: 'POST',
             body: JSON.stringify(gameState),
         });
+        const interval = Number(response.headers.get('X-Heartbeat-Interval'));
+        return interval > 0 ? interval : null;
     },
 };
 
@@ -45,6 +45,14 @@ export interface LivePlayer {
   food: Position;
   direction: Direction;
   isPlaying: boolean;
+  seq?: number;
+}
+
+export interface LivePlayerSummary {
+  total: number;
+  playing: number;
+  byMode: Record<GameMode, number>;
+  topScore: number | null;
 }
 
 export interface AuthCredentials {
@@ -13,6 +13,7 @@ export default defineConfig(({ mode }) => ({
         target: 'http://localhost:8000',
         changeOrigin: true,
         secure: false,
+        ws: true,
       },
       '/docs': {
         target: 'http://localhost:8000',